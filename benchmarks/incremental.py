@@ -0,0 +1,103 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+''' Benchmark of partialg.sparse.incremental: sbd_update against a fresh sbd_eigenleafs.
+
+USAGE (from the repository root)
+    python benchmarks/incremental.py
+    python benchmarks/incremental.py --n 512 --density 0.02 --steps 8
+
+A seeded sparse Hermitian matrix is perturbed by --steps random diagonal changes of --terms
+entries each. After every change, the leaf is updated from the previous state and recomputed
+from scratch; the wall times (seconds), the relative difference of the two leaves and whether
+every level kept its warm root (no cold restart) are printed, then the median speed-up.
+'''
+
+import os
+import sys
+import argparse
+from time import perf_counter
+from statistics import median
+
+import numpy as np
+import scipy as sp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from partialg.sparse.compression import sbd_eigenleafs
+from partialg.sparse.incremental import sbd_state, sbd_update
+
+
+def random_sparse_hermitian(n, density, shift, seed=0):
+    "Seeded sparse Hermitian matrix (csc) shifted by shift times the identity."
+    rng = np.random.default_rng(seed)
+    R   = sp.sparse.random_array((n, n), density=density, format='csc', rng=rng)
+    return sp.sparse.csc_array( R + R.T + shift*sp.sparse.eye_array(n) )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='partialg incremental SBD benchmark')
+    parser.add_argument('--n', type=int, default=256)
+    parser.add_argument('--density', type=float, default=0.05)
+    parser.add_argument('--shift', type=float, default=10.)
+    parser.add_argument('--block-index', default='00')
+    parser.add_argument('--steps', type=int, default=8)
+    parser.add_argument('--terms', type=int, default=3)
+    args = parser.parse_args(argv)
+    #
+    rng  = np.random.default_rng(1)
+    H    = random_sparse_hermitian(args.n, args.density, args.shift)
+    t0   = perf_counter()
+    L, state = sbd_state(H, args.block_index)
+    print(f'state  {perf_counter() - t0:.3f} s')
+    ratios = []
+    for step in range(args.steps):
+        i     = rng.integers(0, args.n, args.terms)
+        delta = sp.sparse.csc_array( (0.1*rng.normal(size=args.terms), (i, i)), shape=H.shape )
+        H     = H + delta
+        t0    = perf_counter()
+        L, state = sbd_update(state, delta)
+        t_update = perf_counter() - t0
+        t0    = perf_counter()
+        F, _  = sbd_eigenleafs(H, args.block_index)
+        t_fresh  = perf_counter() - t0
+        error = abs(L - F).max()/abs(F).max()
+        warm  = state['report']['warm']
+        ratios.append( t_fresh/t_update )
+        print(f'step {step}  update {t_update:.3f} s  fresh {t_fresh:.3f} s  difference {error:.1e}  warm {warm}')
+    print(f'median speed-up {median(ratios):.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+''' Reproducible benchmarks for the inversion and compression kernels.
+
+USAGE (from the repository root)
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --output bench.json --baseline baseline.json
+    python benchmarks/suite.py --quick --save-baseline baseline.json
+
+Every case is run on seeded inputs. Each result records the wall time (minimum and
+median over the repeats, in seconds), the peak traced heap memory of one extra run
+(bytes, measured with tracemalloc; allocations made by XLA outside of NumPy are not
+traced) and an accuracy figure. When a baseline is given, cases whose median time
+grew by more than --time-tol or whose error grew by more than --error-tol are
+reported as regressions and the exit status is 1.
+'''
+
+import os
+import sys
+import json
+import pickle
+import platform
+import argparse
+import tracemalloc
+from time import perf_counter
+from statistics import median
+
+import numpy as np
+import scipy as sp
+import sympy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from partialg.dense.inversion import pinv
+from partialg.sparse.inversion import pinvs
+from partialg.symbolic.inversion import pinvy
+from partialg.dense.compression import sbd_eigenleaf
+from partialg.sparse.compression import sbd_eigenleafs
+from partialg.symbolic.compression import sbd_eigenvaluey, ns_sqrty
+from partialg.database import load_hamiltonian, list_hamiltonians
+
+
+DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database')
+
+
+#==============================================
+# Inputs
+
+def random_hermitian(n, seed=0):
+    "Seeded dense Hermitian positive definite matrix with spectrum in (1, 2)."
+    rng = np.random.default_rng(seed)
+    X   = rng.random((n, n))
+    M   = X @ X.T
+    e   = np.linalg.eigvalsh(M)
+    return (M - e[0]*np.eye(n))/(e[-1] - e[0]) + np.eye(n)
+
+
+def random_sparse_hermitian(n, density, seed=0):
+    "Seeded sparse Hermitian positive definite matrix (csc) with a dominant diagonal."
+    rng = np.random.default_rng(seed)
+    R   = sp.sparse.random_array((n, n), density=density, format='csc', rng=rng)
+    M   = R + R.T
+    return sp.sparse.csc_array( M + sp.sparse.diags_array( abs(M).sum(axis=1) + 1 ) )
+
+
+def load_a1_66():
+    ''' Loads the bundled Hamiltonian as a csc array, from the native store (database/a1_66.pgh, converted from
+    the pickle by partialg.database.convert_pickle), otherwise from the pickle, which needs pennylane.
+    '''
+    if 'a1_66' in list_hamiltonians(DATABASE):
+        return sp.sparse.csc_array( load_hamiltonian('a1_66', root=DATABASE)[0] )
+    with open(os.path.join(DATABASE, 'a1_66.pkl'), 'rb') as f:
+        data = pickle.load(f)
+    return sp.sparse.csc_array( data['H'].sparse_matrix() )
+
+
+def ground_state(M):
+    "Reference lowest eigenvalue of a Hermitian matrix."
+    if sp.sparse.issparse(M):
+        if M.shape[0] <= 2048:
+            M = M.toarray()
+        else:
+            return float( sp.sparse.linalg.eigsh(M, k=1, which='SA')[0][0] )
+    return float( np.linalg.eigvalsh(np.asarray(M))[0] )
+
+
+def leaf_ground_state(L):
+    "Lowest real part of the eigenvalues of an SBD leaf."
+    if sp.sparse.issparse(L):
+        L = L.toarray()
+    return float( np.min( np.linalg.eigvals(np.asarray(L, dtype=complex)).real ) )
+
+
+#==============================================
+# Cases
+
+def inversion_cases(sizes):
+    ''' Full inversion through n diagonal pivots of pinv, pinvs and pinvy.
+    Accuracy is the relative Frobenius distance to numpy.linalg.inv.
+    '''
+    cases = []
+    for n in sizes:
+        M       = random_hermitian(n, seed=n)
+        pivots  = [(i, i) for i in range(n)]
+        ref     = np.linalg.inv(M)
+        #
+        def check(Z, ref=ref):
+            Z = np.array(Z, dtype=float)
+            return float( np.linalg.norm(Z - ref)/np.linalg.norm(ref) )
+        #
+        cases.append( dict(name=f'pinv/dense/n{n}', kernel='pinv', mode='dense', size=n,
+                           run=lambda M=M, p=pivots: pinv(M, *p), check=check) )
+        cases.append( dict(name=f'pinv/sparse/n{n}', kernel='pinvs', mode='sparse', size=n,
+                           run=lambda M=M, p=pivots: pinvs(M, *p), check=check) )
+        if n <= 8:
+            My = sympy.Matrix(M)
+            cases.append( dict(name=f'pinv/symbolic/n{n}', kernel='pinvy', mode='symbolic', size=n,
+                               run=lambda M=My, p=pivots: pinvy(M, *p), check=check) )
+    return cases
+
+
+def compression_cases(dense_sizes, sparse_sizes, densities, depths):
+    ''' sbd_eigenleaf, sbd_eigenleafs and sbd_eigenvaluey across sizes, densities and branch depths.
+    Accuracy is the relative distance between the lowest eigenvalue of the leaf '00...0'
+    and the lowest eigenvalue of the input.
+    '''
+    cases = []
+    for n in dense_sizes:
+        M   = random_hermitian(n, seed=n)
+        ref = ground_state(M)
+        for depth in depths:
+            cases.append( dict(name=f'sbd/dense/n{n}/d{depth}', kernel='sbd_eigenleaf', mode='dense',
+                               size=n, depth=depth,
+                               run=lambda M=M, b='0'*depth: sbd_eigenleaf(M, b)[0],
+                               check=lambda L, ref=ref: abs(leaf_ground_state(L) - ref)/abs(ref)) )
+    for n in sparse_sizes:
+        for density in densities:
+            M   = random_sparse_hermitian(n, density, seed=n)
+            ref = ground_state(M)
+            for depth in depths:
+                cases.append( dict(name=f'sbd/sparse/n{n}/p{density}/d{depth}', kernel='sbd_eigenleafs',
+                                   mode='sparse', size=n, density=density, depth=depth,
+                                   run=lambda M=M, b='0'*depth: sbd_eigenleafs(M, b)[0],
+                                   check=lambda L, ref=ref: abs(leaf_ground_state(L) - ref)/abs(ref)) )
+    #
+    # Symbolic roots keep the free coefficient K, so only time and memory are recorded.
+    # Two Newton iterations keep the expression swell of the 4x4 case within seconds.
+    for n in (2, 4):
+        My = sympy.Matrix( np.round(random_hermitian(n, seed=n), 3) ).applyfunc(sympy.nsimplify)
+        cases.append( dict(name=f'sbd/symbolic/n{n}/d1', kernel='sbd_eigenvaluey', mode='symbolic',
+                           size=n, depth=1,
+                           run=lambda M=My: sbd_eigenvaluey(M, sqrt=lambda a: ns_sqrty(a, max_it=2)),
+                           check=None) )
+    return cases
+
+
+def hamiltonian_cases(depths):
+    "sbd_eigenleafs on the bundled database/a1_66.pkl Hamiltonian."
+    try:
+        H = load_a1_66()
+    except Exception as e:     # pennylane missing or unreadable pickle
+        return [ dict(name='sbd/a1_66', kernel='sbd_eigenleafs', mode='sparse', skipped=repr(e)) ]
+    ref   = ground_state(H)
+    cases = []
+    for depth in depths:
+        cases.append( dict(name=f'sbd/a1_66/d{depth}', kernel='sbd_eigenleafs', mode='sparse',
+                           size=H.shape[0], density=H.nnz/H.shape[0]**2, depth=depth,
+                           run=lambda b='0'*depth: sbd_eigenleafs(H, b)[0],
+                           check=lambda L: abs(leaf_ground_state(L) - ref)/abs(ref)) )
+    return cases
+
+
+#==============================================
+# Measurement
+
+def measure(case, repeats=3):
+    ''' Runs a case once as warm-up (and accuracy check), repeats times for timing
+    and once more under tracemalloc for peak memory.
+    '''
+    out = {k: v for k, v in case.items() if k not in ('run', 'check')}
+    if 'skipped' in case:
+        out['status'] = 'skipped'
+        return out
+    #
+    run    = case['run']
+    result = run()
+    out['error'] = None if case['check'] is None else float( case['check'](result) )
+    del result
+    #
+    times = []
+    for i in range(repeats):
+        t0 = perf_counter()
+        run()
+        times.append( perf_counter() - t0 )
+    #
+    tracemalloc.start()
+    run()
+    out['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    #
+    out.update( time_min=min(times), time_median=median(times), repeats=repeats, status='ok' )
+    return out
+
+
+def environment():
+    "Versions and machine description stored with every result file."
+    import jax
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'scipy': sp.__version__,
+            'jax': jax.__version__, 'sympy': sympy.__version__, 'machine': platform.machine(),
+            'processor': platform.processor(), 'system': platform.system(), 'cpus': os.cpu_count()}
+
+
+def run_suite(quick=False, repeats=3, select=None):
+    ''' Runs all cases and returns the results as a JSON-serializable dict.
+    quick <bool> : smaller sizes for smoke testing.
+    select <str> : only run cases whose name contains this substring.
+    '''
+    if quick:
+        cases = ( inversion_cases([4, 8])
+                + compression_cases([64, 256], [256], [0.01], [1, 2])
+                + hamiltonian_cases([1]) )
+    else:
+        cases = ( inversion_cases([4, 8, 16])
+                + compression_cases([64, 256, 1024], [256, 1024], [0.01, 0.05], [1, 2, 3])
+                + hamiltonian_cases([1, 2, 3]) )
+    if select is not None:
+        cases = [c for c in cases if select in c['name']]
+    #
+    results = []
+    for case in cases:
+        r = measure(case, repeats=repeats)
+        print(f"{r['name']:40s} {r['status']:8s} "
+              + (f"{r['time_median']:10.4f} s  {r['peak_bytes']/2**20:9.2f} MiB  error={r['error']}" if r['status'] == 'ok' else ''))
+        results.append(r)
+    #
+    return {'environment': environment(), 'quick': quick, 'results': results}
+
+
+def compare(current, baseline, time_tol=0.25, error_tol=1.0):
+    ''' Flags regressions of current against baseline (both as returned by run_suite).
+    A case regresses when time_median > (1+time_tol)*baseline time_median,
+    or when error > (1+error_tol)*baseline error + 1e-12.
+    OUTPUT
+        list of dicts with name, kind ('time' or 'error'), current and baseline values.
+    '''
+    base        = {r['name']: r for r in baseline['results'] if r.get('status') == 'ok'}
+    regressions = []
+    for r in current['results']:
+        b = base.get(r['name'])
+        if b is None or r.get('status') != 'ok':
+            continue
+        if r['time_median'] > (1 + time_tol)*b['time_median']:
+            regressions.append( {'name': r['name'], 'kind': 'time',
+                                 'current': r['time_median'], 'baseline': b['time_median']} )
+        if r['error'] is not None and b['error'] is not None:
+            if r['error'] > (1 + error_tol)*b['error'] + 1e-12:
+                regressions.append( {'name': r['name'], 'kind': 'error',
+                                     'current': r['error'], 'baseline': b['error']} )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='partialg benchmark suite')
+    parser.add_argument('--output', default=None, help='write results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='compare against this JSON file')
+    parser.add_argument('--save-baseline', default=None, help='write results as a new baseline')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--select', default=None, help='substring of case names to run')
+    parser.add_argument('--time-tol', type=float, default=0.25)
+    parser.add_argument('--error-tol', type=float, default=1.0)
+    args = parser.parse_args(argv)
+    #
+    current = run_suite(quick=args.quick, repeats=args.repeats, select=args.select)
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(current, f, indent=1)
+    #
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), time_tol=args.time_tol, error_tol=args.error_tol)
+        for r in regressions:
+            print(f"REGRESSION {r['kind']:5s} {r['name']}: {r['current']:.4g} (baseline {r['baseline']:.4g})")
+        if len(regressions) > 0:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
@@ -0,0 +1,271 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Memory-budgeted SBD levels for sbd_eigenleaf and sbd_eigenleafs (memory_budget option).
+
+Before each level, its peak memory is estimated for the strategies below, and the first one that fits the
+budget is used:
+    'sparse' : sbd_eigenvalues, sparse inputs only. Its fill-in is not known in advance: the estimate is the
+               input size times the ratio of peak to input size measured in the previous sparse level
+               (FILL for the first one), capped by the peak of completely filled blocks (FULL of them).
+    'lean'   : dense NumPy level (float64/complex128) that solves with the first block instead of inverting
+               it, updates in place, computes only the root of block_index and frees its input (when the
+               caller does not hold it) as soon as t and s = t t - 4 d are formed. Peak: 8 k x k blocks plus
+               the input while it is held.
+    'ooc'    : dense.outofcore.sbd_eigenvalue_ooc, with the budget left after the input as tile memory.
+The peak of every level (bytes allocated through NumPy, traced with tracemalloc, plus the input held in
+memory) is reported with the estimate, so budgets can be checked against what the levels really used.
+'''
+
+from time import perf_counter
+import tracemalloc
+
+import numpy as np
+from numpy.linalg import solve, LinAlgError
+from scipy.sparse import issparse, csr_array
+
+from .instrument import stage, emit
+
+
+FILL = 64.      # Assumed peak/input ratio of the first sparse level
+FULL = 24       # Completely filled sparse k x k matrices alive at the peak of a sparse level
+
+
+def parse_budget(memory_budget):
+    "Bytes from an int or a string such as '512M', '16G' (see runner.parse_memory)."
+    from .runner import parse_memory
+    return parse_memory(memory_budget)
+
+
+def nbytes(a):
+    "Bytes of a held in memory: 0 for memory-mapped arrays, data and indices for sparse ones."
+    if a is None or isinstance(a, np.memmap):
+        return 0
+    if issparse(a):
+        return int( a.data.nbytes + a.indices.nbytes + a.indptr.nbytes )
+    return int(a.nbytes)
+
+
+def estimates(a, held, fill=FILL):
+    ''' Estimated peak bytes of one level of a for each strategy.
+    held <bool>: True if the input stays referenced elsewhere (level 0, or levels recorded by the caller).
+    OUTPUT
+        dict strategy -> bytes ('sparse' only for sparse a).
+    '''
+    k     = a.shape[0]//2
+    dtype = np.result_type(a.dtype, np.float64)
+    q     = k*k*np.dtype(dtype).itemsize         # One k x k block
+    size  = nbytes(a)
+    copy  = 4*q if (issparse(a) or a.dtype != dtype) else 0       # Dense float64 copy made by the lean level
+    out   = {}
+    if issparse(a):
+        out['sparse'] = int( min( fill*size, FULL*k*k*(np.dtype(dtype).itemsize + a.indices.itemsize) ) )
+    # Input (and its copy) with four blocks until s is formed, then t, s and three Newton matrices
+    out['lean'] = int( max( size + copy + 4*q, (size if held else 0) + 5*q ) )
+    return out
+
+
+def lean_level(box, index, max_it=6, k_pow=1/4):
+    ''' One SBD level computing only L_index, with solves instead of the inverse of the first block and
+    in-place updates (see module docstring).
+    box <list>: [a], emptied here so that a is freed early if the caller holds no other reference to it.
+    OUTPUT
+        L_index <np.array>
+    '''
+    a     = box.pop()
+    dtype = np.result_type(a.dtype, np.float64)
+    a     = a.toarray() if issparse(a) else np.asarray(a)
+    a     = a.astype(dtype, copy=False)
+    k     = a.shape[0]//2
+    A, B  = a[:k, :k], a[:k, k:]
+    C, D  = a[k:, :k], a[k:, k:]
+    t     = A + D            # Block-trace
+    try:                     # Block-determinant A D - A C A^-1 B, with a solve
+        with stage('determinant', n=k, flops=(2/3 + 6)*k**3, method='solve'):
+            X  = solve(A, B)
+            Y  = C @ X
+            del X
+            d  = A @ D
+            d -= A @ Y
+            del Y
+    except LinAlgError as e:        # Without inverse of A
+        print('NOTE: Used singular matrix method.')
+        emit('fallback', stage='inverse', method='singular', reason=repr(e))
+        with stage('determinant', n=k, flops=4*k**3):
+            d  = A @ D
+            d -= C @ B
+    s  = t @ t
+    d *= 4
+    s -= d
+    del d, A, B, C, D, a     # The input is freed here unless the caller holds it
+    #
+    with stage('sqrt', n=k, flops=(8/3)*max_it*k**3, method='solve'):
+        X = np.trace(s)**k_pow * np.eye(k, dtype=np.result_type(dtype, np.trace(s)**k_pow))    # Initial guess
+        for i in range(max_it):
+            Y  = solve(X, s)        # X^-1 s = s X^-1: the iterates are polynomials in s
+            X += Y
+            X *= 0.5
+            del Y
+    del s
+    if index == 0:
+        t -= X
+    else:
+        t += X
+    t *= 0.5
+    return t
+
+
+class Meter:
+    "Peak of the NumPy memory allocated inside a with block, through tracemalloc."
+
+    def __enter__(self):
+        self.started = not tracemalloc.is_tracing()
+        if self.started:
+            tracemalloc.start()
+        self.start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, *exc):
+        self.peak = max( 0, tracemalloc.get_traced_memory()[1] - self.start )
+        if self.started:
+            tracemalloc.stop()
+        return False
+
+
+def budget_level(box, index, budget, held, state):
+    ''' One level of sbd_eigenleaf(s) under a memory budget.
+    PARAMETERS
+        box <list>   : [a], the level input (np.array, memmap or sparse array); see lean_level.
+        index <int>  : 0 or 1.
+        budget <int> : bytes.
+        held <bool>  : see estimates.
+        state <dict> : 'fill', the measured peak/input ratio of the last sparse level, and 'ws', the
+                       dense.outofcore.Workspace of the 'ooc' levels (created on first use).
+    OUTPUT
+        L_index, info <dict> with 'strategy', 'estimate' and 'peak' (bytes).
+    '''
+    a    = box[0]
+    est  = estimates(a, held, state.get('fill', FILL))
+    size = nbytes(a)
+    if 'sparse' in est and est['sparse'] <= budget:
+        strategy = 'sparse'
+    elif est['lean'] <= budget:
+        strategy = 'lean'
+    else:
+        strategy = 'ooc'
+    #
+    with Meter() as m:
+        if strategy == 'sparse':
+            from .sparse.compression import sbd_eigenvalues
+            L = sbd_eigenvalues(a)[index]
+        elif strategy == 'lean':
+            del a
+            L = lean_level(box, index)
+        else:
+            box.clear()
+            from .dense.outofcore import Workspace, sbd_eigenvalue_ooc
+            if state.get('ws') is None:
+                state['ws'] = Workspace()
+            if issparse(a) or (not held and size > 0):       # Move the input out of memory first, by stripes
+                x = state['ws'].new(a.shape, np.result_type(a.dtype, np.float64))
+                r = csr_array(a) if issparse(a) else a
+                h = max(1, a.shape[0]//16)
+                for i in range(0, a.shape[0], h):
+                    x[i:i+h] = r[i:i+h].toarray() if issparse(r) else np.asarray(r[i:i+h])
+                del r
+                a, size = x, size if held else 0
+            memory = budget - size if budget - size > budget//4 else budget//4
+            if size > budget:
+                print(f'NOTE: level input of {size} bytes alone exceeds memory_budget of {budget} bytes.')
+            L = sbd_eigenvalue_ooc(a, state['ws'], memory=memory, index=index)[index]
+            est['ooc'] = size + memory
+    peak = m.peak + size
+    if strategy == 'sparse' and size > 0:
+        state['fill'] = max( 1., peak/size )
+    return L, {'strategy': strategy, 'estimate': est[strategy], 'peak': peak}
+
+
+def finish(L, state, budget):
+    ''' Leaf of a budgeted run: loaded in memory if it fits the budget, otherwise left memory-mapped in the
+    workspace, which is otherwise deleted.
+    OUTPUT
+        leaf, workdir <str or None>
+    '''
+    ws = state.get('ws')
+    if ws is None:
+        return L, None
+    if isinstance(L, np.memmap) and L.nbytes > budget:
+        return L, ws.path
+    L = np.array(L)
+    ws.close()
+    return L, None
+
+
+def sbd_eigenleaf_budget(M, block_index='0', memory_budget=2**30):
+    ''' sbd_eigenleaf / sbd_eigenleafs with every level run by budget_level.
+    PARAMETERS
+        M                : np.array, memmap or sparse array.
+        memory_budget    : bytes, or a string such as '16G'.
+    OUTPUT
+        leaf, report <dict> with 'time' (minutes), 'memory' ('budget', and per level 'strategy', 'estimate' and
+        'peak' in bytes) and 'workdir' if the leaf is left memory-mapped (see finish).
+    '''
+    t0     = perf_counter()
+    budget = parse_budget(memory_budget)
+    if 2**(len( block_index )-1) >= M.shape[0]:
+        print(f'ABORTED: block_index is {int( len( block_index ) - np.log2(M.shape[0]) )  } indices too large.')
+        return None, {'time': [0, ]}
+    #
+    state, L, t = {}, M, [0, ]
+    memory = {'budget': budget, 'strategy': [], 'estimate': [], 'peak': []}
+    for i in range( len(block_index) ):
+        n       = L.shape[0]
+        box, L  = [L], None                 # Only box references the input of the level
+        L, info = budget_level(box, int(block_index[i]), budget, i == 0, state)
+        for key in ('strategy', 'estimate', 'peak'):
+            memory[key].append( info[key] )
+        t.append( (perf_counter()-t0)/60. )
+        emit('level', level=i, index=block_index[i], n=n, duration=(t[-1]-t[-2])*60., strategy=info['strategy'],
+             peak_bytes=info['peak'])
+        if info['peak'] > budget:
+            print(f"NOTE: level {i} used {info['peak']} bytes, over memory_budget of {budget} bytes.")
+    #
+    L, workdir = finish(L, state, budget)
+    report = {'time':t, 'memory':memory}    # Time is in minutes
+    if workdir is not None:
+        report['workdir'] = workdir
+    return L, report
@@ -0,0 +1,263 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Content-addressed disk cache for SBD branches and leaves.
+
+Each compressed level is stored under the hash of the input matrix data, the block_index prefix
+that produced it, the backend ('dense' or 'sparse') and the settings of the square root and of the
+branch function. A request for '0001' after '000' was cached loads the '000' leaf and runs only the
+last level. The cache keeps its total size under a budget by evicting least recently used entries.
+'''
+
+import os
+import json
+import inspect
+from hashlib import sha256
+from time import perf_counter
+
+import numpy as np
+from scipy.sparse import issparse, csr_array, csc_array, save_npz, load_npz
+
+
+FORMAT = 1      # Bump to invalidate all entries written by older versions
+
+
+def default_root():
+    "$PARTIALG_CACHE_DIR/results, or ~/.cache/partialg/results."
+    root = os.environ.get('PARTIALG_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'partialg'))
+    return os.path.join(root, 'results')
+
+
+def matrix_hash(M):
+    "sha256 of the shape, dtype and values of a dense or scipy sparse matrix."
+    h = sha256()
+    if issparse(M):
+        M = csr_array(M, copy=True)
+        M.sum_duplicates()
+        h.update( b'sparse' + str((M.shape, M.dtype.str)).encode() )
+        for a in (M.indptr.astype(np.int64), M.indices.astype(np.int64), M.data):
+            h.update( np.ascontiguousarray(a).tobytes() )
+    else:
+        M = np.ascontiguousarray( np.asarray(M) )
+        h.update( b'dense' + str((M.shape, M.dtype.str)).encode() )
+        h.update( M.tobytes() )
+    return h.hexdigest()
+
+
+def _sqrt_settings(mode):
+    "Default parameters of the square root used by the backend, part of every key."
+    if mode == 'dense':
+        from .dense.compression import ns_sqrt as sqrt
+    else:
+        from .sparse.compression import ns_sqrts as sqrt
+    return {k: p.default for k, p in inspect.signature(sqrt).parameters.items() if p.default is not p.empty}
+
+
+class ResultCache:
+    ''' LRU-evicted disk cache of compressed matrices.
+    PARAMETERS
+        root <str>     : cache directory (default: default_root()).
+        max_bytes <int>: size budget. Least recently used entries are deleted above it.
+    '''
+
+    def __init__(self, root=None, max_bytes=2**30):
+        self.root      = default_root() if root is None else root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, digest, prefix, mode, settings):
+        "Key of the level reached by block_index prefix from the matrix with hash digest."
+        raw = json.dumps( [FORMAT, digest, prefix, mode, _sqrt_settings(mode), settings], sort_keys=True, default=str )
+        return sha256( raw.encode() ).hexdigest()
+
+    def _path(self, key):
+        for ext in ('.npy', '.npz'):
+            path = os.path.join(self.root, key + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, key):
+        "Cached matrix or None. A hit marks the entry as recently used."
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            os.utime(path)
+            return load_npz(path).tocsc() if path.endswith('.npz') else np.load(path)
+        except (FileNotFoundError, ValueError, OSError):    # Evicted or partially written by another process
+            return None
+
+    def put(self, key, L):
+        "Stores L (dense or scipy sparse) atomically, then evicts down to max_bytes."
+        if issparse(L):
+            tmp, path = os.path.join(self.root, key + '.tmp.npz'), os.path.join(self.root, key + '.npz')
+            save_npz(tmp, csc_array(L))
+        else:
+            tmp, path = os.path.join(self.root, key + '.tmp.npy'), os.path.join(self.root, key + '.npy')
+            np.save(tmp, np.asarray(L))
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        "List of (path, size, last use) of all entries."
+        out = []
+        for name in os.listdir(self.root):
+            if '.tmp.' in name:
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            out.append( (path, st.st_size, st.st_mtime) )
+        return out
+
+    def size(self):
+        "Total size of the entries in bytes."
+        return sum( e[1] for e in self.entries() )
+
+    def evict(self):
+        "Deletes least recently used entries until the cache fits max_bytes."
+        entries = sorted( self.entries(), key=lambda e: e[2] )
+        total   = sum( e[1] for e in entries )
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        "Deletes all entries."
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_default_cache = []
+
+
+def get_cache():
+    "Process-wide ResultCache in default_root(), created on first use."
+    if len(_default_cache) == 0:
+        _default_cache.append( ResultCache() )
+    return _default_cache[0]
+
+
+def _branch_function(mode):
+    if mode == 'dense':
+        from .dense.compression import sbd_eigenbranch
+        return sbd_eigenbranch
+    elif mode == 'sparse':
+        from .sparse.compression import sbd_eigenbranchs
+        return sbd_eigenbranchs
+    raise Warning("ABORTED. Only dense or sparse are supported.")
+
+
+def cached_eigenbranch(M, block_index='0', only_even=False, mode='dense', cache=None, **kwargs):
+    ''' Cached sbd_eigenbranch (mode='dense') or sbd_eigenbranchs (mode='sparse').
+    Levels reached by the longest cached prefix of block_index are loaded, the remaining ones computed and stored.
+    kwargs are passed to the branch function and are part of the cache key.
+    OUTPUT
+        L <list>, report <dict>: as the branch function. report['cache'] counts loaded and computed levels.
+    '''
+    cache  = get_cache() if cache is None else cache
+    branch = _branch_function(mode)
+    t0     = perf_counter()
+    digest = matrix_hash(M)
+    keys   = [ cache.key(digest, block_index[:p], mode, kwargs) for p in range(1, len(block_index)+1) ]
+    #
+    L = [M, ]
+    for key in keys:            # Longest prefix whose levels are all cached
+        leaf = cache.get(key)
+        if leaf is None:
+            break
+        L.append(leaf)
+    hits = len(L) - 1
+    t    = [ (perf_counter()-t0)/60. ]*len(L)
+    t[0] = 0
+    #
+    report = {}
+    if hits < len(block_index):
+        new, report = branch(L[-1], block_index[hits:], **kwargs)
+        if new is None:
+            return None, report
+        for key, leaf in zip(keys[hits:], new[1:]):
+            cache.put(key, leaf)
+        L += new[1:]
+        t += [ t[-1] + dt for dt in report['time'][1:] ]
+    #
+    if only_even == True:
+        L = [L[i] for i in range(0,len(L),2)]
+        t = [t[i] for i in range(0, len(t), 2)]
+    report = dict(report, time=t, cache={'loaded': hits, 'computed': len(block_index) - hits})    # Time is in minutes
+    return L, report
+
+
+def cached_eigenleaf(M, block_index='0', mode='dense', cache=None, **kwargs):
+    ''' Cached sbd_eigenleaf (mode='dense') or sbd_eigenleafs (mode='sparse').
+    Starts from the leaf of the longest cached prefix of block_index. Only the final leaf is stored.
+    OUTPUT
+        leaf, report <dict>: as the leaf function. report['cache'] counts loaded and computed levels.
+    '''
+    cache  = get_cache() if cache is None else cache
+    if mode == 'dense':
+        from .dense.compression import sbd_eigenleaf as leaf_function
+    elif mode == 'sparse':
+        from .sparse.compression import sbd_eigenleafs as leaf_function
+    else:
+        raise Warning("ABORTED. Only dense or sparse are supported.")
+    #
+    t0     = perf_counter()
+    digest = matrix_hash(M)
+    start, hits = M, 0
+    for p in range(len(block_index), 0, -1):
+        leaf = cache.get( cache.key(digest, block_index[:p], mode, kwargs) )
+        if leaf is not None:
+            start, hits = leaf, p
+            break
+    #
+    report = {'time': [0, (perf_counter()-t0)/60.]}
+    if hits < len(block_index):
+        start, report = leaf_function(start, block_index[hits:], **kwargs)
+        cache.put( cache.key(digest, block_index, mode, kwargs), start )
+    report['cache'] = {'loaded': hits, 'computed': len(block_index) - hits}
+    return start, report
@@ -34,11 +34,31 @@
 
 def pinv(M, *args, **kwargs):
     ''' Partial inversion algorithm
-    M: numpy ndarray of floats or of sympy symbols.
-    args: tuple of matrix indices. E.g.: (0,0), (1,2).
+    M: numpy ndarray of floats or of sympy symbols, or a Kronecker product (KronOperator or list of factors).
+    args: tuple of matrix indices. E.g.: (0,0), (1,2). Multi-indices for Kronecker products, e.g. ((0,1),(1,1)).
+    mode <str>: 'auto' (default), 'dense', 'symbolic', 'kronecker' or 'sparse'. 'auto' sends sympy inputs to
+                pinvy, Kronecker products to partialg.dense.kronecker.pinvk and numeric ones (scipy sparse
+                densified) to the dense engine, see partialg.dispatch.
+    info <dict>: if given, filled with the 'engine' used, the 'reason' and the input 'features'.
     # COMMENT: For ndarrays with more than 2 axes, only the first two are considered.
     '''
-    mode = kwargs.get('mode', 'sparse')
+    mode = kwargs.get('mode', 'auto')
+    info = kwargs.get('info', None)
+    if mode == 'auto':
+        from .dispatch import choose_pinv
+        choice = choose_pinv(M)
+        if info is not None:
+            info.update(choice)
+        if choice['engine'] == 'symbolic':
+            from .symbolic.inversion import pinvy
+            return pinvy(M, *args)
+        if choice['engine'] == 'kronecker':
+            from .dense.kronecker import pinvk
+            return pinvk(M, *args)
+        from .dense.inversion import pinv
+        return pinv(M.toarray() if hasattr(M, 'toarray') else M, *args)
+    if info is not None:
+        info.update(engine=mode, reason='mode given by the caller.')
     if mode == 'dense':
         from .dense.inversion import pinv
         return pinv(M, *args)
@@ -46,6 +66,9 @@ def pinv(M, *args, **kwargs):
         # Yes, it's the same as for 'dense'
         from .dense.inversion import pinv 
         return pinv(M, *args)
+    elif mode == 'kronecker':
+        from .dense.kronecker import pinvk
+        return pinvk(M, *args)
     elif mode == 'sparse':
         raise Warning('ABORTED. Sparse partial inversion not currently supported.')
     else:
@@ -55,24 +78,36 @@ def pinv(M, *args, **kwargs):
 def sbd(a, **kwargs):
     ''' Matrix-polynomial root via Sridhara-based Block Diagonalization method.
     PARAMETERS
-        a            : matrix to take block-Bhaskara of. Accepts np.array or scipy sparse array.
-        srt <np.array>: function to compute matrix square root
+        a            : matrix to take block-Bhaskara of. Accepts np.array, scipy sparse array, LinearOperator,
+                       sympy Matrix, partialg.pauli.PauliSum or a stack of shape (batch, n, n).
+        mode <str>   : 'sparse' (default), 'dense', 'batched', 'symbolic', 'pauli' or 'auto'. 'auto' picks the engine
+                       with the lowest predicted cost for the input's kind, size and density (see partialg.dispatch;
+                       run partialg.dispatch.calibrate() once to fit the cost model to this machine); the format of
+                       its result follows the engine (jax array for 'dense', sparse array for 'sparse').
+        info <dict>  : if given, filled with the 'engine' used, the 'reason', the input 'features' and the cost
+                       'estimates' (seconds).
+        Other keyword arguments (e.g. sqrt, precision, drop_tol) are passed to the engine; 'auto' only considers
+        engines that accept them.
     OUTPUT
-        <np.array>
+        (L0, L1)
     '''
-    mode = kwargs.get('mode', 'sparse')
+    mode   = kwargs.pop('mode', 'sparse')
+    info   = kwargs.pop('info', None)
+    engine = {'sparse': 'sparse', 'dense': 'dense', 'batched': 'batched', 'symbolic': 'symbolic', 'pauli': 'pauli'}.get(mode, None)
     #
-    if mode == 'sparse':
-        from .sparse.compression import sbd_eigenvalues
-        return sbd_eigenvalues(a)
-    elif mode == 'dense':
-        from .dense.compression import sbd_eigenvalue
-        return sbd_eigenvalue(a)
-    elif mode == 'symbolic':
-        from .symbolic.compression import sbd_eigenvaluey
-        return sbd_eigenvaluey(a)
+    if mode == 'auto':
+        from .dispatch import choose_sbd
+        choice = choose_sbd(a, **kwargs)
+        engine = choice['engine']
+        if info is not None:
+            info.update(choice)
+    elif info is not None:
+        info.update(engine=mode, reason='mode given by the caller.')
+    if engine is not None:
+        from .dispatch import run_sbd
+        return run_sbd(a, engine, **kwargs)
     else:
-        raise Warning("ABORTED. Only sparse, dense or symbolic are supported.")
+        raise Warning("ABORTED. Only auto, sparse, dense, batched, symbolic or pauli are supported.")
 
 
 #
@@ -0,0 +1,263 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Native Hamiltonian store for the database folder.
+
+FORMAT (version 1, extension .pgh)
+    bytes 0-7    : magic b'PARTIALG'
+    bytes 8-11   : format version <uint32, little endian>
+    bytes 12-15  : length L of the JSON header <uint32, little endian>
+    bytes 16-16+L: JSON header with shape, nnz, dtypes, byte offsets of the CSR arrays and user metadata
+    then the CSR arrays indptr, indices and data, each starting at a 64-byte aligned offset.
+
+Arrays are read with numpy.memmap, so opening a Hamiltonian copies nothing and processes that open the
+same file share its pages. catalog.json in the same folder indexes all entries and their metadata.
+'''
+
+import os
+import json
+import struct
+import pickle
+
+import numpy as np
+from scipy.sparse import csr_array, issparse
+
+
+DATABASE = os.path.join( os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database' )
+MAGIC    = b'PARTIALG'
+VERSION  = 1
+ALIGN    = 64
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _read_catalog(root):
+    path = os.path.join(root, 'catalog.json')
+    if not os.path.exists(path):
+        return {'format': 'partialg-hamiltonian', 'version': VERSION, 'entries': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_catalog(root, catalog):
+    path = os.path.join(root, 'catalog.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(catalog, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def write_hamiltonian(path, H, **metadata):
+    ''' Writes matrix H to a .pgh file.
+    H <array-like>: scipy sparse array/matrix or dense 2D array. Stored as CSR.
+    metadata      : JSON-serializable values stored in the header (e.g. n_qubits, molecule, basis).
+    OUTPUT
+        header <dict>
+    '''
+    H = csr_array(H) if issparse(H) else csr_array( np.asarray(H) )
+    H.sum_duplicates()
+    idx = np.int32 if max(H.shape[1], H.nnz) < 2**31 else np.int64   # Same index dtype scipy picks
+    arrays = {'indptr': H.indptr.astype(idx), 'indices': H.indices.astype(idx), 'data': H.data}
+    #
+    header = {'shape': list(H.shape), 'nnz': int(H.nnz), 'metadata': metadata, 'arrays': {}}
+    # Offsets depend on the header length, which depends on the offsets: iterate until stable.
+    size = 0
+    while True:
+        offset = _aligned( 16 + size )
+        for key, a in arrays.items():
+            header['arrays'][key] = {'dtype': a.dtype.str, 'length': int(a.shape[0]), 'offset': offset}
+            offset = _aligned( offset + a.nbytes )
+        raw = json.dumps(header).encode()
+        if len(raw) <= size:
+            break
+        size = len(raw) + 32
+    raw = raw.ljust(size)
+    #
+    with open(path, 'wb') as f:
+        f.write( MAGIC + struct.pack('<II', VERSION, size) + raw )
+        for key, a in arrays.items():
+            f.seek( header['arrays'][key]['offset'] )
+            f.write( np.ascontiguousarray(a).tobytes() )
+    return header
+
+
+def read_hamiltonian(path, mmap=True):
+    ''' Opens a .pgh file.
+    mmap <bool>: if True, the CSR arrays are read-only memory maps of the file (no copy),
+                 otherwise they are read into memory.
+    OUTPUT
+        H <scipy.sparse.csr_array>, metadata <dict>
+    '''
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+        if magic != MAGIC:
+            raise Warning(f'ABORTED. {path} is not a partialg Hamiltonian file.')
+        version, size = struct.unpack('<II', f.read(8))
+        if version > VERSION:
+            raise Warning(f'ABORTED. {path} has format version {version}, newer than supported version {VERSION}.')
+        header = json.loads( f.read(size) )
+    #
+    arrays = {}
+    for key, a in header['arrays'].items():
+        if a['length'] == 0:        # Empty matrix: nothing to map, and mmap rejects zero-length maps at EOF
+            arrays[key] = np.empty(0, dtype=np.dtype(a['dtype']))
+        elif mmap:
+            arrays[key] = np.memmap(path, dtype=np.dtype(a['dtype']), mode='r', offset=a['offset'], shape=(a['length'],))
+        else:
+            arrays[key] = np.fromfile(path, dtype=np.dtype(a['dtype']), count=a['length'], offset=a['offset'])
+    H = csr_array( (arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(header['shape']), copy=False )
+    H.has_sorted_indices = True
+    return H, header['metadata']
+
+
+def save_hamiltonian(H, name, root=DATABASE, **metadata):
+    ''' Stores H as root/<name>.pgh and adds it to the catalog of root.
+    n_qubits is filled in from the shape when it is a power of 2 and not given.
+    '''
+    if 'n_qubits' not in metadata and H.shape[0] > 0 and H.shape[0] & (H.shape[0] - 1) == 0:
+        metadata['n_qubits'] = H.shape[0].bit_length() - 1
+    os.makedirs(root, exist_ok=True)
+    header  = write_hamiltonian( os.path.join(root, name + '.pgh'), H, **metadata )
+    catalog = _read_catalog(root)
+    catalog['entries'][name] = dict( metadata, file=name + '.pgh', shape=header['shape'], nnz=header['nnz'],
+                                     dtype=header['arrays']['data']['dtype'] )
+    _write_catalog(root, catalog)
+
+
+def load_hamiltonian(name, root=DATABASE, mmap=True):
+    ''' Opens the catalog entry name of root (see read_hamiltonian).
+    OUTPUT
+        H <scipy.sparse.csr_array>, metadata <dict>
+    '''
+    entries = _read_catalog(root)['entries']
+    if name not in entries:
+        raise Warning(f'ABORTED. {name} is not in the catalog of {root}.')
+    return read_hamiltonian( os.path.join(root, entries[name]['file']), mmap=mmap )
+
+
+def list_hamiltonians(root=DATABASE, **selection):
+    ''' Lists catalog entries, optionally only those whose metadata match selection.
+    EXAMPLE
+        list_hamiltonians(n_qubits=12)
+    OUTPUT
+        dict name -> catalog entry
+    '''
+    entries = _read_catalog(root)['entries']
+    return {name: e for name, e in entries.items()
+            if all( e.get(key) == value for key, value in selection.items() )}
+
+
+class _PennylaneUnpickler(pickle.Unpickler):
+    ''' Reads pickled pennylane operators without pennylane: every pennylane class becomes a placeholder that
+    keeps its pickled state, and PauliSentence/PauliWord become dicts (keyed by identity, as they are filled
+    after being used as keys).
+    '''
+    def find_class(self, module, name):
+        if module.split('.')[0] != 'pennylane':
+            return super().find_class(module, name)
+        base = _PennylaneDict if name in ('PauliSentence', 'PauliWord') else _PennylaneObject
+        return type(name, (base, ), {})
+
+
+class _PennylaneObject:
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __setstate__(self, state):
+        self.state = state
+
+
+class _PennylaneDict(dict):
+    __hash__ = object.__hash__
+
+    def __eq__(self, other):
+        return self is other
+
+    def __setstate__(self, state):
+        self.state = state
+
+
+def _pennylane_sparse(H):
+    ''' Sparse matrix of an unpickled pennylane operator from its Pauli representation ('_pauli_rep'), with
+    the wire order of the operator (first wire = most significant bit), as H.sparse_matrix() in pennylane.
+    '''
+    from .pauli import PauliSum
+    rep = H.state.get('_pauli_rep') if isinstance(H.state, dict) else None
+    if rep is None:
+        raise Warning('ABORTED. The pickled operator has no Pauli representation: convert it with pennylane installed.')
+    wires = list( H.state['_wires'].state['_labels'] )
+    strings, coeffs = [], []
+    for word, c in rep.items():
+        s = ['I']*len(wires)
+        for wire, p in word.items():
+            s[ wires.index(wire) ] = p
+        strings.append( ''.join(s) )
+        coeffs.append( c )
+    return PauliSum.from_strings(strings, np.array(coeffs)).to_sparse()
+
+
+def convert_pickle(path, name=None, root=DATABASE, key='H', **metadata):
+    ''' Converts a pickled dataset such as database/a1_66.pkl to the native store.
+    data[key] must provide sparse_matrix() (pennylane operators) or be a matrix. Without pennylane, pennylane
+    operators are rebuilt from their pickled Pauli representation. JSON-serializable entries of data other than
+    key (e.g. qubits, basis, hf_state) are kept as metadata, prefixed by 'pickle_' where they would clash with
+    the arguments of save_hamiltonian; real matrices stored as complex are stored as real.
+    '''
+    with open(path, 'rb') as f:
+        try:
+            data = pickle.load(f)
+        except ModuleNotFoundError:         # Pickle of pennylane objects, pennylane missing
+            f.seek(0)
+            data = _PennylaneUnpickler(f).load()
+    H = data[key]
+    if isinstance(H, _PennylaneObject):
+        H = _pennylane_sparse(H)
+    elif hasattr(H, 'sparse_matrix'):
+        H = H.sparse_matrix()
+    H = csr_array(H) if issparse(H) else csr_array( np.asarray(H) )
+    if np.iscomplexobj(H.data) and not np.imag(H.data).any():
+        H = H.real
+    #
+    for k, value in data.items():
+        value = value.tolist() if isinstance(value, np.ndarray) else value
+        k = 'pickle_' + k if k in ('H', 'name', 'root', 'source') else k
+        if k != key and k not in metadata and isinstance(value, (str, int, float, list)):
+            metadata[k] = value
+    if name is None:
+        name = os.path.splitext( os.path.basename(path) )[0]
+    save_hamiltonian( H, name, root=root, source=os.path.basename(path), **metadata )
+    return name
@@ -0,0 +1,189 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Batched dense SBD over stacks of same-shaped matrices, shape (batch, n, n).
+
+Every level runs the block split, inverse, determinant and Newton square root once for the whole stack with
+NumPy's batched linear algebra (float64/complex128), so small matrices are not limited by Python overhead.
+Items whose first block is singular fall back, individually, to the determinant without inverse, as
+sbd_eigenvalue does. With jit=True the levels run instead through jax.vmap of sbd_eigenvalue_jit.
+'''
+
+from time import perf_counter
+
+import numpy as np
+from numpy.linalg import inv, LinAlgError
+
+from ..instrument import stage, emit
+
+
+def ns_sqrt_batched(a, max_it = 6, k_pow = 1/4):
+    "Newton-Schulz matrix root expansion of each matrix of the stack a."
+    A = a.trace(axis1=-2, axis2=-1)[:, None, None]**k_pow * np.eye(a.shape[-1])   # Initial guesses
+    for i in range(max_it):
+        A = 0.5*(A + a @ inv(A) )
+    return A
+
+
+def _inverse(A):
+    ''' Batched inverse of A, with NaN for the singular items.
+    OUTPUT
+        A_ <array>, singular <array(bool)>
+    '''
+    try:
+        return inv(A), np.zeros(A.shape[0], dtype=bool)
+    except LinAlgError:             # Locate the singular items
+        A_       = np.full(A.shape, np.nan, dtype=np.result_type(A, float))
+        singular = np.zeros(A.shape[0], dtype=bool)
+        for i in range(A.shape[0]):
+            try:
+                A_[i] = inv(A[i])
+            except LinAlgError:
+                singular[i] = True
+        return A_, singular
+
+
+def sbd_eigenvalue_batched(a, sqrt = ns_sqrt_batched):
+    ''' sbd_eigenvalue for each matrix of the stack a.
+    PARAMETERS
+        a <array>       : shape (batch, n, n), n even.
+        sqrt <callable> : batched matrix square root.
+    OUTPUT
+        (L0, L1) <tuple(array)>, each of shape (batch, n/2, n/2)
+    '''
+    a    = np.asarray(a)
+    b, k = a.shape[0], a.shape[-1]//2
+    with stage('block', n=k, batch=b):
+        A, B = a[:, :k, :k], a[:, :k, k:]
+        C, D = a[:, k:, :k], a[:, k:, k:]
+    #
+    t = A + D        # Block-trace
+    #
+    with stage('inverse', n=k, batch=b, flops=2*b*k**3):
+        A_, singular = _inverse(A)
+    with stage('determinant', n=k, batch=b, flops=8*b*k**3):
+        d = A @ D - A @ (C @ (A_ @ B))          # Block-determinant with inverse of A
+        if singular.any():                      # Without inverse of A
+            print(f'NOTE: Used singular matrix method for {singular.sum()} of {b} matrices.')
+            emit('fallback', stage='inverse', method='singular', reason=f'{singular.sum()} singular blocks in batch')
+            d[singular] = A[singular] @ D[singular] - C[singular] @ B[singular]
+    #
+    with stage('sqrt', n=k, batch=b, flops=26*b*k**3):
+        term = sqrt( t @ t - 4*d )
+    L0 = 0.5*(t - term)
+    L1 = 0.5*(t + term)
+    #
+    return (L0, L1)
+
+
+def _indices(block_index, batch):
+    "block_index as an int array of shape (batch, levels); a single string is shared by the batch."
+    if isinstance(block_index, str):
+        block_index = [block_index]*batch
+    if len(block_index) != batch or len( set( len(i) for i in block_index ) ) != 1:
+        raise Warning('ABORTED. block_index must be a string or one string per matrix, all of the same length.')
+    return np.array( [ [int(c) for c in i] for i in block_index ], dtype=int )
+
+
+def sbd_eigenbranch_batched(M, block_index='0', only_even=False, jit=False):
+    ''' sbd_eigenbranch for each matrix of the stack M.
+    block_index <str or list(str)>: one index for the whole batch, or one per matrix (same length).
+    only_even <bool>: as in sbd_eigenbranch.
+    jit <bool>      : if True, each level is jax.vmap of sbd_eigenvalue_jit (jax precision, see partialg.dense.compiled).
+    OUTPUT
+        L <list(array)>: stacks of the branch, L[i] of shape (batch, n/2**i, n/2**i), report <dict>
+    '''
+    t0  = perf_counter()
+    M   = np.asarray(M)
+    idx = _indices(block_index, M.shape[0])
+    if 2**(idx.shape[1]-1) >= M.shape[-1]:
+        print(f'ABORTED: block_index is {int( idx.shape[1] - np.log2(M.shape[-1]) )} indices too large.')
+        return None, {'time': [0, ]}
+    if jit == True:
+        import jax
+        from .compiled import sbd_eigenvalue_jit, use_compilation_cache
+        use_compilation_cache()
+        level_function = jax.vmap(sbd_eigenvalue_jit)
+    else:
+        level_function = sbd_eigenvalue_batched
+    #
+    L = [M, ]
+    t = [0, ]
+    for i in range( idx.shape[1] ):
+        L0, L1 = level_function(L[-1])
+        L.append( np.where( (idx[:, i] == 0)[:, None, None], L0, L1 ) )    # Branch selection per matrix
+        t.append( (perf_counter()-t0)/60. )
+        emit('level', level=i, index=block_index if isinstance(block_index, str) else None,
+             n=L[-2].shape[-1], batch=M.shape[0], duration=(t[-1]-t[-2])*60.)
+    #
+    if only_even == True:
+        L = [L[i] for i in range(0,len(L),2)]
+        t = [t[i] for i in range(0, len(t), 2)]
+    report = {'time':t}    # Time is in minutes
+    return L, report
+
+
+def sbd_eigenleaf_batched(M, block_index='0', jit=False):
+    ''' sbd_eigenleaf for each matrix of the stack M (see sbd_eigenbranch_batched).
+    OUTPUT
+        leaves <array> of shape (batch, n/2**len(block_index), n/2**len(block_index)), report <dict>
+    '''
+    t0  = perf_counter()
+    M   = np.asarray(M)
+    idx = _indices(block_index, M.shape[0])
+    if 2**(idx.shape[1]-1) >= M.shape[-1]:
+        print(f'ABORTED: block_index is {int( idx.shape[1] - np.log2(M.shape[-1]) )} indices too large.')
+        return None, {'time': [0, ]}
+    if jit == True:
+        import jax
+        from .compiled import sbd_eigenvalue_jit, use_compilation_cache
+        use_compilation_cache()
+        level_function = jax.vmap(sbd_eigenvalue_jit)
+    else:
+        level_function = sbd_eigenvalue_batched
+    #
+    L = M
+    t = [0, ]
+    for i in range( idx.shape[1] ):
+        n      = L.shape[-1]
+        L0, L1 = level_function(L)
+        L      = np.where( (idx[:, i] == 0)[:, None, None], L0, L1 )    # Branch selection per matrix
+        t.append( (perf_counter()-t0)/60. )
+        emit('level', level=i, index=block_index if isinstance(block_index, str) else None,
+             n=n, batch=M.shape[0], duration=(t[-1]-t[-2])*60.)
+    #
+    report = {'time':t}    # Time is in minutes
+    return L, report
@@ -0,0 +1,134 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+import os
+from functools import partial
+
+import jax
+import jax.numpy as jnp
+from jax import lax
+from jax.experimental.compilation_cache import compilation_cache
+
+
+_cache_checked = False
+
+
+def enable_compilation_cache(path=None):
+    ''' Stores the compiled SBD levels on disk, so that new processes (repeated jobs, restarted
+    workers) load them instead of recompiling. The jit=True paths of sbd_eigenbranch, sbd_eigenleaf and
+    the batched engines call it on their first use (see use_compilation_cache).
+    path <str>: cache directory. Defaults to $PARTIALG_CACHE_DIR/jax or ~/.cache/partialg/jax.
+    OUTPUT
+        path <str>
+    '''
+    if path is None:
+        root = os.environ.get('PARTIALG_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'partialg'))
+        path = os.path.join(root, 'jax')
+    os.makedirs(path, exist_ok=True)
+    jax.config.update('jax_compilation_cache_dir', path)
+    jax.config.update('jax_persistent_cache_min_compile_time_secs', 0)
+    if compilation_cache.is_initialized():      # An earlier jax compilation fixed the cache without a directory
+        compilation_cache.reset_cache()
+    return path
+
+
+def use_compilation_cache():
+    ''' Enables the compilation cache once per process, on the first jitted SBD call. Skipped if
+    jax_compilation_cache_dir is already set (the user's cache is kept) or if $PARTIALG_JAX_CACHE is 0.
+    '''
+    global _cache_checked
+    if _cache_checked:
+        return
+    _cache_checked = True
+    if os.environ.get('PARTIALG_JAX_CACHE', '1') == '0' or jax.config.jax_compilation_cache_dir is not None:
+        return
+    try:
+        enable_compilation_cache()
+    except OSError as e:        # Read-only home or cache directory: compile in memory only
+        print(f'NOTE: compilation cache disabled ({e}).')
+
+
+def _newton_step(s, X):
+    return 0.5*(X + s @ jnp.linalg.inv(X) )
+
+
+@partial(jax.jit, static_argnames=('max_it', 'k_pow', 'tol'))
+def ns_sqrt_jit(a, max_it = 6, k_pow = 1/4, tol = None):
+    ''' Newton-Schulz matrix root expansion, compiled. Same iteration as ns_sqrt.
+    tol <float>: if given, stops as soon as ||X_k+1 - X_k|| <= tol ||X_k+1|| (at most max_it iterations).
+    '''
+    X = a.trace()**k_pow * jnp.eye(a.shape[0], dtype=a.dtype)   # Initial guess
+    if tol is None:
+        return lax.fori_loop(0, max_it, lambda i, X: _newton_step(a, X), X)
+    #
+    def cond(state):
+        i, X, change = state
+        return (i < max_it) & (change > tol)
+    #
+    def body(state):
+        i, X, change = state
+        Y = _newton_step(a, X)
+        return i + 1, Y, jnp.linalg.norm(Y - X)/jnp.linalg.norm(Y)
+    #
+    return lax.while_loop(cond, body, (0, X, jnp.array(jnp.inf, dtype=jnp.abs(X).dtype)))[1]
+
+
+@partial(jax.jit, static_argnames=('max_it', 'k_pow', 'tol'))
+def sbd_eigenvalue_jit(a, max_it = 6, k_pow = 1/4, tol = None):
+    ''' Compiled SBD level, equivalent to sbd_eigenvalue with ns_sqrt.
+    One executable is compiled (and cached, see enable_compilation_cache) per matrix size and dtype.
+    Inputs are converted to jax's default precision (float32 unless jax_enable_x64 is set).
+    PARAMETERS
+        a <array>: square matrix of even size.
+        max_it, k_pow, tol: parameters of ns_sqrt_jit.
+    OUTPUT
+        (L0, L1) <tuple(jax.Array)>
+    '''
+    k    = a.shape[0]//2
+    A, B = a[:k, :k], a[:k, k:]
+    C, D = a[k:, :k], a[k:, k:]
+    #
+    t    = A + D        # Block-trace
+    A_   = jnp.linalg.inv(A)
+    d    = lax.cond( jnp.all( jnp.isfinite(A_) ),
+                     lambda: A @ D - A @ (C @ (A_ @ B)),    # Block-determinant with inverse of A
+                     lambda: A @ D - C @ B )                # Without inverse of A
+    #
+    term = ns_sqrt_jit( t @ t - 4*d, max_it=max_it, k_pow=k_pow, tol=tol )
+    L0   = 0.5*(t - term)
+    L1   = 0.5*(t + term)
+    #
+    return (L0, L1)
@@ -36,7 +36,10 @@
 
 from time import perf_counter           # For time measurement 
 
-from numpy.linalg import inv, eig
+from numpy.linalg import inv, eig, eigvals, norm, solve, slogdet, LinAlgError
+from numpy import asarray, iscomplexobj, float32, float64, complex64, complex128
+from numpy import eye as npeye, concatenate, vdot, isfinite, sort as npsort, exp
+from numpy import array_split as np_array_split
 from jax.numpy import eye, sqrt, array_split, array, log2, diag
 from jax.numpy import abs as npabs
 #from numpy import eye, sqrt, array_split, array, log2, diag
@@ -45,6 +48,8 @@ from jax.numpy import abs as npabs
 from scipy.sparse import coo_array
 from scipy.sparse.linalg import eigs
 
+from ..instrument import stage, emit
+from ..shared import resolve
 
 
 # def exact_sqrt(a):
@@ -64,20 +69,77 @@ def ns_sqrt(a, max_it = 6, k_pow = 1/4):
     return A
 
 
+def ns_sqrt_mixed(a, max_it = 20, refine_it = 3, tol = 1e-12):
+    ''' Mixed-precision matrix square root.
+    The root is first found in float32 (complex64 for complex input) with the product form of the Denman-Beavers
+    iteration, with determinant scaling mu,
+        M_0 = Y_0 = a,   Y <- mu Y (I + M_^-1)/2,   M <- (I + (M_ + M_^-1)/2)/2,   M_ = mu^2 M,
+    so that Y -> sqrt(a) and M -> I. Unlike the iteration of ns_sqrt, it is stable, so that its iterates can be
+    refined: it stops after max_it iterations or once M is the identity to float32 accuracy. The root is then
+    refined in float64 (complex128) by Newton's method in Sylvester form, X E + E X = a - X X, solved in the
+    eigenbasis Y = V diag(w) V^-1 of the float32 root, E = V ((V^-1 R V) / (w_i + w_j)) V^-1 (chord steps, each
+    a few products), for at most refine_it steps and while the residual ||X X - a|| / ||a|| is above tol and
+    decreasing. The refinement needs V to be well conditioned; otherwise the float32 accuracy is kept.
+    The speed is that of the float64 iteration or slower: the point is the accuracy of the float64 result,
+    which the unstable iteration of ns_sqrt does not reach in either precision.
+    '''
+    a    = asarray(a)
+    low  = complex64 if iscomplexobj(a) else float32
+    high = complex128 if iscomplexobj(a) else float64
+    k    = a.shape[0]
+    I    = npeye(k, dtype=low)
+    #
+    M    = a.astype(low)
+    Y    = M.copy()
+    mu   = 1.
+    for i in range(max_it):
+        if i == 0 or norm(M - I) > 1e-2*k**0.5:
+            mu = float( exp( -slogdet(M)[1]/(2*k) ) )             # Determinant scaling, until close to I
+        else:
+            mu = 1.
+        M_  = inv(M)/mu**2
+        Y   = mu * Y @ (I + M_)*0.5
+        M   = 0.5*I + 0.25*(mu**2*M + M_)
+        if norm(M - I) <= 1e-5*k**0.5:
+            break
+    #
+    w, V = eig(Y)               # float32 eigenbasis of the root, cast so that the products stay in BLAS
+    V_   = inv(V).astype(complex128)
+    V    = V.astype(complex128)
+    W    = w.astype(complex128)[:, None] + w.astype(complex128)[None, :]
+    a    = a.astype(high)
+    X    = Y.astype(high)
+    na   = max( norm(a), 1e-300 )
+    R    = a - X @ X
+    rs   = norm(R)/na
+    for i in range(refine_it):
+        if rs <= tol:
+            break
+        E  = V @ ( (V_ @ R @ V)/W ) @ V_
+        X_ = X + (E if iscomplexobj(X) else E.real)
+        R_ = a - X_ @ X_
+        r_ = norm(R_)/na
+        if not r_ < rs:         # Ill-conditioned eigenbasis: keep the best root
+            break
+        X, R, rs = X_, R_, r_
+    return X
+
+
 # Slice blocks of matrix =====================
-def block(a, nrow=2):
+def block(a, nrow=2, split=array_split):
     ''' Splits matrix M into nrow*nrow blocks. Blocks have equal size if len(M)/nrow is integer.
     #
     INPUT  <np.array> : sparse matrix not allowed.
+    split             : jax (default) or NumPy array_split.
     OUTPUT <tuple(np.array)>
     '''
     #
-    rows   = array_split(a, indices_or_sections=nrow, axis=0 ) 
+    rows   = split(a, indices_or_sections=nrow, axis=0 ) 
     #
     blocks = []
     for row in rows:
         blocks.append( 
-            array_split(row, indices_or_sections=nrow, axis=1 )
+            split(row, indices_or_sections=nrow, axis=1 )
         )
     #
     return tuple(blocks)
@@ -85,33 +147,74 @@ def block(a, nrow=2):
 
 #==============================================
 
-def sbd_eigenvalue(a, sqrt= ns_sqrt):
+def gershgorin(a):
+    ''' Gershgorin interval enclosing the real parts of all eigenvalues of a, e.g. of an SBD leaf.
+    OUTPUT
+        (lower, upper) <tuple(float)>
+    '''
+    a = asarray(a)
+    c = a.diagonal().real
+    r = abs(a).sum(axis=1) - abs(a.diagonal())
+    return float( (c - r).min() ), float( (c + r).max() )
+
+
+def sbd_eigenvalue(a, sqrt= ns_sqrt, precision='double', info=None):
     ''' Matrix-polynomial root via Sridhara-based Block Diagonalization method.
     PARAMETERS
         a            : matrix to take block-Bhaskara of. Accepts np.array or scipy sparse array.
         srt <np.array>: function to compute matrix square root
+        precision <str>: 'double' uses sqrt as given, 'mixed' replaces ns_sqrt by ns_sqrt_mixed and runs the
+                         whole level in NumPy float64 (complex128), so that only the first root iterations are
+                         float32. Through jax, which is float32 unless jax_enable_x64 is set, t and d and thus
+                         L0 = (t - S)/2 would be rounded back to float32.
+        info <dict>  : if a dict is given, it is filled with the relative residual of the square root.
     OUTPUT
         <np.array>
     '''
-    blk       = block(a, nrow=2)
-    A, B      = blk[0][0], blk[0][1]
-    C, D      = blk[1][0], blk[1][1]
+    a = resolve(a)
+    if precision == 'mixed':
+        if sqrt is ns_sqrt:
+            sqrt = ns_sqrt_mixed
+    elif precision != 'double':
+        raise Warning("ABORTED. Only double or mixed precision are supported.")
+    #
+    split     = array_split
+    if precision == 'mixed':        # High precision level: NumPy blocks instead of jax ones
+        a     = asarray(a)
+        a     = a.astype(complex128 if iscomplexobj(a) else float64)
+        split = np_array_split
+    #
+    k         = a.shape[0]//2
+    with stage('block', n=k):
+        blk       = block(a, nrow=2, split=split)
+        A, B      = blk[0][0], blk[0][1]
+        C, D      = blk[1][0], blk[1][1]
     #
     del blk
     #
     t = A + D        # Block-trace    
     #
     try:             # Block-determinant with inverse of A
-        A_ = inv(A)
-        d  = A.dot(D) - A.dot(C.dot( A_.dot(B) ))
-    except:          # Without inverse of A
+        with stage('inverse', n=k, flops=2*k**3):
+            A_ = inv(A)
+        with stage('determinant', n=k, flops=8*k**3):
+            d  = A.dot(D) - A.dot(C.dot( A_.dot(B) ))
+    except Exception as e:          # Without inverse of A
         print('NOTE: Used singular matrix method.')
-        d  = A.dot(D) - C.dot(B)
+        emit('fallback', stage='inverse', method='singular', reason=repr(e))
+        with stage('determinant', n=k, flops=4*k**3):
+            d  = A.dot(D) - C.dot(B)
     #
-    term = sqrt( t.dot(t) - 4*d )
+    with stage('sqrt', n=k, flops=(26 if sqrt in (ns_sqrt, ns_sqrt_mixed) else 2)*k**3):
+        s    = t.dot(t) - 4*d
+        term = sqrt( s )
     L0   = 0.5*(t - term)
     L1   = 0.5*(t + term)
     #
+    if info is not None:    # Relative residual ||term^2 - s|| / ||s||
+        R = term @ term - s
+        info['residual'] = float( norm( R ) / norm( s ) )
+    #
     return (L0, L1)
 
 
@@ -143,7 +246,8 @@ def sbd_vector(v, normalize=False):
     L1  = sbd_eigenvalue(M)[1]
     L1  = coo_array( L1 )        
     #
-    e, v = eigs( L1, k=1, sigma=1 )
+    with stage('eigensolve', n=L1.shape[0]):
+        e, v = eigs( L1, k=1, sigma=1 )
     #
     if normalize == True:
         v = v/npabs( sqrt( v.T.conjugate().dot( v ) ) )
@@ -178,46 +282,102 @@ def sbd_vectorbranch(v, block_index='0', only_even=False, normalize=False ):
 
 
 
-def sbd_eigenbranch(M, block_index='0', only_even=False ):
+def sbd_eigenbranch(M, block_index='0', only_even=False, precision='double', jit=False ):
     ''' SBD_eigbranch finds eigenleaf of block-eigenvalue tree.
     block_index <int>: index of block-diagonal matrix (its length is the number of compressions).
     only_even <bool>: True ensures output only has elements with 2*n compressions, where n is the list index, as required by some VQE algorithms. 
                       False ensures output is full branch of compressed matrices.
+    precision <str>: 'double' or 'mixed' (see sbd_eigenvalue). With 'mixed', the report includes the
+                     square-root residual of each level.
+    jit <bool>      : if True, runs each level with the compiled sbd_eigenvalue_jit (see partialg.dense.compiled).
+    The leaf eigenvalues are not bounded by the square-root residuals: the splitting itself is exact only when the
+    blocks of every level commute. To check a leaf eigenpair against M without an eigensolve, lift it with sbd_lift.
     '''
+    M = resolve(M)
     #
     t0 = perf_counter()
+    #
+    if jit == True:
+        if precision != 'double':
+            raise Warning('ABORTED. jit=True does not support mixed precision.')
+        from .compiled import sbd_eigenvalue_jit, use_compilation_cache
+        use_compilation_cache()
     
     if 2**(len( block_index )-1) < M.shape[0]:
         L = [M, ]
         t = [0, ]
+        r = [0., ]
         for i in range( len(block_index) ):
-            L.append( sbd_eigenvalue(L[-1])[ int(block_index[i]) ] )    # Block-eigensolving
+            info = {} if precision == 'mixed' else None
+            if jit == True:
+                L.append( sbd_eigenvalue_jit(L[-1])[ int(block_index[i]) ] )    # Compiled block-eigensolving
+            else:
+                L.append( sbd_eigenvalue(L[-1], precision=precision, info=info)[ int(block_index[i]) ] )    # Block-eigensolving
             t.append( (perf_counter()-t0)/60. )
+            emit('level', level=i, index=block_index[i], n=L[-2].shape[0], duration=(t[-1]-t[-2])*60.)
+            if info is not None:
+                r.append( info['residual'] )
         #
         if only_even == True:
             L = [L[i] for i in range(0,len(L),2)]
             t = [t[i] for i in range(0, len(t), 2)]
+            r = r[::2]
     else:
         print(f'ABORTED: block_index is {int( len( block_index ) - log2(len(M)) )  } indices too large.')
         L = None
         #
     report = {'time':t}    # Time is in minutes
+    if precision == 'mixed':
+        report['residual'] = r
     return L, report
 
 
-def sbd_eigenleaf(M, block_index='0'):
+def sbd_eigenleaf(M, block_index='0', precision='double', jit=False, record=False, memory_budget=None):
     ''' SBD_eigbranch finds eigenleaf of block-eigenvalue tree.
     Memory-economic SBD_eigenbranch, returning only the last block.
+    precision <str>: 'double' or 'mixed' (see sbd_eigenbranch).
+    jit <bool>      : if True, runs each level with the compiled sbd_eigenvalue_jit.
+    record <bool>   : if True, the report gets 'levels', the input matrix of every level (M first, not copied),
+                      so that leaf eigenvectors can be lifted with sbd_lift. The levels below M hold at most a
+                      third of the memory of M.
+    memory_budget   : bytes, or a string such as '16G'. If given, each level estimates its peak memory first and
+                      runs in NumPy float64 with the cheapest strategy that fits: in-place updates and solves
+                      instead of the inverse, freeing its input early, or out-of-core tiles (see partialg.budget).
+                      The report then has 'memory', with the strategy, estimate and measured peak of each level.
     '''
+    M = resolve(M)
     #
     t0 = perf_counter()
     #
+    if memory_budget is not None:
+        if precision != 'double' or jit == True or record == True:
+            raise Warning('ABORTED. memory_budget supports neither mixed precision, jit nor record.')
+        from ..budget import sbd_eigenleaf_budget
+        return sbd_eigenleaf_budget(M, block_index, memory_budget)
+    #
+    if jit == True:
+        if precision != 'double':
+            raise Warning('ABORTED. jit=True does not support mixed precision.')
+        from .compiled import sbd_eigenvalue_jit, use_compilation_cache
+        use_compilation_cache()
+    #
     if 2**(len( block_index )-1) < M.shape[0]:
         L = [M, ]
         t = [0, ]
+        r = [0., ]
+        levels = []
         for i in range( len(block_index) ):
-            L.append( sbd_eigenvalue(L[-1])[ int(block_index[i]) ] )    # Block-eigensolving
+            info = {} if precision == 'mixed' else None
+            if jit == True:
+                L.append( sbd_eigenvalue_jit(L[-1])[ int(block_index[i]) ] )    # Compiled block-eigensolving
+            else:
+                L.append( sbd_eigenvalue(L[-1], precision=precision, info=info)[ int(block_index[i]) ] )    # Block-eigensolving
             t.append( (perf_counter()-t0)/60. )
+            emit('level', level=i, index=block_index[i], n=L[0].shape[0], duration=(t[-1]-t[-2])*60.)
+            if record == True:
+                levels.append( L[0] )
+            if info is not None:
+                r.append( info['residual'] )
             del L[0]
         #
     else:
@@ -225,6 +385,99 @@ def sbd_eigenleaf(M, block_index='0'):
         L = None
         #
     report = {'time':t}    # Time is in minutes
+    if precision == 'mixed':
+        report['residual'] = r
+    if record == True:
+        report['levels'] = levels
 
     return L[0], report
 
+
+def _lift_level(P, v, lam, refine):
+    ''' One level of sbd_lift. With P = [[A, B], [C, D]], a vector of the form [x, v] is an eigenvector of P
+    for the eigenvalue lam if (A - lam) x = -B v, and one of the form [v, y] if (D - lam) y = -C v; both are exact
+    when the blocks commute. The one with the smaller residual is kept and refined by Rayleigh quotient iteration.
+    OUTPUT
+        u <array> (unit norm), mu (Rayleigh quotient), residual ||P u - mu u||
+    '''
+    P = asarray(P)
+    P = P.astype(complex128 if iscomplexobj(P) or iscomplexobj(v) or iscomplexobj(lam) else float64)
+    k = P.shape[0]//2
+    I = npeye(k)
+    best = None
+    for rows, cols, top in ((slice(0, k), slice(k, None), False), (slice(k, None), slice(0, k), True)):
+        try:
+            x = solve( P[rows, rows] - lam*I, -P[rows, cols] @ v )
+        except LinAlgError:                 # lam is an eigenvalue of the block: try the other form
+            continue
+        u = concatenate([v, x]) if top else concatenate([x, v])
+        u = u/norm(u)
+        mu = vdot(u, P @ u)
+        r  = float( norm(P @ u - mu*u) )
+        if isfinite(r) and (best is None or r < best[2]):
+            best = (u, mu, r)
+    if best is None:
+        raise Warning(f'ABORTED. Eigenvalue {lam} of both diagonal blocks: cannot lift at size {2*k}.')
+    u, mu, r = best
+    for it in range(refine):                # Rayleigh quotient iteration with P
+        try:
+            w = solve( P - mu*npeye(2*k), u )
+        except LinAlgError:                 # mu is exact
+            break
+        w = w/norm(w)
+        if not isfinite(w).all():
+            break
+        u, mu = w, vdot(w, P @ w)
+        r     = float( norm(P @ u - mu*u) )
+    return u, mu, r
+
+
+def sbd_lift(levels, v, eigenvalue, refine=1):
+    ''' Lifts an eigenvector of an SBD leaf to an (approximate) eigenvector of the original matrix M.
+    At every level, from the leaf up, the vector is completed by one linear solve with a diagonal block shifted
+    by the eigenvalue (see _lift_level) and optionally refined by Rayleigh quotient iteration with that level's
+    matrix, whose eigenvalue estimate is passed to the level above. The cost is a few solves of the size of each
+    level, i.e. of the order of the compression itself, and only one level is factorized at a time.
+    Only the eigenpair of M nearest the lifted vector is guaranteed. Rayleigh quotient iteration converges to
+    whichever eigenpair is closest: when the leaf eigenvalue is off by more than the gaps of the spectrum, the
+    result can be another eigenpair (e.g. an excited state lifted from a ground state) with a small residual.
+    The report flags this ('drifted') when the Rayleigh quotient moves away from the leaf eigenvalue by more
+    than the gap of the last level, computed from its eigenvalues (a dense eigensolve of twice the leaf size).
+    For normal (e.g. Hermitian) M, M has an eigenvalue within 'error_bound' = ||M u - mu u|| of mu, the rigorous
+    check of a leaf without an eigensolve of M.
+    PARAMETERS
+        levels <list>     : input matrices of the levels, M first: report['levels'] of sbd_eigenleaf(record=True),
+                            or branch[:-1] of sbd_eigenbranch (only_even=False).
+        v <array>         : eigenvector of the leaf.
+        eigenvalue        : its eigenvalue.
+        refine <int>      : Rayleigh quotient iterations per level. 0 gives the exact eigenvector when the blocks of
+                            every level commute; 1 or 2 recover the eigenvector of M nearest the lifted one otherwise.
+    OUTPUT
+        u <np.array>   : unit vector of the size of M.
+        report <dict>  : 'time' (minutes), 'eigenvalue' (Rayleigh quotient of u for M), 'shift' (its distance to
+                         the leaf eigenvalue), 'gap' (distance from the leaf eigenvalue to the second nearest
+                         eigenvalue of the last level), 'drifted' <bool> (shift > gap), 'error_bound' (the
+                         residual for M) and, per level from the leaf up, 'eigenvalues' and 'residual' ||P u - mu u||.
+    '''
+    t0 = perf_counter()
+    u  = asarray(v).reshape(-1)
+    u  = u/norm(u)
+    mu = eigenvalue
+    if levels[-1].shape[0] != 2*u.shape[0]:
+        raise Warning(f'ABORTED. A leaf vector of size {u.shape[0]} does not match the last level, of size {levels[-1].shape[0]}.')
+    e   = eigvals( asarray(levels[-1]) )          # Spectrum of the leaf and of its sibling
+    gap = float( npsort( abs(e - eigenvalue) )[1] )
+    mus, res = [], []
+    for P in levels[::-1]:
+        with stage('lift', n=P.shape[0]):
+            u, mu, r = _lift_level(P, u, mu, refine)
+        mus.append(mu)
+        res.append(r)
+    #
+    shift = float( abs(mu - eigenvalue) )
+    if shift > gap:
+        print(f'NOTE: the Rayleigh quotient moved by {shift:.3g}, more than the level gap {gap:.3g}: u may belong to another eigenvalue.')
+    report = {'time': (perf_counter()-t0)/60., 'eigenvalue': mu, 'shift': shift, 'gap': gap, 'drifted': shift > gap,
+              'error_bound': res[-1], 'eigenvalues': mus, 'residual': res}    # Time is in minutes
+    return u, report
+
@@ -0,0 +1,256 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Partial inversion of Kronecker-structured operators, without forming the 2**n-dimensional matrix.
+
+The partial inversion of dense.inversion.pinv at pivot (i, k) is a rank-one correction,
+    Z = M - (M e_k + e_i) (e_i^T M - e_k^T) / M[i, k],
+and for a Kronecker product M = A_1 x ... x A_n the column M e_k and the row e_i^T M are Kronecker products of
+columns and rows of the factors. KronOperator therefore stores
+    Z = sum_t c_t (F_t1 x ... x F_tn) + sum_r s_r u_r w_r^T,
+with u_r, w_r KronVectors (sums of Kronecker products of vectors), and pinvk adds one correction per pivot.
+Entries, rows, columns and products with vectors are computed factor by factor: a product costs
+O(N * sum(dims)) per Kronecker term and O(N) per vector term, N = prod(dims), and storage is O(sum(dims**2))
+per term. The vectors of a correction contain those of the previous corrections, so their number of terms
+doubles with each pivot: pinvk is meant for a few pivots.
+
+pinv_factor instead pivots a whole block of one factor, i.e. all pivots ((.., r, ..), (.., s, ..)) with the
+other indices equal. For a Kronecker product this gives exactly three Kronecker terms, with B^-1, I and B for
+B the Kronecker product of the other factors.
+'''
+
+from functools import reduce
+
+import numpy as np
+from numpy.linalg import inv
+from scipy.sparse.linalg import LinearOperator
+
+
+class KronVector:
+    ''' Sum of Kronecker products of vectors, sum_t c_t (v_t1 x ... x v_tn).
+    PARAMETERS
+        terms <list>: (c_t, [v_t1, ..., v_tn]).
+    '''
+
+    def __init__(self, terms):
+        self.terms = [ (c, [np.asarray(v) for v in vs]) for c, vs in terms ]
+
+    @classmethod
+    def unit(cls, idx, dims):
+        "Basis vector e_idx of multi-index idx."
+        return cls([ (1., [np.eye(d)[i] for i, d in zip(idx, dims)]) ])
+
+    def __add__(self, other):
+        return KronVector(self.terms + other.terms)
+
+    def __mul__(self, a):
+        return KronVector([ (a*c, vs) for c, vs in self.terms ])
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return self*(-1)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def entry(self, idx):
+        return sum( c*np.prod([v[i] for v, i in zip(vs, idx)]) for c, vs in self.terms )
+
+    def dot(self, X):
+        ''' v^T x (no conjugation) for the columns of X, of shape (r, d_1, ..., d_n).
+        OUTPUT <array> of shape (r, )
+        '''
+        out = 0
+        for c, vs in self.terms:
+            Y = X
+            for v in vs:                        # Contract the leading factor axis
+                Y = np.tensordot(Y, v, axes=([1], [0]))
+            out = out + c*Y
+        return out
+
+    def toarray(self):
+        return sum( c*reduce(np.kron, vs) for c, vs in self.terms )
+
+
+class KronOperator:
+    ''' Z = sum_t c_t (F_t1 x ... x F_tn) + sum_r s_r u_r w_r^T (see module docstring).
+    PARAMETERS
+        terms <list>   : (c_t, [F_t1, ..., F_tn]), square factors of the same dimensions in every term.
+        low_rank <list>: (s_r, u_r <KronVector>, w_r <KronVector>).
+    '''
+
+    def __init__(self, terms, low_rank=()):
+        self.terms    = [ (c, [np.asarray(F) for F in Fs]) for c, Fs in terms ]
+        self.low_rank = list(low_rank)
+        self.dims     = tuple( F.shape[0] for F in self.terms[0][1] )
+
+    @property
+    def shape(self):
+        N = int( np.prod(self.dims) )
+        return (N, N)
+
+    @property
+    def dtype(self):
+        return np.result_type( *[F for _, Fs in self.terms for F in Fs],
+                               *[v for _, u, w in self.low_rank for x in (u, w) for _, vs in x.terms for v in vs],
+                               *[c for c, _ in self.terms], *[s for s, _, _ in self.low_rank] )
+
+    def __repr__(self):
+        return f'KronOperator(dims={self.dims}, {len(self.terms)} Kronecker terms, rank {len(self.low_rank)} correction)'
+
+    def index(self, i):
+        "Multi-index of i (int, flat, or tuple)."
+        return tuple( int(j) for j in np.unravel_index(i, self.dims) ) if np.ndim(i) == 0 else tuple(i)
+
+    def entry(self, i, k):
+        i, k = self.index(i), self.index(k)
+        z = sum( c*np.prod([F[a, b] for F, a, b in zip(Fs, i, k)]) for c, Fs in self.terms )
+        return z + sum( s*u.entry(i)*w.entry(k) for s, u, w in self.low_rank )
+
+    def column(self, k):
+        "Z e_k as a KronVector."
+        k = self.index(k)
+        v = KronVector([ (c, [F[:, b] for F, b in zip(Fs, k)]) for c, Fs in self.terms ])
+        for s, u, w in self.low_rank:
+            v = v + u*( s*w.entry(k) )
+        return v
+
+    def row(self, i):
+        "e_i^T Z as a KronVector."
+        i = self.index(i)
+        v = KronVector([ (c, [F[a, :] for F, a in zip(Fs, i)]) for c, Fs in self.terms ])
+        for s, u, w in self.low_rank:
+            v = v + w*( s*u.entry(i) )
+        return v
+
+    def matmat(self, X):
+        ''' Z @ X for X of shape (N, ) or (N, r), factor by factor.
+        '''
+        X   = np.asarray(X)
+        vec = X.ndim == 1
+        r   = 1 if vec else X.shape[1]
+        T   = X.reshape(self.dims + (r, ))
+        T   = np.moveaxis(T, -1, 0)                         # (r, d_1, ..., d_n)
+        out = 0
+        for c, Fs in self.terms:
+            Y = T
+            for F in Fs:                                    # Contract axis 1, new axis appended: cycles back to order
+                Y = np.tensordot(Y, F, axes=([1], [1]))
+            out = out + c*Y
+        for s, u, w in self.low_rank:
+            out = out + s * np.multiply.outer( w.dot(T), u.toarray().reshape(self.dims) )
+        out = np.moveaxis(np.asarray(out), 0, -1).reshape(-1, r)
+        return out[:, 0] if vec else out
+
+    def __matmul__(self, X):
+        return self.matmat(X)
+
+    def aslinearoperator(self):
+        return LinearOperator(self.shape, matvec=self.matmat, matmat=self.matmat, dtype=self.dtype)
+
+    def toarray(self):
+        "Materializes Z (small operators only)."
+        Z = sum( c*reduce(np.kron, Fs) for c, Fs in self.terms )
+        for s, u, w in self.low_rank:
+            Z = Z + s*np.outer(u.toarray(), w.toarray())
+        return Z
+
+
+def kron_operator(*factors):
+    "KronOperator of A_1 x ... x A_n."
+    return KronOperator([ (1., list(factors)) ])
+
+
+def pinvk(M, *args):
+    ''' Partial inversion algorithm of dense.inversion.pinv for Kronecker-structured operators.
+    M: KronOperator, or list of factors A_1, ..., A_n of A_1 x ... x A_n.
+    args: pivots (i, k), each index flat (int) or a multi-index (tuple with one index per factor).
+          E.g.: (0, 0), ((0, 1), (1, 1)).
+    OUTPUT
+        KronOperator with one rank-one correction per pivot.
+    '''
+    Z = M if isinstance(M, KronOperator) else kron_operator(*M)
+    for i, k in args:
+        i, k = Z.index(i), Z.index(k)
+        m    = Z.entry(i, k)
+        if m == 0:
+            raise Warning(f'ABORTED. Zero pivot at {i}, {k}.')
+        u = Z.column(k) + KronVector.unit(i, Z.dims)
+        w = Z.row(i) - KronVector.unit(k, Z.dims)
+        Z = KronOperator(Z.terms, Z.low_rank + [ (-1/m, u, w) ])
+    return Z
+
+
+def pinv_factor(M, factor, pivot):
+    ''' Partial inversion of a Kronecker product on a block of one factor: all pivots whose index on that factor
+    is pivot = (r, s) and whose other indices are equal (row and column), in one step.
+    With B = Kronecker product of the other factors (all invertible) and a = M[factor] the result is
+        block (r, s): B^-1 / a[r, s], row r and column s: (pinv(a))[., .] I, other blocks: (pinv(a))[., .] B,
+    i.e. three Kronecker terms.
+    M: KronOperator of a single Kronecker term (e.g. from kron_operator) or list of factors.
+    OUTPUT
+        KronOperator
+    '''
+    Z = M if isinstance(M, KronOperator) else kron_operator(*M)
+    if len(Z.terms) != 1 or len(Z.low_rank) != 0:
+        raise Warning('ABORTED. pinv_factor needs a plain Kronecker product; use pinvk for further pivots.')
+    c, Fs = Z.terms[0]
+    r, s  = pivot
+    a     = c*Fs[factor]
+    if a[r, s] == 0:
+        raise Warning(f'ABORTED. Zero pivot {pivot} on factor {factor}.')
+    P     = a - np.outer(a[:, s], a[r, :])/a[r, s]      # pinv(a, (r, s)), as in dense.inversion.pinv
+    P[:, s] = a[:, s]/a[r, s]
+    P[r, :] = -a[r, :]/a[r, s]
+    P[r, s] = 1/a[r, s]
+    #
+    mask_inv = np.zeros(a.shape, dtype=bool)
+    mask_inv[r, s] = True
+    mask_one = np.zeros(a.shape, dtype=bool)
+    mask_one[r, :] = mask_one[:, s] = True
+    mask_one[r, s] = False
+    mask_b   = ~(mask_inv | mask_one)
+    terms    = []
+    for mask, power in ((mask_inv, -1), (mask_one, 0), (mask_b, 1)):
+        if mask.any():
+            factors = [ P*mask if j == factor else ( inv(F) if power == -1 else np.eye(F.shape[0]) if power == 0 else F )
+                        for j, F in enumerate(Fs) ]
+            terms.append( (1., factors) )
+    return KronOperator(terms)
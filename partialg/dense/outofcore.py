@@ -0,0 +1,273 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Out-of-core dense SBD for matrices larger than memory.
+
+The input and every intermediate (blocks, inverse, determinant, Newton iterates) live in .npy files opened
+with numpy.memmap in a work directory. Products run tile by tile, so at most a few tiles of size tile x tile
+are in memory at once; the tile size follows from the memory budget. The inverse of the first block is
+computed recursively through Schur complements (no pivoting across its halves) and in memory once a half
+fits the budget. Levels run out of core until the current matrix fits the budget, then continue in memory
+with sbd_eigenleaf_batched, which uses the same float64 NumPy arithmetic.
+'''
+
+import os
+import shutil
+import tempfile
+from time import perf_counter
+
+import numpy as np
+from numpy.linalg import inv, LinAlgError
+from numpy.lib.format import open_memmap
+
+from ..instrument import stage, emit
+from ..shared import resolve
+
+
+class Workspace:
+    ''' Directory of memory-mapped arrays.
+    PARAMETERS
+        root <str>: parent directory (default: $PARTIALG_CACHE_DIR or the system temporary directory).
+    '''
+
+    def __init__(self, root=None):
+        root = os.environ.get('PARTIALG_CACHE_DIR', tempfile.gettempdir()) if root is None else root
+        os.makedirs(root, exist_ok=True)
+        self.path  = tempfile.mkdtemp(prefix='partialg-ooc-', dir=root)
+        self.count = 0
+
+    def new(self, shape, dtype):
+        "Zero-initialized memory-mapped array backed by a new file."
+        self.count += 1
+        return open_memmap( os.path.join(self.path, f'{self.count}.npy'), mode='w+', dtype=dtype, shape=shape )
+
+    def remove(self, *arrays):
+        ''' Deletes the files of arrays created by new. Their mappings stay valid: the memory is released when
+        the caller drops its last reference (del). Files that cannot be deleted while mapped (Windows) are left
+        to close.
+        '''
+        for a in arrays:
+            if isinstance(a, np.memmap) and a.filename is not None and os.path.dirname(a.filename) == self.path:
+                self._unlink(a.filename)
+
+    def remove_since(self, count):
+        "Deletes the files created by new after self.count was count, e.g. intermediates of a failed step."
+        for i in range(count + 1, self.count + 1):
+            self._unlink( os.path.join(self.path, f'{i}.npy') )
+
+    def _unlink(self, name):
+        try:
+            os.remove(name)
+        except (FileNotFoundError, PermissionError):
+            pass
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def tile_size(memory, itemsize):
+    "Largest tile such that the four tiles of a tiled product fit in memory bytes."
+    return max( 1, int( np.sqrt( memory/(4*itemsize) ) ) )
+
+
+def tiled_matmul(X, Y, out, tile, alpha=1., add=None, beta=0.):
+    ''' out = alpha * X @ Y + beta * add, computed tile by tile. add may be out itself.
+    Only four tiles (of X, Y, add and the accumulator) are held in memory.
+    '''
+    m, p = X.shape
+    q    = Y.shape[1]
+    for i in range(0, m, tile):
+        for j in range(0, q, tile):
+            acc = np.zeros( (min(tile, m-i), min(tile, q-j)), dtype=out.dtype )
+            for k in range(0, p, tile):
+                acc += np.asarray( X[i:i+tile, k:k+tile] ) @ np.asarray( Y[k:k+tile, j:j+tile] )
+            if add is not None and beta != 0:
+                acc = alpha*acc + beta*np.asarray( add[i:i+tile, j:j+tile] )
+            elif alpha != 1:
+                acc = alpha*acc
+            out[i:i+tile, j:j+tile] = acc
+    return out
+
+
+def tiled_axpby(out, alpha, X, beta, Y, tile):
+    "out = alpha*X + beta*Y, by row stripes of tile rows."
+    for i in range(0, out.shape[0], tile):
+        out[i:i+tile] = alpha*np.asarray( X[i:i+tile] ) + beta*np.asarray( Y[i:i+tile] )
+    return out
+
+
+def ooc_inverse(a, out, ws, memory, tile):
+    ''' Writes inv(a) to out. In memory if a fits a third of the budget, otherwise by Schur complements:
+        inv([[P, Q], [R, S]]) = [[P_ + X Sc_ Y, -X Sc_], [-Sc_ Y, Sc_]],
+    with P_ = inv(P), X = P_ Q, Y = R P_ and Sc_ = inv(S - R X), each computed recursively.
+    Raises numpy.linalg.LinAlgError if a (or one of the blocks P, Sc) is singular.
+    '''
+    n = a.shape[0]
+    if 3*n*n*out.itemsize <= memory:
+        out[:] = inv( np.asarray(a) )
+        return out
+    #
+    h          = n//2
+    P, Q, R, S = a[:h, :h], a[:h, h:], a[h:, :h], a[h:, h:]
+    mark       = ws.count
+    try:
+        P_ = ooc_inverse( P, ws.new((h, h), out.dtype), ws, memory, tile )
+        X  = tiled_matmul( P_, Q, ws.new((h, n-h), out.dtype), tile )
+        Y  = tiled_matmul( R, P_, ws.new((n-h, h), out.dtype), tile )
+        Sc = tiled_matmul( R, X, ws.new((n-h, n-h), out.dtype), tile, alpha=-1., add=S, beta=1. )   # Schur complement
+        ooc_inverse( Sc, out[h:, h:], ws, memory, tile )
+    except LinAlgError:         # Singular P or Sc: no intermediate outlives the failed inverse
+        ws.remove_since(mark)
+        raise
+    ws.remove(Sc)
+    del Sc
+    tiled_matmul( X, out[h:, h:], out[:h, h:], tile, alpha=-1. )
+    tiled_matmul( out[h:, h:], Y, out[h:, :h], tile, alpha=-1. )
+    tiled_matmul( out[:h, h:], Y, out[:h, :h], tile, alpha=-1., add=P_, beta=1. )
+    ws.remove(P_, X, Y)
+    return out
+
+
+def ns_sqrt_ooc(a, ws, memory, tile, max_it = 6, k_pow = 1/4):
+    "Newton-Schulz matrix root expansion of a memory-mapped matrix (see ns_sqrt)."
+    n    = a.shape[0]
+    X    = ws.new(a.shape, a.dtype)
+    X0   = np.trace(a)**k_pow                   # Initial guess
+    for i in range(n):
+        X[i, i] = X0
+    X_   = ws.new(a.shape, a.dtype)
+    Y    = ws.new(a.shape, a.dtype)
+    for i in range(max_it):
+        ooc_inverse( X, X_, ws, memory, tile )
+        tiled_matmul( a, X_, Y, tile )
+        tiled_axpby( X, 0.5, X, 0.5, Y, tile )
+    ws.remove(X_, Y)
+    return X
+
+
+def sbd_eigenvalue_ooc(a, ws, memory=2**30, index=None, max_it=6):
+    ''' sbd_eigenvalue on a memory-mapped matrix, with tiled products and out-of-core inverses.
+    PARAMETERS
+        a <array or memmap>: square matrix of even size.
+        ws <Workspace>     : directory of the intermediates.
+        memory <int>       : working-set budget in bytes.
+        index <int>        : if 0 or 1, only L0 or L1 is written.
+        max_it <int>       : Newton iterations of the square root.
+    OUTPUT
+        (L0, L1) <tuple(memmap)>, with None for the one not written.
+    '''
+    k     = a.shape[0]//2
+    dtype = np.result_type(a.dtype, np.float64)
+    tile  = tile_size(memory, np.dtype(dtype).itemsize)
+    A, B  = a[:k, :k], a[:k, k:]
+    C, D  = a[k:, :k], a[k:, k:]
+    #
+    t = tiled_axpby( ws.new((k, k), dtype), 1., A, 1., D, tile )      # Block-trace
+    d = ws.new((k, k), dtype)
+    mark = ws.count
+    try:             # Block-determinant with inverse of A
+        with stage('inverse', n=k, flops=2*k**3, tile=tile):
+            A_ = ooc_inverse( A, ws.new((k, k), dtype), ws, memory, tile )
+        with stage('determinant', n=k, flops=8*k**3, tile=tile):
+            W1 = tiled_matmul( A_, B, ws.new((k, k), dtype), tile )
+            W2 = tiled_matmul( C, W1, ws.new((k, k), dtype), tile )
+            tiled_matmul( A, W2, W1, tile )                                      # W1 = A C A_ B
+            tiled_matmul( A, D, d, tile, add=W1, beta=-1. )
+        ws.remove(A_, W1, W2)
+        del A_, W1, W2
+    except LinAlgError as e:        # Without inverse of A
+        ws.remove_since(mark)       # Output of the failed inverse
+        print('NOTE: Used singular matrix method.')
+        emit('fallback', stage='inverse', method='singular', reason=repr(e))
+        with stage('determinant', n=k, flops=4*k**3, tile=tile):
+            W1 = tiled_matmul( C, B, ws.new((k, k), dtype), tile )
+            tiled_matmul( A, D, d, tile, add=W1, beta=-1. )
+        ws.remove(W1)
+        del W1
+    #
+    with stage('sqrt', n=k, flops=26*k**3, tile=tile):
+        s    = tiled_matmul( t, t, d, tile, add=d, beta=-4. )               # s = t t - 4 d, in place of d
+        term = ns_sqrt_ooc( s, ws, memory, tile, max_it=max_it )
+    ws.remove(s)
+    L0 = tiled_axpby( ws.new((k, k), dtype), 0.5, t, -0.5, term, tile ) if index in (None, 0) else None
+    L1 = tiled_axpby( ws.new((k, k), dtype), 0.5, t, 0.5, term, tile ) if index in (None, 1) else None
+    ws.remove(t, term)
+    return (L0, L1)
+
+
+def sbd_eigenleaf_ooc(M, block_index='0', memory=2**30, workdir=None, in_core=True):
+    ''' sbd_eigenleaf for matrices that do not fit in memory.
+    PARAMETERS
+        M <array, memmap or str>: matrix, or path of a .npy file (opened memory-mapped, read-only).
+        memory <int>   : working-set budget in bytes.
+        workdir <str>  : parent directory of the intermediates (see Workspace). They are deleted at the end,
+                         except the file of the leaf if it is still out of core.
+        in_core <bool> : if True, continues in memory once a level fits in a quarter of memory.
+    OUTPUT
+        leaf <array or memmap>, report <dict> with 'time' (minutes), 'out_of_core' (number of levels run
+        out of core) and 'workdir'.
+    '''
+    M = resolve(M)
+    t0 = perf_counter()
+    if isinstance(M, str):
+        M = np.load(M, mmap_mode='r')
+    if 2**(len( block_index )-1) >= M.shape[0]:
+        print(f'ABORTED: block_index is {int( len( block_index ) - np.log2(M.shape[0]) )  } indices too large.')
+        return None, {'time': [0, ]}
+    #
+    ws, L, t = Workspace(workdir), M, [0, ]
+    itemsize = np.dtype( np.result_type(M.dtype, np.float64) ).itemsize
+    levels   = len(block_index)
+    for i in range( len(block_index) ):
+        n = L.shape[0]
+        if in_core == True and 4*n*n*itemsize <= memory:
+            from .batched import sbd_eigenleaf_batched
+            leaf, report = sbd_eigenleaf_batched( np.asarray(L)[None], block_index[i:] )
+            ws.remove(L)
+            t   += [ t[-1] + dt for dt in report['time'][1:] ]
+            L, levels = leaf[0], i
+            break
+        index = int(block_index[i])
+        new   = sbd_eigenvalue_ooc(L, ws, memory=memory, index=index)[index]
+        ws.remove(L)
+        L     = new
+        t.append( (perf_counter()-t0)/60. )
+        emit('level', level=i, index=block_index[i], n=n, duration=(t[-1]-t[-2])*60.)
+    #
+    if not isinstance(L, np.memmap) or os.path.dirname(L.filename or '') != ws.path:
+        ws.close()
+    report = {'time':t, 'out_of_core':levels, 'workdir':ws.path}    # Time is in minutes
+    return L, report
@@ -34,37 +34,21 @@
 
 
 
-from jax.numpy import array, where, kron, concatenate, sqrt
+from jax.numpy import array, sqrt
+
+from ..sequences import odious_range, evil_range
 
 def odious_series(n):
     """ Returns sequence from first to nth odious number.
+    See partialg.sequences for random access and streaming of long sequences.
     """
-    #
-    z = array([1,-1]) 
-    s = z.copy()
-    w = array([1], dtype=int)
-    for i in range(n):
-        s = kron(s,z)
-        w = where( s == -1 )[0]
-        if w.shape[0] >= n:
-            break
-    #
-    return w[:n]
+    return array( odious_range(n) )
 
 def evil_series(n):
-    """ Returns sequence from first to nth odious number.
+    """ Returns sequence from first to nth evil number.
+    See partialg.sequences for random access and streaming of long sequences.
     """
-    #
-    z_ = array([1,1j]) 
-    s = z_.copy()
-    w = array([0], dtype=int)
-    for i in range(n):
-        s = kron(s,z_)
-        w = where( s == -1 )[0]
-        if w.shape[0] >= n:
-            break
-    #
-    return concatenate( (np.array([0]), w[:n-1]) )
+    return array( evil_range(n) )
 
 def zpu_h():
     "Z-pseudo-unitary Hadamard quantum gate"
@@ -0,0 +1,203 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' State-vector simulator for the pseudo-unitary (zpu) gates of partialg.dense.physics.
+
+A state of n qubits is kept as an array of shape (batch, 2**n) and never as a 2**n x 2**n operator: a gate on
+qubit q reshapes the state to (batch, 2**q, 2, 2**(n-q-1)) and mixes the two middle slices in place, so memory
+stays O(batch * 2**n). Qubit 0 is the leftmost factor of the Kronecker product (most significant bit of the
+index), as in kron(g0, g1, ...). Consecutive single-qubit gates on the same qubit are fused into one 2x2 matrix
+before the state is touched.
+
+kha (khaguna) may be an array: the gates are then stacks of shape (batch, 2, 2), one per value, and the circuit
+is simulated for all values at once. Gates are built here in float64 with the formulas of dense.physics
+(which builds jax arrays, float32 unless x64 is enabled), and unitarize=True applies the partial inversion of
+dense.inversion.pinv at the given pivots.
+'''
+
+from time import perf_counter
+
+import numpy as np
+
+from ..instrument import stage
+
+
+def _kha(kha):
+    return np.asarray(kha, dtype=float)[..., None, None]
+
+
+GATES = {
+    'h'  : lambda kha: np.array([[np.sqrt(2), -1], [1, -np.sqrt(2)]]) + 0*_kha(kha),
+    'x'  : lambda kha: np.array([[-1, 1], [-1, 1]]) / _kha(kha),
+    'y'  : lambda kha: np.array([[-1, -1j], [-1j, 1]]) / _kha(kha),
+    'z'  : lambda kha: np.array([[1, 0], [0, -1]]) + _kha(kha)*np.array([[0, 1], [1, 0]]),
+    'i'  : lambda kha: np.array([[1, 0], [0, 1]]) + _kha(kha)*np.array([[0, 1], [1, 0]]),
+    'kha': lambda kha: _kha(kha)*np.ones((2, 2)),
+    'o'  : lambda kha: np.array([[0, 1], [-1, 0]]) + _kha(kha)*np.array([[1, 0], [0, 0]]) + np.array([[0, 0], [0, 1]])/_kha(kha),
+}
+
+
+def exchange(Z, *pivots):
+    ''' Partial inversion of dense.inversion.pinv, vectorized over leading axes of Z (..., m, m).
+    pivots: matrix indices, e.g. (0, 0).
+    '''
+    Z = np.array(Z, dtype=complex)
+    for i, k in pivots:
+        Z_  = 1/Z[..., i, k]
+        new = Z - Z[..., :, k:k+1] * Z_[..., None, None] * Z[..., i:i+1, :]
+        new[..., :, k] = Z[..., :, k] * Z_[..., None]
+        new[..., i, :] = -Z_[..., None] * Z[..., i, :]
+        new[..., i, k] = Z_
+        Z = new
+    return Z
+
+
+def zpu_gate(name, kha=0.0001, unitarize=False, pivots=((0, 0),)):
+    ''' 2x2 zpu gate ('h', 'x', 'y', 'z', 'i', 'o' or 'kha'), of shape (2, 2) for a scalar kha or
+    (len(kha), 2, 2) for an array.
+    unitarize <bool>: partial inversion at pivots (see exchange).
+    '''
+    if name not in GATES:
+        raise Warning(f'ABORTED. Unknown zpu gate {name}. Use one of {sorted(GATES)}.')
+    G = np.asarray(GATES[name](kha), dtype=complex)
+    return exchange(G, *pivots) if unitarize else G
+
+
+class Circuit:
+    ''' Sequence of gates on n qubits.
+    PARAMETERS
+        n <int>: number of qubits.
+    '''
+
+    def __init__(self, n):
+        self.n   = n
+        self.ops = []
+
+    def add(self, G, qubits):
+        ''' Appends gate G (2**k x 2**k, or a stack (batch, 2**k, 2**k)) on the k qubits given (int or tuple).
+        OUTPUT: the circuit, so that calls can be chained.
+        '''
+        qubits = (qubits, ) if np.ndim(qubits) == 0 else tuple(qubits)
+        G      = np.asarray(G, dtype=complex)
+        if G.shape[-1] != 2**len(qubits) or G.shape[-2] != 2**len(qubits):
+            raise Warning(f'ABORTED. A gate on {len(qubits)} qubits must be {2**len(qubits)}x{2**len(qubits)}, not {G.shape[-2:]}.')
+        if any( q < 0 or q >= self.n for q in qubits ) or len(set(qubits)) != len(qubits):
+            raise Warning(f'ABORTED. Invalid qubits {qubits} for a circuit of {self.n} qubits.')
+        self.ops.append( (G, qubits) )
+        return self
+
+    def zpu(self, name, qubit, kha=0.0001, unitarize=False, pivots=((0, 0),)):
+        "Appends zpu_gate(name, kha, unitarize, pivots) on qubit (see zpu_gate)."
+        return self.add( zpu_gate(name, kha=kha, unitarize=unitarize, pivots=pivots), qubit )
+
+    def fused(self):
+        ''' Equivalent list of operations where every run of single-qubit gates on a qubit, not interrupted by a
+        multi-qubit gate on that qubit, is one 2x2 (or batched) matrix.
+        '''
+        ops, pending = [], {}
+        for G, qubits in self.ops:
+            if len(qubits) == 1:
+                q = qubits[0]
+                pending[q] = G if q not in pending else G @ pending[q]
+                continue
+            for q in qubits:
+                if q in pending:
+                    ops.append( (pending.pop(q), (q, )) )
+            ops.append( (G, qubits) )
+        ops += [ (G, (q, )) for q, G in sorted(pending.items()) ]
+        return ops
+
+    def batch(self):
+        "Batch size of the gates (1 if none is batched)."
+        sizes = { G.shape[0] for G, _ in self.ops if G.ndim == 3 }
+        if len(sizes) > 1:
+            raise Warning(f'ABORTED. Gates of different batch sizes {sorted(sizes)}.')
+        return sizes.pop() if sizes else 1
+
+    def run(self, state=None, fuse=True, report=False):
+        ''' Applies the circuit to state.
+        PARAMETERS
+            state : vector of length 2**n, or (batch, 2**n). Default |0...0>.
+            fuse <bool>  : fuse single-qubit gates first (see fused).
+            report <bool>: if True, also returns a report with 'time' (minutes) and 'gates' (number applied).
+        OUTPUT
+            state <array> of shape (batch, 2**n), or (2**n, ) if neither state nor gates are batched.
+        '''
+        t0  = perf_counter()
+        b   = self.batch()
+        ops = self.fused() if fuse else self.ops
+        if state is None:
+            psi = np.zeros((b, 2**self.n), dtype=complex)
+            psi[:, 0] = 1
+            squeeze = b == 1
+        else:
+            psi     = np.array(state, dtype=complex, ndmin=2)
+            squeeze = np.ndim(state) == 1 and b == 1
+            if psi.shape[0] != b:
+                psi = np.repeat(psi, b, axis=0) if psi.shape[0] == 1 else psi
+        #
+        for G, qubits in ops:
+            with stage('gate', n=2**self.n, qubits=len(qubits), batch=psi.shape[0]):
+                psi = apply(psi, G, qubits, self.n)
+        out = psi[0] if squeeze else psi
+        if report:
+            return out, {'time': [0, (perf_counter()-t0)/60.], 'gates': len(ops)}    # Time is in minutes
+        return out
+
+
+def apply(psi, G, qubits, n):
+    ''' Applies gate G to the qubits of the state psi (batch, 2**n).
+    Single-qubit gates are applied in place on the (batch, 2**q, 2, rest) view; others by contraction.
+    '''
+    b = psi.shape[0]
+    if len(qubits) == 1:
+        q   = qubits[0]
+        v   = psi.reshape(b, 2**q, 2, 2**(n-q-1))
+        g   = G.reshape(-1, 2, 2)[:, :, :, None, None]      # Entries broadcast over (batch, 2**q, rest)
+        v0, v1 = v[:, :, 0, :], v[:, :, 1, :]
+        a   = v0.copy()
+        v0 *= g[:, 0, 0]
+        v0 += g[:, 0, 1]*v1
+        v1 *= g[:, 1, 1]
+        v1 += g[:, 1, 0]*a
+        return psi
+    #
+    k   = len(qubits)
+    v   = psi.reshape((b, ) + (2, )*n)
+    v   = np.moveaxis(v, [1+q for q in qubits], list(range(1, k+1))).reshape(b, 2**k, -1)
+    v   = (G if G.ndim == 3 else G[None]) @ v
+    v   = np.moveaxis(v.reshape((b, ) + (2, )*n), list(range(1, k+1)), [1+q for q in qubits])
+    return np.ascontiguousarray(v).reshape(b, 2**n)
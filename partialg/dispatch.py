@@ -0,0 +1,317 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Engine selection for core.pinv and core.sbd with mode='auto'.
+
+features() describes an input (kind, dtype, shape, density, off-diagonal non-zeros per row, Hermiticity,
+batch). A cost model predicts the time of one SBD level per engine:
+    dense, batched : o + a * n**3
+    sparse         : o + a * n**3 * min(1, r)**c,   r = off-diagonal non-zeros per row
+The inverse, products and Newton root of the sparse engine fill in as soon as the rows are coupled (r >= 1),
+after which it is a dense level in sparse formats, about ten times slower than the dense engine; only nearly
+decoupled inputs stay sparse. So the dense engines win on most inputs whose temporaries fit in memory, and
+the sparse engine is used for the others. The batched engine is only considered for (batch, n, n) stacks.
+calibrate() measures these coefficients on this machine and stores them in
+$PARTIALG_CACHE_DIR/costmodel.json (or ~/.cache/partialg/costmodel.json); DEFAULT_MODEL is used until then.
+'''
+
+import os
+import json
+import inspect
+from time import perf_counter
+
+import numpy as np
+from scipy.sparse import issparse, csc_array, diags, random as sprandom
+from scipy.sparse.linalg import LinearOperator
+
+from .shared import resolve
+
+
+# Coefficients (seconds) measured on a small x86 node with calibrate().
+DEFAULT_MODEL = {
+    'dense'  : {'o': 4.2e-3, 'a': 1.7e-10},
+    'batched': {'o': 2.8e-3, 'a': 2.0e-10},
+    'sparse' : {'o': 1.3e-2, 'a': 3.6e-9, 'c': 0.16},
+    'source' : 'default',
+    'version': 2,
+}
+MODEL_VERSION = 2           # Saved models of other versions (other formulas) are ignored
+
+MEMORY_FRACTION = 0.5       # Dense engines are avoided when their temporaries exceed this share of RAM
+DENSE_TEMPORARIES = 10      # Matrices of size (n/2)**2 alive during one dense level, with the input
+
+
+def model_path():
+    "$PARTIALG_CACHE_DIR/costmodel.json, or ~/.cache/partialg/costmodel.json."
+    root = os.environ.get('PARTIALG_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'partialg'))
+    return os.path.join(root, 'costmodel.json')
+
+
+def load_model(path=None):
+    "Calibrated cost model if one was saved, otherwise DEFAULT_MODEL."
+    path = model_path() if path is None else path
+    if os.path.exists(path):
+        with open(path) as f:
+            model = json.load(f)
+        if model.get('version') == MODEL_VERSION:
+            return model
+        print(f'NOTE: ignored the cost model {path} of an older version; run partialg.dispatch.calibrate() again.')
+    return DEFAULT_MODEL
+
+
+def _physical_memory():
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def sampled_hermitian(M, rows=256):
+    ''' Hermiticity of a dense matrix or (batch, n, n) stack, checked on at most `rows` evenly spaced rows against
+    the matching columns: O(rows n) reads instead of the O(n^2) of a full comparison.
+    '''
+    n = M.shape[-1]
+    r = np.unique( np.linspace(0, n - 1, min(rows, n)).astype(int) )
+    return bool( np.allclose( M[..., r, :], np.swapaxes(M[..., :, r], -1, -2).conjugate() ) )
+
+
+def features(M):
+    ''' Properties of M used by the cost model.
+    OUTPUT
+        dict with 'kind' ('pauli', 'kronecker', 'symbolic', 'operator', 'sparse' or 'dense'), 'dtype', 'shape', 'n', 'batch',
+        'density' (non-zero fraction), 'row_nnz' (off-diagonal non-zeros per row), 'hermitian' <bool or None>, sampled
+        for dense inputs (see sampled_hermitian), and 'bytes' (dense size of one matrix).
+    '''
+    M = resolve(M)
+    from .pauli import PauliSum
+    from .dense.kronecker import KronOperator
+    f = {'shape': tuple(M.shape), 'n': int(M.shape[-1]), 'batch': int(M.shape[0]) if len(M.shape) == 3 else None}
+    dtype = getattr(M, 'dtype', None)
+    if isinstance(M, PauliSum):
+        f.update(kind='pauli', dtype=str(dtype), density=None, hermitian=None, terms=len(M))
+    elif isinstance(M, KronOperator):
+        f.update(kind='kronecker', dtype=str(dtype), density=None, hermitian=None, dims=M.dims)
+    elif isinstance(M, LinearOperator):
+        f.update(kind='operator', dtype=str(dtype), density=None, hermitian=None)
+    elif hasattr(M, 'free_symbols') or (dtype is not None and np.dtype(dtype) == object):
+        f.update(kind='symbolic', dtype='object', density=None, hermitian=None)
+    elif issparse(M):
+        M = csc_array(M)
+        H = M - M.T.conjugate()
+        f.update(kind='sparse', dtype=str(M.dtype), density=M.nnz/float(np.prod(M.shape)),
+                 row_nnz=(M.nnz - np.count_nonzero(M.diagonal()))/float(M.shape[0]),
+                 hermitian=bool( H.nnz == 0 or abs(H).max() <= 1e-12*max(abs(M).max(), 1e-300) ))
+    else:
+        M = np.asarray(M)
+        nnz  = np.count_nonzero(M)
+        diag = np.count_nonzero( np.diagonal(M, axis1=-2, axis2=-1) )
+        f.update(kind='dense', dtype=str(M.dtype), density=nnz/float(M.size), row_nnz=(nnz - diag)/float(M.size//M.shape[-1]),
+                 hermitian=sampled_hermitian(M))
+    itemsize = np.dtype(f['dtype']).itemsize if f['kind'] in ('sparse', 'dense') else 8
+    f['bytes'] = f['n']**2 * max(itemsize, 8)
+    return f
+
+
+def estimate(f, model=None):
+    "Predicted seconds of one SBD level per applicable engine, for features f."
+    model = load_model() if model is None else model
+    n     = f['n']
+    out   = {}
+    if f['kind'] in ('pauli', 'kronecker', 'symbolic', 'operator'):
+        return out
+    m = model['sparse']
+    out['dense']   = model['dense']['o'] + model['dense']['a']*n**3
+    out['sparse']  = m['o'] + m['a'] * n**3 * min(1., f['row_nnz'])**m['c']
+    if f['batch'] is not None:          # Stacks only: 2D inputs stay on the 2D engines
+        out = {k: v*f['batch'] for k, v in out.items()}
+        out['batched'] = f['batch']*( model['batched']['a']*n**3 ) + model['batched']['o']
+    return out
+
+
+def dense_fits(f):
+    "True if the temporaries of a dense level of an input with features f fit in MEMORY_FRACTION of RAM."
+    memory = _physical_memory()
+    return memory is None or DENSE_TEMPORARIES*f['bytes']/4 <= MEMORY_FRACTION*memory
+
+
+def _accepts(function, kwargs):
+    params = inspect.signature(function).parameters
+    return all( k in params for k in kwargs ) or any( p.kind == p.VAR_KEYWORD for p in params.values() )
+
+
+def sbd_engines():
+    "Engine name -> SBD level function."
+    from .dense.compression import sbd_eigenvalue
+    from .dense.batched import sbd_eigenvalue_batched
+    from .sparse.compression import sbd_eigenvalues
+    from .symbolic.compression import sbd_eigenvaluey
+    from .pauli import sbd_eigenvaluep
+    return {'dense': sbd_eigenvalue, 'batched': sbd_eigenvalue_batched, 'sparse': sbd_eigenvalues,
+            'symbolic': sbd_eigenvaluey, 'pauli': sbd_eigenvaluep}
+
+
+def choose_sbd(M, model=None, **kwargs):
+    ''' Picks the SBD engine for M.
+    kwargs: options the caller will pass to the engine; engines that do not accept them are excluded.
+    OUTPUT
+        dict with 'engine', 'reason', 'features', 'estimates' (seconds) and 'model' (source of the coefficients).
+    '''
+    model = load_model() if model is None else model
+    f     = features(M)
+    info  = {'features': f, 'estimates': {}, 'model': model.get('source', 'calibrated')}
+    if f['kind'] == 'symbolic':
+        return dict(info, engine='symbolic', reason='symbolic entries: only the symbolic engine applies.')
+    if f['kind'] == 'pauli':
+        return dict(info, engine='pauli', reason=f'Pauli sum of {f["terms"]} terms: Pauli algebra, not materialized.')
+    if f['kind'] in ('operator', 'kronecker'):
+        return dict(info, engine='sparse', reason=f'{f["kind"]} input: matrix-free sparse engine.')
+    if f['batch'] is not None:
+        return dict(info, engine='batched', reason=f'stack of {f["batch"]} matrices: batched engine.',
+                    estimates=estimate(f, model))
+    #
+    engines   = sbd_engines()
+    estimates = estimate(f, model)
+    excluded  = [e for e in estimates if not _accepts(engines[e], kwargs)]
+    if not dense_fits(f):
+        excluded += ['dense', 'batched']
+    candidates = {e: t for e, t in estimates.items() if e not in excluded}
+    if len(candidates) == 0:
+        raise Warning(f'ABORTED. No engine accepts the options {sorted(kwargs)} for this input.')
+    engine = min(candidates, key=candidates.get)
+    reason = (f'{f["kind"]} {f["n"]}x{f["n"]}, density {f["density"]:.3g}, {f["row_nnz"]:.3g} off-diagonal '
+              f'non-zeros per row: {engine} predicted {candidates[engine]:.3g} s per level')
+    others = [f'{e} {t:.3g} s' for e, t in sorted(candidates.items(), key=lambda x: x[1]) if e != engine]
+    if others:
+        reason += ' vs ' + ', '.join(others)
+    if excluded:
+        reason += f'; excluded {", ".join(sorted(set(excluded)))} (options or memory)'
+    return dict(info, engine=engine, reason=reason + '.', estimates=estimates)
+
+
+def run_sbd(M, engine, **kwargs):
+    ''' Runs one SBD level of M with engine, converting M to the representation the engine expects.
+    The leaves of a scipy sparse M are returned as csc arrays whichever engine ran.
+    '''
+    M        = resolve(M)
+    if issparse(M) and engine in ('dense', 'batched'):
+        L0, L1 = run_sbd(M.toarray(), engine, **kwargs)
+        return (csc_array(np.asarray(L0)), csc_array(np.asarray(L1)))
+    function = sbd_engines()[engine]
+    if engine == 'batched':
+        if issparse(M):
+            M = M.toarray()
+        M = np.asarray(M)
+        if M.ndim == 2:
+            L0, L1 = function(M[None], **kwargs)
+            return (L0[0], L1[0])
+        return function(M, **kwargs)
+    if hasattr(M, 'aslinearoperator'):          # KronOperator
+        M = M.aslinearoperator() if engine == 'sparse' else M.toarray()
+    if engine == 'dense' and issparse(M):
+        M = M.toarray()
+    if engine == 'sparse' and not issparse(M) and not isinstance(M, LinearOperator):
+        M = csc_array(M)
+    return function(M, **kwargs)
+
+
+def choose_pinv(M):
+    ''' Picks the partial inversion engine for M.
+    OUTPUT
+        dict with 'engine' ('dense', 'kronecker' or 'symbolic'), 'reason' and 'features'.
+    '''
+    if isinstance(M, (list, tuple)):
+        return {'engine': 'kronecker', 'reason': 'list of factors: Kronecker-structured pinvk.', 'features': {}}
+    f = features(M)
+    if f['kind'] == 'kronecker':
+        return {'engine': 'kronecker', 'reason': 'Kronecker-structured input: pinvk, no 2**n matrix.', 'features': f}
+    if f['kind'] == 'symbolic':
+        return {'engine': 'symbolic', 'reason': 'symbolic entries: pinvy keeps them exact.', 'features': f}
+    if f['kind'] == 'sparse':
+        if not dense_fits(f):
+            raise Warning(f'ABORTED. There is no sparse partial inversion, and a dense copy of this {f["n"]}x{f["n"]} '
+                          f'matrix ({f["bytes"]} bytes) would not fit in memory.')
+        return {'engine': 'dense', 'reason': 'no sparse partial inversion: densified for the dense engine.',
+                'features': f}
+    return {'engine': 'dense', 'reason': f'numeric {f["kind"]} input: dense engine.', 'features': f}
+
+
+def _timed(function, repeats):
+    best = float('inf')
+    for r in range(repeats):
+        t0 = perf_counter()
+        function()
+        best = min(best, perf_counter() - t0)
+    return best
+
+
+def calibrate(sizes=(64, 128, 256, 512, 1024), row_nnz=(0.1, 0.5, 2.), repeats=3, path=None, save=True):
+    ''' Measures the cost model on this machine (one SBD level per engine on random perturbations of
+    diag(1, ..., n), whose blocks have well-separated spectra, with row_nnz off-diagonal non-zeros per row
+    for the sparse engine). The sizes reach 1024 because the sparse engine slows down sharply once its
+    levels fill in; a fit on small sizes only underestimates it. Takes about a minute.
+    OUTPUT
+        model <dict>, also written to path (default model_path()) if save.
+    '''
+    engines = sbd_engines()
+    rng     = np.random.default_rng(0)
+    rows    = {'dense': [], 'batched': [], 'sparse': []}
+    for n in sizes:
+        M = rng.random((n, n)) + np.diag( np.arange(1., n+1)*n )
+        engines['dense'](M)                                         # Warm-up (jax compilation of small ops)
+        rows['dense'].append( (n, 1., _timed(lambda: engines['dense'](M), repeats)) )
+        rows['batched'].append( (n, 1., _timed(lambda: engines['batched'](M[None]), repeats)) )
+        for r in row_nnz:
+            S = csc_array( sprandom(n, n, density=r/n, random_state=int(rng.integers(2**31))) + diags(np.arange(1., n+1)*n) )
+            rows['sparse'].append( (n, (S.nnz - n)/n, _timed(lambda: engines['sparse'](S), repeats)) )
+    #
+    model = {'source': 'calibrated', 'version': MODEL_VERSION}
+    for engine in ('dense', 'batched'):
+        n, _, t = np.array(rows[engine]).T
+        (o, a), *_ = np.linalg.lstsq( np.stack([np.ones_like(n), n**3], axis=1), t, rcond=None )
+        model[engine] = {'o': float(max(o, 0.)), 'a': float(max(a, 1e-15))}
+    n, r, t = np.array(rows['sparse']).T
+    o = 0.5*t.min()
+    w = t > 4*o                     # Fit the power law where it is not hidden by the overhead
+    x = np.log( np.clip(r, 1e-3, 1.) )
+    (la, c), *_ = np.linalg.lstsq( np.stack([np.ones_like(n), x], axis=1)[w], np.log( t[w] - o ) - 3*np.log(n[w]), rcond=None )
+    model['sparse'] = {'o': float(o), 'a': float(np.exp(la)), 'c': float(max(c, 0.))}
+    #
+    if save:
+        path = model_path() if path is None else path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(model, f, indent=1)
+    return model
@@ -0,0 +1,187 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+from time import perf_counter           # For time measurement
+import tracemalloc                      # For peak memory measurement
+
+
+# Active callbacks. Instrumentation is disabled while this list is empty.
+_callbacks = []
+_tracing   = [0]     # Number of active recorders that trace memory
+
+
+def add_callback(callback):
+    ''' Registers callback(event, fields) to receive every instrumentation event.
+    event <str>   : 'stage', 'level' or 'fallback'.
+    fields <dict> : data of the event (see record).
+    '''
+    _callbacks.append(callback)
+
+
+def remove_callback(callback):
+    "Unregisters a callback added with add_callback."
+    _callbacks.remove(callback)
+
+
+def enabled():
+    "True if at least one callback is registered."
+    return len(_callbacks) > 0
+
+
+def emit(event, **fields):
+    "Sends an event to all callbacks. Does nothing when instrumentation is disabled."
+    if _callbacks:
+        for callback in tuple(_callbacks):
+            callback(event, fields)
+
+
+class _Stage:
+    "Times a block of code and emits a 'stage' event when it exits."
+    __slots__ = ('fields', 't0')
+
+    def __init__(self, name, fields):
+        self.fields = fields
+        self.fields['stage'] = name
+
+    def __enter__(self):
+        if _tracing[0]:
+            tracemalloc.reset_peak()
+        self.t0 = perf_counter()
+        return self
+
+    def update(self, **fields):
+        "Adds fields known only after the stage ran, such as nnz of its output."
+        self.fields.update(fields)
+
+    def __exit__(self, *exc):
+        self.fields['duration'] = perf_counter() - self.t0
+        if _tracing[0]:
+            self.fields['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        emit('stage', **self.fields)
+        return False
+
+
+class _NullStage:
+    "Shared do-nothing stage returned while instrumentation is disabled."
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def update(self, **fields):
+        pass
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_stage = _NullStage()
+
+
+def stage(name, **fields):
+    ''' Context manager timing a named stage of an SBD level, e.g.
+        with stage('inverse', n=k, flops=2*k**3) as s:
+            A_ = inv(A)
+            s.update(nnz=A_.nnz)
+    Costs one list check when instrumentation is disabled.
+    '''
+    if not _callbacks:
+        return _null_stage
+    return _Stage(name, fields)
+
+
+class record:
+    ''' Context manager collecting instrumentation events of the dense, sparse and symbolic compressions.
+    PARAMETERS
+        callback <callable>: optional callback(event, fields). If None, events are stored in self.events.
+        memory <bool>      : if True, traces memory with tracemalloc and adds 'peak_bytes' to each stage.
+                             Tracing slows down the computation; keep it off for timing runs.
+    EVENTS
+        'stage'   : stage <str> ('block', 'inverse', 'determinant', 'sqrt', 'eigensolve'), duration <float, s>,
+                    n <int> (block size), and when known flops <int>, nnz <int>, peak_bytes <int>.
+        'level'   : level <int>, index <str>, n <int>, duration <float, s> and nnz <int> for sparse levels.
+        'fallback': stage <str>, method <str>, reason <str>.
+    EXAMPLE
+        with record() as rec:
+            sbd_eigenleaf(M, '000')
+        rec.summary()
+    '''
+
+    def __init__(self, callback=None, memory=False):
+        self.events   = []
+        self.memory   = memory
+        self.callback = self._collect if callback is None else callback
+        self._started = False
+
+    def _collect(self, event, fields):
+        self.events.append( dict(fields, event=event) )
+
+    def __enter__(self):
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            _tracing[0] += 1
+        add_callback(self.callback)
+        return self
+
+    def __exit__(self, *exc):
+        remove_callback(self.callback)
+        if self.memory:
+            _tracing[0] -= 1
+            if self._started:
+                tracemalloc.stop()
+                self._started = False
+        return False
+
+    def summary(self):
+        ''' Aggregates collected stage events.
+        OUTPUT
+            dict stage -> {'count', 'duration' (total, s), 'flops' (total), 'peak_bytes' (max)}
+            plus 'fallbacks' <int>.
+        '''
+        out = {'fallbacks': 0}
+        for e in self.events:
+            if e['event'] == 'fallback':
+                out['fallbacks'] += 1
+            if e['event'] != 'stage':
+                continue
+            s = out.setdefault(e['stage'], {'count': 0, 'duration': 0., 'flops': 0, 'peak_bytes': 0})
+            s['count']     += 1
+            s['duration']  += e['duration']
+            s['flops']     += e.get('flops', 0)
+            s['peak_bytes'] = max(s['peak_bytes'], e.get('peak_bytes', 0))
+        return out
@@ -0,0 +1,230 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Monte Carlo engine for the accuracy studies of partialg.dense.statistics and partialg.sparse.statistics.
+
+Samples are split into chunks of chunk_size trials. Chunk j draws its random Hermitian matrices from
+numpy.random.SeedSequence(seed).spawn(n_chunks)[j], so results depend on seed and chunk_size only, not on
+the number of workers or on the order in which chunks finish. Every chunk returns streaming (Welford)
+statistics that are merged in chunk order; no sample is kept in memory. Partial results can be written to
+and resumed from a JSON checkpoint, and checkpoints of different runs merged with merge_results.
+'''
+
+import os
+import json
+from math import sqrt
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+
+
+class Welford:
+    ''' Streaming mean and variance, mergeable (Chan et al. parallel update).
+    ATTRIBUTES
+        count <int>, mean <float>, M2 <float> (sum of squared deviations from the mean)
+    '''
+
+    def __init__(self, count=0, mean=0., M2=0.):
+        self.count = count
+        self.mean  = mean
+        self.M2    = M2
+
+    def update(self, x):
+        self.count += 1
+        delta       = x - self.mean
+        self.mean  += delta/self.count
+        self.M2    += delta*(x - self.mean)
+
+    def merge(self, other):
+        "Adds the samples summarized by other. Returns self."
+        if other.count == 0:
+            return self
+        count     = self.count + other.count
+        delta     = other.mean - self.mean
+        self.mean = self.mean + delta*other.count/count
+        self.M2   = self.M2 + other.M2 + delta**2*self.count*other.count/count
+        self.count = count
+        return self
+
+    def std(self):
+        "Population standard deviation (as numpy.std)."
+        return sqrt(self.M2/self.count) if self.count > 0 else float('nan')
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'M2': self.M2}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d['count'], d['mean'], d['M2'])
+
+
+def _trial_functions(mode):
+    if mode == 'dense':
+        from .dense.statistics import random_hermitian, sbd_error_trial
+        return random_hermitian, sbd_error_trial
+    elif mode == 'sparse':
+        from .sparse.statistics import random_hermitians, sbd_errors_trial
+        return random_hermitians, sbd_errors_trial
+    raise Warning("ABORTED. Only dense or sparse are supported.")
+
+
+def run_chunk(matrix_size, n_trials, seed_sequence, block_eigensolver, T=0, N=1, mode='dense'):
+    ''' Runs n_trials trials with the generator of seed_sequence.
+    OUTPUT
+        dict with Welford statistics 'error' (|reference - tested|) and 'ratio' (error/|reference|),
+        'failed' <int> (trials with a non-finite result or an exception) and 'time' (minutes).
+    '''
+    t0             = perf_counter()
+    generate, trial = _trial_functions(mode)
+    rng            = np.random.default_rng(seed_sequence)
+    error, ratio   = Welford(), Welford()
+    failed         = 0
+    for i in range(n_trials):
+        M = generate(matrix_size, rng)
+        try:
+            ref, tested = trial(M, block_eigensolver, T=T, N=N)
+            e = abs( complex(ref) - complex(tested) )
+            r = e/abs( complex(ref) )
+        except Exception:
+            failed += 1
+            continue
+        if not (np.isfinite(e) and np.isfinite(r)):
+            failed += 1
+            continue
+        error.update(e)
+        ratio.update(r)
+    return {'error': error.to_dict(), 'ratio': ratio.to_dict(), 'failed': failed, 'time': (perf_counter()-t0)/60.}
+
+
+def _run_chunk(args):
+    return args[0], run_chunk(*args[1:])
+
+
+def _settings(matrix_size, sample_size, T, N, mode, seed, chunk_size):
+    return {'matrix_size': list(matrix_size), 'sample_size': sample_size, 'T': T, 'N': N,
+            'mode': mode, 'seed': seed, 'chunk_size': chunk_size}
+
+
+def _read_checkpoint(path, settings):
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        saved = json.load(f)
+    if saved['settings'] != settings:
+        raise Warning(f'ABORTED. {path} was written with different settings: {saved["settings"]}.')
+    return {int(j): c for j, c in saved['chunks'].items()}
+
+
+def _write_checkpoint(path, settings, chunks):
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'settings': settings, 'chunks': {str(j): c for j, c in sorted(chunks.items())}}, f)
+    os.replace(path + '.tmp', path)
+
+
+def summarize(chunks):
+    ''' Merges chunk results in chunk order.
+    chunks <dict>: chunk index -> output of run_chunk.
+    OUTPUT
+        dict with 'mean_error', 'error_std', 'mean_ratio', 'ratio_std', 'samples', 'failed', 'time' (minutes).
+    '''
+    error, ratio = Welford(), Welford()
+    failed, t    = 0, 0.
+    for j in sorted(chunks):
+        error.merge( Welford.from_dict(chunks[j]['error']) )
+        ratio.merge( Welford.from_dict(chunks[j]['ratio']) )
+        failed += chunks[j]['failed']
+        t      += chunks[j]['time']
+    return {'mean_error': error.mean, 'error_std': error.std(), 'mean_ratio': ratio.mean, 'ratio_std': ratio.std(),
+            'samples': error.count, 'failed': failed, 'time': t, 'error': error.to_dict(), 'ratio': ratio.to_dict()}
+
+
+def sbd_error_mc(matrix_size, sample_size, block_eigensolver, T=0, N=1, mode='dense', seed=0,
+                 workers=1, chunk_size=1000, checkpoint=None):
+    ''' Monte Carlo estimate of the SBD ground state error over random Hermitian matrices,
+    with the trials of sbd_error (mode='dense') or sbd_errors (mode='sparse').
+    PARAMETERS
+        matrix_size <tuple>        : shape of the random factor of M = R @ R.T.conjugate().
+        sample_size <int>          : number of trials.
+        block_eigensolver <callable>: as in sbd_error. With workers > 1 it is sent to the worker processes and
+                                      must be picklable: a module-level function or a functools.partial of one,
+                                      e.g. partial(sbd_eigenleaf, block_index='000'), not a lambda.
+        T, N                       : translation and multiplication factors, as in sbd_error.
+        seed <int>                 : root seed. Same seed and chunk_size give the same result for any workers.
+        workers <int>              : number of processes. 1 runs in this process.
+        chunk_size <int>           : trials per chunk (unit of work, seeding and checkpointing).
+        checkpoint <str>           : JSON file of partial results. Finished chunks found there are skipped,
+                                     new ones are added as they complete.
+    OUTPUT
+        dict (see summarize) with the settings of the run.
+    '''
+    settings = _settings(matrix_size, sample_size, T, N, mode, seed, chunk_size)
+    n_chunks = -(-sample_size // chunk_size)
+    seeds    = np.random.SeedSequence(seed).spawn(n_chunks)
+    chunks   = _read_checkpoint(checkpoint, settings)
+    todo     = [ (j, matrix_size, min(chunk_size, sample_size - j*chunk_size), seeds[j], block_eigensolver, T, N, mode)
+                 for j in range(n_chunks) if j not in chunks ]
+    #
+    if workers == 1:
+        results = map(_run_chunk, todo)
+        for j, c in results:
+            chunks[j] = c
+            if checkpoint is not None:
+                _write_checkpoint(checkpoint, settings, chunks)
+    else:
+        # spawn: jax is multithreaded and does not survive fork
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            for j, c in pool.map(_run_chunk, todo):
+                chunks[j] = c
+                if checkpoint is not None:
+                    _write_checkpoint(checkpoint, settings, chunks)
+    #
+    return dict(summarize(chunks), **settings)
+
+
+def merge_results(paths):
+    ''' Merges the checkpoints of independent runs (e.g. different seeds, or machines) into one summary.
+    OUTPUT
+        dict (see summarize) with 'runs' <int>.
+    '''
+    chunks = {}
+    for i, path in enumerate(paths):
+        with open(path) as f:
+            saved = json.load(f)
+        for j, c in saved['chunks'].items():
+            chunks[(i, int(j))] = c
+    return dict(summarize(chunks), runs=len(paths))
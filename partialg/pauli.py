@@ -0,0 +1,461 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' SBD of Hamiltonians given as Pauli sums, without materializing the 2**n x 2**n matrix.
+
+A Pauli sum on n qubits is stored in symplectic form: term k is c_k * P(x_k, z_k) with
+    P(x, z) = i**popcount(x & z) * X**x Z**z        (X**x Z**z applied qubit by qubit),
+where x, z are n-bit masks (uint64, so n <= 64). Qubit 0 is the leftmost character of a Pauli string and the
+most significant bit of the row index, as in the block split of blocks(): the first qubit's factor decides
+the block, I and Z go to the diagonal blocks (Z with a sign on the second), X and Y to the off-diagonal ones.
+Products of terms cost O(1) bit operations, so a level of the compression costs O(T**2) for T terms and its
+memory scales with the number of terms, not with 2**n.
+
+Because the inverse of a Pauli sum is not sparse in the Pauli basis, sbd_eigenvaluep uses the inverse-free
+block determinant d = A B - D C of the singular-matrix method of sbd_eigenvalues (equal to the determinant
+with inverse when D and A commute) and an inverse-free (coupled Newton-Schulz) square root. Small terms are
+dropped at every product (tol, max_terms) to keep the number of terms bounded.
+'''
+
+from time import perf_counter
+
+import numpy as np
+from scipy.sparse import coo_array, csc_array, issparse
+
+from .instrument import stage, emit
+
+
+LABELS = 'IXZY'        # Label of a qubit factor, indexed by x + 2*z
+PHASES = np.array([1, 1j, -1, -1j])
+CHUNK  = 2**22          # Largest number of term pairs formed at once in a product
+
+
+def _popcount(a):
+    return np.bitwise_count(a).astype(np.int64)
+
+
+class PauliSum:
+    ''' Sum of Pauli strings with complex coefficients.
+    PARAMETERS
+        n <int>   : number of qubits (at most 64).
+        x, z      : uint64 arrays of bit masks, one per term.
+        c         : complex coefficients, one per term.
+    '''
+
+    def __init__(self, n, x, z, c):
+        if n > 64:
+            raise Warning('ABORTED. Pauli sums support at most 64 qubits.')
+        self.n = n
+        self.x = np.asarray(x, dtype=np.uint64)
+        self.z = np.asarray(z, dtype=np.uint64)
+        self.c = np.asarray(c, dtype=complex)
+
+    @classmethod
+    def from_strings(cls, strings, coeffs):
+        "From Pauli strings such as 'XIZY' (all of the same length) and their coefficients."
+        strings = list(strings)
+        n       = len(strings[0])
+        x, z    = np.zeros(len(strings), dtype=np.uint64), np.zeros(len(strings), dtype=np.uint64)
+        for k, s in enumerate(strings):
+            if len(s) != n:
+                raise Warning(f'ABORTED. Pauli string {s} does not have {n} qubits.')
+            for q, p in enumerate(s.upper()):
+                bit = np.uint64(1) << np.uint64(n-1-q)
+                if p in 'XY':
+                    x[k] |= bit
+                if p in 'ZY':
+                    z[k] |= bit
+                if p not in LABELS:
+                    raise Warning(f'ABORTED. {p} is not a Pauli label in {s}.')
+        return cls(n, x, z, coeffs).simplify(tol=0)
+
+    @classmethod
+    def identity(cls, n, c=1.):
+        return cls(n, [0], [0], [c])
+
+    def to_strings(self):
+        ''' Pauli strings and coefficients of the terms.
+        OUTPUT
+            strings <array of str, dtype U{n}>, coeffs <array(complex)>
+        '''
+        if self.n == 0:
+            return np.full(len(self), '', dtype='<U1'), self.c.copy()
+        shift = np.arange(self.n-1, -1, -1, dtype=np.uint64)
+        code  = ( (self.x[:, None] >> shift) & np.uint64(1) ) + 2*( (self.z[:, None] >> shift) & np.uint64(1) )
+        chars = np.array(list(LABELS))[ code.astype(np.int64) ]
+        return np.ascontiguousarray(chars).view(f'<U{self.n}').ravel(), self.c.copy()
+
+    @property
+    def shape(self):
+        return (2**self.n, 2**self.n)
+
+    @property
+    def dtype(self):
+        return self.c.dtype
+
+    def __len__(self):
+        return len(self.c)
+
+    def __repr__(self):
+        return f'PauliSum({self.n} qubits, {len(self)} terms)'
+
+    def norm1(self):
+        "Sum of |c_k|, an upper bound of the spectral norm."
+        return float( np.abs(self.c).sum() )
+
+    def simplify(self, tol=1e-14, max_terms=None):
+        ''' Combines equal strings and drops small terms.
+        tol <float>     : terms with |c| <= tol * max|c| are dropped.
+        max_terms <int> : if given, only the max_terms largest terms are kept.
+        '''
+        if len(self) == 0:
+            return self
+        order = np.lexsort((self.z, self.x))
+        x, z  = self.x[order], self.z[order]
+        start = np.flatnonzero( np.r_[True, (x[1:] != x[:-1]) | (z[1:] != z[:-1])] )
+        x, z  = x[start], z[start]
+        c     = np.add.reduceat(self.c[order], start)
+        size  = np.abs(c)
+        keep  = size > tol*size.max() if size.max() > 0 else np.zeros(len(c), dtype=bool)
+        if max_terms is not None and keep.sum() > max_terms:
+            keep[:] = False
+            keep[ np.argpartition(-size, max_terms-1)[:max_terms] ] = True
+        return PauliSum(self.n, x[keep], z[keep], c[keep])
+
+    def __add__(self, other):
+        if not isinstance(other, PauliSum):
+            other = PauliSum.identity(self.n, other)
+        if other.n != self.n:
+            raise Warning(f'ABORTED. Pauli sums of {self.n} and {other.n} qubits.')
+        return PauliSum(self.n, np.r_[self.x, other.x], np.r_[self.z, other.z], np.r_[self.c, other.c]).simplify(tol=0)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return PauliSum(self.n, self.x, self.z, -self.c)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        if isinstance(other, PauliSum):
+            return self.dot(other)
+        return PauliSum(self.n, self.x, self.z, self.c*other)
+
+    def __rmul__(self, other):
+        return PauliSum(self.n, self.x, self.z, other*self.c)
+
+    def __matmul__(self, other):
+        return self.dot(other)
+
+    def dot(self, other, tol=1e-14, max_terms=None):
+        ''' Operator product self @ other, simplified with tol and max_terms (see simplify).
+        P(x1, z1) P(x2, z2) = i**e P(x1^x2, z1^z2), e = |x1&z1| + |x2&z2| - |x3&z3| + 2|z1&x2| (mod 4).
+        '''
+        if other.n != self.n:
+            raise Warning(f'ABORTED. Pauli sums of {self.n} and {other.n} qubits.')
+        if len(self) == 0 or len(other) == 0:
+            return PauliSum(self.n, [], [], [])
+        w2    = _popcount(other.x & other.z)
+        rows  = max( 1, CHUNK // max(len(other), 1) )
+        parts = []
+        for i in range(0, len(self), rows):
+            x1, z1, c1 = self.x[i:i+rows, None], self.z[i:i+rows, None], self.c[i:i+rows, None]
+            x3, z3 = x1 ^ other.x, z1 ^ other.z
+            e = ( _popcount(x1 & z1) + w2 - _popcount(x3 & z3) + 2*_popcount(z1 & other.x) ) % 4
+            parts.append( PauliSum(self.n, x3.ravel(), z3.ravel(), (c1 * other.c * PHASES[e]).ravel()).simplify(tol=0) )
+        out = PauliSum(self.n, np.concatenate([p.x for p in parts]), np.concatenate([p.z for p in parts]),
+                       np.concatenate([p.c for p in parts]))
+        return out.simplify(tol=tol, max_terms=max_terms)
+
+    def blocks(self):
+        ''' The 2x2 block split of the matrix on the first qubit, as blocks() of the sparse engine.
+        OUTPUT
+            ((A, C), (D, B)) <PauliSum> on n-1 qubits: A top-left, C top-right, D bottom-left, B bottom-right.
+        '''
+        top   = np.uint64(1) << np.uint64(self.n-1)
+        rest  = top - np.uint64(1)
+        xb, zb = (self.x & top) != 0, (self.z & top) != 0
+        x, z  = self.x & rest, self.z & rest
+        def part(mask, factor):
+            return PauliSum(self.n-1, x[mask], z[mask], factor*self.c[mask])
+        I, X, Y, Z = ~xb & ~zb, xb & ~zb, xb & zb, ~xb & zb
+        A = part(I, 1) + part(Z, 1)
+        B = part(I, 1) + part(Z, -1)
+        C = part(X, 1) + part(Y, -1j)
+        D = part(X, 1) + part(Y, 1j)
+        return ((A, C), (D, B))
+
+    def to_sparse(self):
+        ''' Materializes the 2**n x 2**n matrix (scipy.sparse.csc_array). Terms with the same x share a
+        sparsity pattern, so the cost is (number of distinct x) * 2**n.
+        '''
+        dim       = 2**self.n
+        if len(self) == 0:          # Vanishing sum
+            return csc_array((dim, dim), dtype=complex)
+        r         = np.arange(dim, dtype=np.uint64)
+        rows, cols, vals = [], [], []
+        for x in np.unique(self.x):
+            k    = self.x == x
+            diag = np.zeros(dim, dtype=complex)
+            for z, c in zip(self.z[k], self.c[k]):
+                diag += c * PHASES[ _popcount(x & z) % 4 ] * (1 - 2*(_popcount(r & z) % 2))
+            rows.append( r ^ x )
+            cols.append( r )
+            vals.append( diag )
+        M = coo_array( (np.concatenate(vals), (np.concatenate(rows).astype(np.int64), np.concatenate(cols).astype(np.int64))),
+                       shape=(dim, dim) ).tocsc()
+        M.eliminate_zeros()
+        return M
+
+    def toarray(self):
+        return self.to_sparse().toarray()
+
+
+def _fwht(W):
+    "Unnormalized Walsh-Hadamard transform along the last axis (length 2**m), in place of W."
+    rows, size = W.shape
+    h = 1
+    while h < size:
+        V       = W.reshape(rows, size//(2*h), 2, h)
+        a, b    = V[:, :, 0, :].copy(), V[:, :, 1, :]
+        V[:, :, 0, :] += b
+        V[:, :, 1, :]  = a - b
+        h *= 2
+    return W
+
+
+def pauli_decompose(M, tol=0., relative=True, max_terms=None):
+    ''' Pauli coefficients of a 2**n x 2**n matrix, c(x, z) = Tr( P(x, z)^dagger M ) / 2**n.
+    For every x, the entries M[r ^ x, r] are gathered into a vector of r and a Walsh-Hadamard transform gives
+    the sums over r with signs (-1)**popcount(z & r) for all z at once:
+        dense : O(n 4**n) operations on a 2**n x 2**n work array;
+        sparse: only the x = row ^ col present among the non-zeros are transformed, O(n 2**n) each, so a
+                leaf with few distinct patterns (e.g. diagonal plus a few hoppings) costs O(nnz + #x n 2**n).
+    PARAMETERS
+        M              : numpy/jax array, scipy sparse matrix or PauliSum (returned simplified).
+        tol <float>    : coefficients with |c| <= tol (tol*max|c| if relative) are dropped.
+        max_terms <int>: if given, only the max_terms largest coefficients are kept.
+    OUTPUT
+        PauliSum
+    '''
+    if isinstance(M, PauliSum):
+        return M.simplify(tol=tol, max_terms=max_terms)
+    dim = M.shape[0]
+    n   = dim.bit_length() - 1
+    if M.shape != (dim, dim) or dim != 2**n:
+        raise Warning(f'ABORTED. Pauli decomposition needs a square matrix of size 2**n, not {M.shape}.')
+    r = np.arange(dim, dtype=np.int64)
+    with stage('pauli_decompose', n=dim) as s:
+        if issparse(M):
+            M    = coo_array(M)
+            xs   = M.row.astype(np.int64) ^ M.col.astype(np.int64)
+            x, i = np.unique(xs, return_inverse=True)
+            W    = np.zeros((len(x), dim), dtype=complex)
+            np.add.at(W, (i, M.col.astype(np.int64)), M.data)      # W[x, r] = M[r ^ x, r]
+        else:
+            M    = np.asarray(M)
+            x    = r
+            W    = M[ r[:, None] ^ r[None, :], r[None, :] ].astype(complex)
+        _fwht(W)                                                    # W[x, z] = sum_r (-1)**|z & r| M[r ^ x, r]
+        xx   = np.repeat(x, dim).astype(np.uint64)
+        zz   = np.tile(r, len(x)).astype(np.uint64)
+        c    = W.ravel() * PHASES[ (-_popcount(xx & zz)) % 4 ] / dim
+        size = np.abs(c)
+        keep = size > ( tol*size.max() if relative and len(c) > 0 else tol )
+        P = PauliSum(n, xx[keep], zz[keep], c[keep])
+        if max_terms is not None:
+            P = P.simplify(tol=0, max_terms=max_terms)
+        s.update(terms=len(P))
+    return P
+
+
+def save_pauli(path, P):
+    ''' Writes the strings and coefficients of a PauliSum (or of pauli_decompose(P)) to an .npz file with
+    arrays 'strings', 'coeffs', 'x', 'z' and 'n'.
+    '''
+    P = pauli_decompose(P)
+    strings, coeffs = P.to_strings()
+    np.savez(path, strings=strings, coeffs=coeffs, x=P.x, z=P.z, n=P.n)
+
+
+def load_pauli(path):
+    "PauliSum written by save_pauli."
+    with np.load(path) as f:
+        return PauliSum(int(f['n']), f['x'], f['z'], f['coeffs'])
+
+
+def to_pennylane(P, real=True):
+    ''' qml.Hamiltonian of a PauliSum (or of pauli_decompose(P)), wire q acting on the q-th character of the
+    Pauli strings, as the sparse_to_pennylane helper of TUTORIAL.ipynb. Needs pennylane.
+    real <bool>: keep only the real part of the coefficients (Hermitian input).
+    '''
+    import pennylane as qml
+    P        = pauli_decompose(P)
+    strings, coeffs = P.to_strings()
+    ops      = {'X': qml.PauliX, 'Y': qml.PauliY, 'Z': qml.PauliZ}
+    observables = []
+    for s in strings:
+        factors = [ ops[p](q) for q, p in enumerate(s) if p != 'I' ]
+        if len(factors) == 0:
+            observables.append( qml.Identity(0) )
+        else:
+            term = factors[0]
+            for f in factors[1:]:
+                term = term @ f
+            observables.append(term)
+    return qml.Hamiltonian(coeffs.real if real else coeffs, observables)
+
+
+def pauli_sum(M):
+    "PauliSum from a PauliSum, a (strings, coeffs) pair or a list of (string, coeff) pairs."
+    if isinstance(M, PauliSum):
+        return M
+    # (strings, coeffs) has only strings in M[0]; a (string, coeff) pair has a number second
+    if len(M) == 2 and not isinstance(M[0], str) and all( isinstance(s, str) for s in M[0] ):
+        return PauliSum.from_strings(M[0], M[1])
+    strings, coeffs = zip(*M)
+    return PauliSum.from_strings(strings, coeffs)
+
+
+#==============================================
+
+def ns_sqrtp(a, max_it=30, tol=1e-14, max_terms=None, rtol=1e-10, scale=None, max_residual=1e-6):
+    ''' Inverse-free (coupled Newton-Schulz) square root of Pauli sum a:
+        Y_0 = a/scale, Z_0 = I, T = (3I - Z Y)/2, Y <- Y T, Z <- T Z,   Y -> sqrt(a/scale).
+    Converges when the spectrum of a/scale lies in (0, 2), e.g. for a positive definite a with scale >= ||a||.
+    Otherwise the iterates overflow, and simplify drops their non-finite terms: raises Warning if ||I - Z Y||
+    is still above max_residual after max_it iterations, rather than returning a wrong (often empty) root.
+    PARAMETERS
+        tol, max_terms : truncation of every product (see PauliSum.simplify).
+        rtol <float>   : stops when ||I - Z Y|| (coefficient norm) is below rtol.
+        scale <float>  : default a.norm1().
+        max_residual <float>: largest ||I - Z Y|| accepted (truncation with max_terms may need a larger one).
+    '''
+    if len(a) == 0:                 # sqrt(0) = 0
+        return a
+    scale = a.norm1() if scale is None else scale
+    I     = PauliSum.identity(a.n)
+    Y, Z  = a*(1/scale), I
+    for i in range(max_it):
+        T = (3*I - Z.dot(Y, tol=tol, max_terms=max_terms))*0.5
+        Y, Z = Y.dot(T, tol=tol, max_terms=max_terms), T.dot(Z, tol=tol, max_terms=max_terms)
+        if np.linalg.norm( (T - I).c )*2 <= rtol:
+            break
+    residual = np.linalg.norm( (I - Z.dot(Y, tol=tol, max_terms=max_terms)).c )
+    if not residual <= max_residual:
+        raise Warning(f'ABORTED. The Pauli square root did not converge (||I - Z Y|| = {residual:.2e} after {max_it} '
+                      'iterations): the spectrum of a/scale is not in (0, 2).')
+    return Y*np.sqrt(scale)
+
+
+def sbd_eigenvaluep(a, sqrt=ns_sqrtp, tol=1e-14, max_terms=None):
+    ''' Matrix-polynomial root via Sridhara-based Block Diagonalization method, in Pauli algebra.
+    PARAMETERS
+        a              : PauliSum, (strings, coeffs) or list of (string, coeff).
+        sqrt <callable>: square root of a PauliSum.
+        tol, max_terms : truncation of every product (see PauliSum.simplify).
+    OUTPUT
+        (L0, L1) <tuple(PauliSum)> on one qubit less.
+    '''
+    a = pauli_sum(a)
+    with stage('block', n=2**(a.n-1), terms=len(a)):
+        (A, C), (D, B) = a.blocks()
+    t = A + B        # Block-trace
+    with stage('determinant', n=2**(a.n-1)) as s:
+        d = A.dot(B, tol=tol, max_terms=max_terms) - D.dot(C, tol=tol, max_terms=max_terms)   # Block-determinant, inverse-free
+        s.update(terms=len(d))
+    with stage('sqrt', n=2**(a.n-1)) as s:
+        term = sqrt( t.dot(t, tol=tol, max_terms=max_terms) - 4*d )
+        s.update(terms=len(term))
+    L0 = (t - term)*0.5
+    L1 = (t + term)*0.5
+    return (L0, L1)
+
+
+def sbd_eigenbranchp(M, block_index='0', only_even=False, tol=1e-14, max_terms=None, materialize=False):
+    ''' sbd_eigenbranchs for Pauli sums.
+    block_index, only_even: as in sbd_eigenbranchs.
+    tol, max_terms : truncation of every product (see PauliSum.simplify).
+    materialize <bool>: if True, the levels are returned as scipy sparse matrices instead of PauliSums.
+    OUTPUT
+        L <list>, report <dict> with 'time' (minutes) and 'terms' (number of terms per level).
+    '''
+    t0 = perf_counter()
+    M  = pauli_sum(M)
+    if len(block_index) >= M.n:
+        print(f'ABORTED: block_index is {len(block_index) - M.n + 1} indices too large.')
+        return None, {'time': [0, ]}
+    #
+    L = [M, ]
+    t = [0, ]
+    for i in range( len(block_index) ):
+        L.append( sbd_eigenvaluep(L[-1], tol=tol, max_terms=max_terms)[ int(block_index[i]) ] )
+        t.append( (perf_counter()-t0)/60. )
+        emit('level', level=i, index=block_index[i], n=2**L[-2].n, terms=len(L[-1]), duration=(t[-1]-t[-2])*60.)
+    terms = [len(l) for l in L]
+    #
+    if only_even == True:
+        L, t, terms = L[::2], t[::2], terms[::2]
+    if materialize == True:
+        L = [l.to_sparse() for l in L]
+    report = {'time':t, 'terms':terms}    # Time is in minutes
+    return L, report
+
+
+def sbd_eigenleafp(M, block_index='0', tol=1e-14, max_terms=None, materialize=False):
+    ''' Memory-economic sbd_eigenbranchp, returning only the last block (see sbd_eigenbranchp).
+    OUTPUT
+        leaf <PauliSum or csc_array>, report <dict>
+    '''
+    t0 = perf_counter()
+    L  = pauli_sum(M)
+    if len(block_index) >= L.n:
+        print(f'ABORTED: block_index is {len(block_index) - L.n + 1} indices too large.')
+        return None, {'time': [0, ]}
+    #
+    t, terms = [0, ], [len(L), ]
+    for i in range( len(block_index) ):
+        L = sbd_eigenvaluep(L, tol=tol, max_terms=max_terms)[ int(block_index[i]) ]
+        t.append( (perf_counter()-t0)/60. )
+        terms.append( len(L) )
+        emit('level', level=i, index=block_index[i], n=2**(L.n+1), terms=len(L), duration=(t[-1]-t[-2])*60.)
+    #
+    report = {'time':t, 'terms':terms}    # Time is in minutes
+    return (L.to_sparse() if materialize == True else L), report
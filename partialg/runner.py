@@ -0,0 +1,303 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Batch compression runner: sbd_eigenleaf / sbd_eigenbranch jobs of a manifest on a pool of processes.
+
+USAGE
+    partialg-run manifest.json --workers 8 --memory 16G --timeout 3600
+    python -m partialg.runner manifest.json --output results
+
+MANIFEST (JSON)
+    {"defaults": {"function": "leaf", "mode": "sparse", "block_index": "00", "options": {}},
+     "jobs": [{"input": "H1.npz"},
+              {"hamiltonian": "a1_66", "block_index": "000", "name": "a1_66_000"},
+              {"input": "H2.npy", "function": "branch", "mode": "dense", "options": {"only_even": true},
+               "timeout": 600, "memory": "4G"}]}
+    input       : .npz (scipy.sparse.save_npz), .npy (memory-mapped), .mtx (Matrix Market) or .pgh file, relative
+                  to the manifest; or hamiltonian: name in the catalog of partialg.database.
+    function    : 'leaf' or 'branch'.
+    mode        : 'sparse' (sbd_eigenleafs / sbd_eigenbranchs), 'dense' (sbd_eigenleaf / sbd_eigenbranch) or
+                  'outofcore' (sbd_eigenleaf_ooc, leaf only).
+    options     : keyword arguments of the compression function.
+    timeout, memory: per-job limits, overriding those of the command line.
+
+Every job runs in its own process (spawn), at most workers at a time. memory limits the address space of the
+process (RLIMIT_AS, POSIX only); a job past its timeout is terminated. Results go to the output directory as
+<name>.npz (sparse) or <name>.npy (dense), a branch as <name>/<level>.np[yz], and the report as <name>.json.
+The manifest itself records every job's 'status' ('done', 'failed', 'timeout' or 'memory'), 'result',
+'report' and 'error'; it is rewritten atomically after each job, so an interrupted run started again only
+runs the jobs that are not done.
+'''
+
+import os
+import sys
+import json
+import argparse
+import multiprocessing
+from time import perf_counter, monotonic, sleep, strftime
+
+import numpy as np
+from scipy.sparse import issparse, csc_array, save_npz, load_npz
+
+
+FUNCTIONS = {('leaf', 'sparse')   : ('partialg.sparse.compression', 'sbd_eigenleafs'),
+             ('branch', 'sparse') : ('partialg.sparse.compression', 'sbd_eigenbranchs'),
+             ('leaf', 'dense')    : ('partialg.dense.compression', 'sbd_eigenleaf'),
+             ('branch', 'dense')  : ('partialg.dense.compression', 'sbd_eigenbranch'),
+             ('leaf', 'outofcore'): ('partialg.dense.outofcore', 'sbd_eigenleaf_ooc')}
+
+DEFAULTS = {'function': 'leaf', 'mode': 'sparse', 'block_index': '0', 'options': {}}
+
+
+def parse_memory(memory):
+    "Bytes from an int or a string such as '512M', '16G'. None stays None."
+    if memory is None or isinstance(memory, int):
+        return memory
+    units = {'K': 2**10, 'M': 2**20, 'G': 2**30, 'T': 2**40}
+    memory = str(memory).strip().upper().rstrip('B')
+    if memory[-1:] in units:
+        return int( float(memory[:-1]) * units[memory[-1]] )
+    return int(memory)
+
+
+def read_manifest(path):
+    "Manifest with defaults applied to every job and unique job names."
+    with open(path) as f:
+        manifest = json.load(f)
+    defaults = dict(DEFAULTS, **manifest.get('defaults', {}))
+    names    = set()
+    for job in manifest['jobs']:
+        for key, value in defaults.items():
+            job.setdefault(key, value)
+        if 'name' not in job:
+            source      = job.get('hamiltonian') or os.path.splitext( os.path.basename(job['input']) )[0]
+            job['name'] = f"{source}_{job['function']}_{job['mode']}_{job['block_index']}"
+        if job['name'] in names:
+            raise Warning(f"ABORTED. Job name {job['name']} appears twice in {path}.")
+        if (job['function'], job['mode']) not in FUNCTIONS:
+            raise Warning(f"ABORTED. Job {job['name']}: no {job['function']} function in mode {job['mode']}.")
+        names.add(job['name'])
+    return manifest
+
+
+def write_manifest(path, manifest):
+    "Atomic rewrite: the manifest on disk is always either the old or the new version."
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(path + '.tmp', path)
+
+
+def load_input(job, base):
+    "Matrix of a job: scipy sparse, numpy array or memmap."
+    if 'hamiltonian' in job:
+        from .database import load_hamiltonian, DATABASE
+        return load_hamiltonian(job['hamiltonian'], root=job.get('root', DATABASE))[0]
+    path = os.path.join(base, job['input'])
+    ext  = os.path.splitext(path)[1]
+    if ext == '.npz':
+        return load_npz(path)
+    if ext == '.npy':
+        return np.load(path, mmap_mode='r')
+    if ext == '.mtx':
+        from scipy.io import mmread
+        return csc_array( mmread(path) )
+    if ext == '.pgh':
+        from .database import read_hamiltonian
+        return read_hamiltonian(path)[0]
+    raise Warning(f'ABORTED. Unknown input format {ext} of {path}.')
+
+
+def _save(L, path):
+    "Writes a leaf to path.npz (sparse) or path.npy (dense); returns the file name."
+    if issparse(L):
+        save_npz(path + '.npz', csc_array(L))
+        return path + '.npz'
+    np.save(path + '.npy', np.asarray(L))
+    return path + '.npy'
+
+
+def _jsonable(x):
+    if isinstance(x, dict):
+        return {str(k): _jsonable(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_jsonable(v) for v in x]
+    if isinstance(x, (str, int, float, bool)) or x is None:
+        return x
+    if np.ndim(x) == 0:
+        return np.asarray(x).item()
+    return np.asarray(x).tolist()
+
+
+def run_job(job, base, output):
+    ''' Runs one job in this process and writes its result files.
+    OUTPUT
+        dict with 'result' (file names) and 'report' (report of the compression function, time in minutes).
+    '''
+    import importlib
+    module, name = FUNCTIONS[(job['function'], job['mode'])]
+    function     = getattr( importlib.import_module(module), name )
+    M            = load_input(job, base)
+    if job['mode'] != 'sparse' and issparse(M):
+        M = M.toarray()
+    elif job['mode'] == 'sparse' and not issparse(M):
+        M = csc_array(M)
+    #
+    t0        = perf_counter()
+    L, report = function(M, job['block_index'], **job['options'])
+    if L is None:
+        raise Warning('ABORTED. The compression function returned no result (block_index too long?).')
+    path = os.path.join(output, job['name'])
+    if job['function'] == 'branch':
+        os.makedirs(path, exist_ok=True)
+        result = [ _save(leaf, os.path.join(path, str(i))) for i, leaf in enumerate(L) ]
+    else:
+        result = _save(L, path)
+    return {'result': result, 'report': dict(report, wall=(perf_counter()-t0)/60.)}
+
+
+def _worker(job, base, output, memory):
+    "Process target: applies the memory limit, runs the job and writes <name>.json."
+    if memory is not None:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    try:
+        out = dict( run_job(job, base, output), status='done' )
+    except MemoryError as e:
+        out = {'status': 'memory', 'error': repr(e)}
+    except BaseException as e:
+        out = {'status': 'failed', 'error': repr(e)}
+    path = os.path.join(output, job['name'] + '.json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(_jsonable(out), f)
+    os.replace(path + '.tmp', path)
+
+
+def _collect(job, output, exitcode):
+    path = os.path.join(output, job['name'] + '.json')
+    if not os.path.exists(path):
+        return {'status': 'failed', 'error': f'worker exited with code {exitcode} without a report.'}
+    with open(path) as f:
+        return json.load(f)
+
+
+def run_manifest(path, output=None, workers=None, memory=None, timeout=None, retry=True, threads=None, verbose=True):
+    ''' Runs the jobs of a manifest that are not done.
+    PARAMETERS
+        path <str>     : manifest file. Updated in place with the status of every job.
+        output <str>   : directory of results (default: <manifest name>_results next to the manifest).
+        workers <int>  : processes running at once (default: number of CPUs).
+        memory         : default per-job address-space limit, bytes or e.g. '16G'. None: no limit.
+        timeout <float>: default per-job limit in seconds. None: no limit.
+        retry <bool>   : if False, jobs that failed, timed out or ran out of memory are not run again.
+        threads <int>  : if given, BLAS/OpenMP threads per worker (OMP_NUM_THREADS and friends).
+    OUTPUT
+        summary <dict>: number of jobs per status and 'time' (minutes).
+    '''
+    t0       = perf_counter()
+    manifest = read_manifest(path)
+    base     = os.path.dirname(os.path.abspath(path))
+    output   = os.path.splitext(os.path.abspath(path))[0] + '_results' if output is None else output
+    workers  = os.cpu_count() if workers is None else workers
+    os.makedirs(output, exist_ok=True)
+    if threads is not None:         # Inherited by the spawned workers, not by this process
+        for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+            os.environ[var] = str(threads)
+    #
+    skip    = ('done', ) if retry else ('done', 'failed', 'timeout', 'memory')
+    pending = [ job for job in manifest['jobs'] if job.get('status') not in skip ]
+    if verbose:
+        print(f'NOTE: {len(pending)} of {len(manifest["jobs"])} jobs to run, {workers} workers.')
+    # spawn: jax is multithreaded and does not survive fork
+    context = multiprocessing.get_context('spawn')
+    running = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            job = pending.pop(0)
+            report = os.path.join(output, job['name'] + '.json')
+            if os.path.exists(report):
+                os.remove(report)
+            p = context.Process( target=_worker, args=(job, base, output, parse_memory( job.get('memory', memory) )) )
+            p.start()
+            job.update(status='running', started=strftime('%Y-%m-%d %H:%M:%S'), attempts=job.get('attempts', 0)+1)
+            running[job['name']] = (p, monotonic(), job)
+            write_manifest(path, manifest)
+        #
+        sleep(0.05)
+        for name, (p, start, job) in list(running.items()):
+            limit = job.get('timeout', timeout)
+            if p.is_alive() and limit is not None and monotonic() - start > limit:
+                p.terminate()
+                p.join()
+                out = {'status': 'timeout', 'error': f'terminated after {limit} s.'}
+            elif not p.is_alive():
+                p.join()
+                out = _collect(job, output, p.exitcode)
+            else:
+                continue
+            del running[name]
+            for key in ('result', 'report', 'error'):
+                job.pop(key, None)
+            job.update(out, finished=strftime('%Y-%m-%d %H:%M:%S'))
+            write_manifest(path, manifest)
+            if verbose:
+                print(f"{job['status'].upper():8s}{name}" + (f": {job['error']}" if 'error' in job else ''))
+    #
+    summary = {}
+    for job in manifest['jobs']:
+        summary[job.get('status', 'pending')] = summary.get(job.get('status', 'pending'), 0) + 1
+    summary['time'] = (perf_counter()-t0)/60.    # Time is in minutes
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='partialg batch compression runner')
+    parser.add_argument('manifest', help='JSON manifest of jobs, updated with their status')
+    parser.add_argument('--output', default=None, help='directory of results (default: <manifest>_results)')
+    parser.add_argument('--workers', type=int, default=None, help='processes at once (default: number of CPUs)')
+    parser.add_argument('--memory', default=None, help='per-job memory limit, e.g. 16G')
+    parser.add_argument('--timeout', type=float, default=None, help='per-job time limit in seconds')
+    parser.add_argument('--threads', type=int, default=None, help='BLAS threads per worker')
+    parser.add_argument('--no-retry', action='store_true', help='do not rerun failed jobs')
+    args = parser.parse_args(argv)
+    #
+    summary = run_manifest(args.manifest, output=args.output, workers=args.workers, memory=args.memory,
+                           timeout=args.timeout, retry=not args.no_retry, threads=args.threads)
+    print(', '.join( f'{k}: {v}' for k, v in summary.items() if k != 'time' ) + f", time: {summary['time']:.2f} min")
+    return 0 if all( k in ('done', 'time') for k in summary ) else 1
+
+
+if __name__ == '__main__':
+    sys.exit( main() )
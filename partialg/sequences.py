@@ -0,0 +1,124 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Odious and evil numbers (OEIS A000069 and A001969): non-negative integers with an odd, respectively
+even, number of ones in binary.
+
+Each pair {2k, 2k+1} holds exactly one odious and one evil number, and 2k has the parity of k, so the k-th
+terms (counting from 0) are
+    evil(k)   = 2k + parity(k),
+    odious(k) = 2k + 1 - parity(k),
+with parity(k) = popcount(k) mod 2. Terms are computed directly from their index with vectorized popcounts:
+random access is O(1), a range of m terms is O(m), and streaming in chunks keeps memory constant.
+'''
+
+import numpy as np
+
+
+CHUNK = 2**20           # Default number of terms per chunk when streaming
+
+
+def parity(a):
+    "popcount(a) mod 2 of integers or integer arrays (non-negative, below 2**63)."
+    if isinstance(a, (int, np.integer)):
+        return bin(int(a)).count('1') & 1       # int.bit_count needs Python 3.10
+    return np.bitwise_count( np.asarray(a, dtype=np.int64) ).astype(np.int64) & 1
+
+
+def is_odious(a):
+    return parity(a) == 1
+
+
+def is_evil(a):
+    return parity(a) == 0
+
+
+def odious(k):
+    "k-th odious number (k = 0, 1, ...; int or array): 1, 2, 4, 7, 8, 11, ..."
+    if isinstance(k, (int, np.integer)):
+        return 2*int(k) + 1 - parity(k)
+    k = np.asarray(k, dtype=np.int64)
+    return 2*k + 1 - parity(k)
+
+
+def evil(k):
+    "k-th evil number (k = 0, 1, ...; int or array): 0, 3, 5, 6, 9, 10, ..."
+    if isinstance(k, (int, np.integer)):
+        return 2*int(k) + parity(k)
+    k = np.asarray(k, dtype=np.int64)
+    return 2*k + parity(k)
+
+
+def odious_range(start, stop=None):
+    "Array of the odious numbers of index start to stop-1 (or 0 to start-1 if stop is None)."
+    start, stop = (0, start) if stop is None else (start, stop)
+    return odious( np.arange(start, stop, dtype=np.int64) )
+
+
+def evil_range(start, stop=None):
+    "Array of the evil numbers of index start to stop-1 (or 0 to start-1 if stop is None)."
+    start, stop = (0, start) if stop is None else (start, stop)
+    return evil( np.arange(start, stop, dtype=np.int64) )
+
+
+def _chunks(term, start, stop, chunk):
+    k = start
+    while stop is None or k < stop:
+        end = k + chunk if stop is None else min(k + chunk, stop)
+        yield term( np.arange(k, end, dtype=np.int64) )
+        k = end
+
+
+def odious_chunks(start=0, stop=None, chunk=CHUNK):
+    "Generator of arrays of at most chunk odious numbers, from index start to stop-1 (endless if stop is None)."
+    return _chunks(odious, start, stop, chunk)
+
+
+def evil_chunks(start=0, stop=None, chunk=CHUNK):
+    "Generator of arrays of at most chunk evil numbers, from index start to stop-1 (endless if stop is None)."
+    return _chunks(evil, start, stop, chunk)
+
+
+def odious_numbers(start=0, stop=None, chunk=CHUNK):
+    "Generator of the odious numbers as ints, computed chunk by chunk (endless if stop is None)."
+    for block in odious_chunks(start, stop, chunk):
+        yield from block.tolist()
+
+
+def evil_numbers(start=0, stop=None, chunk=CHUNK):
+    "Generator of the evil numbers as ints, computed chunk by chunk (endless if stop is None)."
+    for block in evil_chunks(start, stop, chunk):
+        yield from block.tolist()
@@ -0,0 +1,237 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Shared-memory matrix handles for process-level parallelism.
+
+SharedMatrix copies a dense array or a scipy sparse matrix once into shared memory (multiprocessing.shared_memory,
+backend 'shm') or into memory-mapped files (backend 'file'), and pickles as the names of those segments only. A
+worker that unpickles the handle maps the same pages, so N workers of a ProcessPoolExecutor or of
+multiprocessing share one physical copy instead of receiving one each:
+
+    with SharedMatrix(H) as h:
+        with ProcessPoolExecutor(8) as pool:
+            leaves = list( pool.map(partial(sbd_eigenleafs, h), ['00', '01', '10', '11']) )
+
+The compression and statistics functions accept handles in place of matrices (see resolve). h.get() gives the
+matrix itself: a read-only ndarray, csr_array or csc_array on the shared buffers. The segments are removed by
+the process that created the handle when it is closed, leaves its with block or is garbage collected; arrays
+returned by get() stay valid until they are deleted, in every process. Dense levels of the jax engine still copy their blocks into jax buffers; the sparse engines and
+the NumPy engines (batched, out-of-core, memory_budget) read the shared pages directly.
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from scipy.sparse import issparse, csr_array, csc_array
+
+
+_attach_lock = threading.Lock()
+
+# SharedMemory.close() unmaps the segment, and fails with BufferError while arrays still use SharedMemory.buf.
+# Up to CPython 3.14, SharedMemory keeps the mmap in the private _mmap and a memoryview of it in _buf: arrays are
+# built on the mmap itself and _buf is released, so that close() leaves the mapping to the arrays. Elsewhere the
+# arrays use the public buf, and close() is skipped while they exist (the mapping goes with the last of them).
+_PRIVATE_MMAP = sys.implementation.name == 'cpython' and sys.version_info < (3, 15)
+
+
+def _open_segment(name, size=0, create=False):
+    ''' SharedMemory segment. Segments attached by workers are not registered with the resource tracker, which
+    would otherwise unlink them when a worker that does not share the creator's tracker exits.
+    '''
+    if create:
+        return shared_memory.SharedMemory(create=True, size=max(size, 1))
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching always registers: the register function of the resource tracker (an implementation
+    # detail of shared_memory) is disabled for the duration of the call, under a lock for other threads.
+    with _attach_lock:
+        register = shared_memory.resource_tracker.register
+        shared_memory.resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            shared_memory.resource_tracker.register = register
+
+
+def _release(segments, path, owner):
+    ''' Finalizer of SharedMatrix: closes the segments and, in the creating process, removes them. The mappings
+    belong to the arrays (see SharedMatrix._attach) and go with the last of them.
+    '''
+    for shm in segments:
+        try:
+            shm.close()
+        except BufferError:         # Arrays on the public buf are still alive (see _PRIVATE_MMAP): they keep the
+            shm.close = lambda: None    # mapping, and SharedMemory.__del__ must not try to close it again
+        if owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+    if owner and path is not None:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class SharedMatrix:
+    ''' Dense or sparse matrix in shared memory (see module docstring).
+    PARAMETERS
+        M               : np.array (or array-like) or scipy sparse array/matrix. Sparse formats other than csr and
+                          csc are stored as csr.
+        backend <str>   : 'shm' (multiprocessing.shared_memory, default) or 'file' (memory-mapped .npy files, which
+                          unrelated processes can also open; put root on a tmpfs such as /dev/shm to stay in RAM).
+        root <str>      : parent directory of the files of backend 'file' (default: $PARTIALG_CACHE_DIR or the
+                          system temporary directory).
+    '''
+
+    def __init__(self, M, backend='shm', root=None):
+        if backend not in ('shm', 'file'):
+            raise Warning(f"ABORTED. Unknown backend {backend}. Use 'shm' or 'file'.")
+        if issparse(M):
+            fmt   = M.format if M.format in ('csr', 'csc') else 'csr'
+            M     = csc_array(M) if fmt == 'csc' else csr_array(M)
+            if not M.has_canonical_format:      # Shared arrays are read-only: canonicalize once, on a copy
+                M = M.copy()
+                M.sum_duplicates()
+            parts = {'data': M.data, 'indices': M.indices, 'indptr': M.indptr}
+        else:
+            fmt   = 'dense'
+            parts = {'data': np.asarray(M)}
+        path = None
+        if backend == 'file':
+            root = os.environ.get('PARTIALG_CACHE_DIR', tempfile.gettempdir()) if root is None else root
+            os.makedirs(root, exist_ok=True)
+            path = tempfile.mkdtemp(prefix='partialg-shared-', dir=root)
+        #
+        spec, segments = {}, []
+        for key, a in parts.items():
+            a = np.ascontiguousarray(a)
+            if backend == 'shm':
+                shm = _open_segment(None, a.nbytes, create=True)
+                np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[...] = a
+                segments.append(shm)
+                spec[key] = (shm.name, a.dtype.str, a.shape)
+            else:
+                name = os.path.join(path, f'{key}.npy')
+                out  = open_memmap(name, mode='w+', dtype=a.dtype, shape=a.shape)
+                out[...] = a
+                out.flush()
+                del out
+                spec[key] = (name, a.dtype.str, a.shape)
+        self.spec = {'backend': backend, 'format': fmt, 'shape': tuple(M.shape), 'parts': spec, 'path': path}
+        self._attach(segments, owner=True)
+
+    def _attach(self, segments, owner):
+        self.owner  = owner
+        self.arrays = {}
+        if self.spec['backend'] == 'shm' and not segments:
+            segments = [ _open_segment(name) for name, _, _ in self.spec['parts'].values() ]
+        for i, (key, (name, dtype, shape)) in enumerate(self.spec['parts'].items()):
+            if self.spec['backend'] == 'shm':
+                shm = segments[i]
+                if _PRIVATE_MMAP and hasattr(shm, '_mmap'):
+                    a = np.frombuffer(shm._mmap, dtype=np.dtype(dtype), count=int(np.prod(shape))).reshape(shape)
+                    shm._buf.release()      # The array keeps the mmap alive: SharedMemory.close must not unmap it
+                    shm._buf, shm._mmap = None, None
+                else:
+                    a = np.frombuffer(shm.buf, dtype=np.dtype(dtype), count=int(np.prod(shape))).reshape(shape)
+            else:
+                a = np.load(name, mmap_mode='r')
+            a.flags.writeable = False
+            self.arrays[key] = a
+        self._finalizer = weakref.finalize(self, _release, segments, self.spec['path'], owner)
+
+    @classmethod
+    def _from_spec(cls, spec):
+        "Handle of a worker process (unpickling)."
+        h      = cls.__new__(cls)
+        h.spec = spec
+        h._attach([], owner=False)
+        return h
+
+    def __reduce__(self):
+        return (SharedMatrix._from_spec, (self.spec, ))
+
+    @property
+    def shape(self):
+        return self.spec['shape']
+
+    @property
+    def dtype(self):
+        return self.arrays['data'].dtype
+
+    @property
+    def nbytes(self):
+        return sum( a.nbytes for a in self.arrays.values() )
+
+    def __repr__(self):
+        return f"SharedMatrix({self.spec['format']}, shape={self.shape}, dtype={self.dtype}, backend={self.spec['backend']})"
+
+    def get(self):
+        "The matrix on the shared buffers (read-only, no copy)."
+        if self.spec['format'] == 'dense':
+            return self.arrays['data']
+        a   = self.arrays
+        cls = csc_array if self.spec['format'] == 'csc' else csr_array
+        M   = cls( (a['data'], a['indices'], a['indptr']), shape=self.shape, copy=False )
+        M.has_canonical_format = True
+        return M
+
+    def close(self):
+        "Releases the handle; the creating process also removes the segments. Called automatically."
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def share(M, backend='shm', root=None):
+    "SharedMatrix of M (M itself if it is one already)."
+    return M if isinstance(M, SharedMatrix) else SharedMatrix(M, backend=backend, root=root)
+
+
+def resolve(M):
+    "The matrix of a SharedMatrix, anything else unchanged. Used by the functions that accept handles."
+    return M.get() if isinstance(M, SharedMatrix) else M
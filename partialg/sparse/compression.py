@@ -36,12 +36,20 @@
 from time import perf_counter           # For time measurement 
 from scipy.sparse import eye
 from scipy.sparse.linalg import inv
-from scipy.sparse import csc_array #, csr_array
-from scipy.sparse.linalg import eigs
+from scipy.sparse import csc_array, issparse #, csr_array
+from scipy.sparse.linalg import eigs, eigsh, splu, LinearOperator
+from numpy import asarray, atleast_1d, empty, sort as npsort, argsort, abs as nabs, sqrt as nsqrt, iscomplexobj
+from numpy import cumsum, flatnonzero, concatenate, vdot, isfinite, result_type
+from numpy.linalg import eigvals, eigvalsh, norm
 
 from jax.numpy import sqrt, log2
 from jax.numpy import abs as npabs
 
+from ..instrument import stage, emit
+from .operators import operator_blocks, inverse_operator, sqrt_operator, gram_operator, shifted_operator
+from ..spectrum import lowest_eigenvalue
+from ..shared import resolve
+
 # def ExactSrt(a):
 #     """Eigensolver way to compute matrix square roots. Not available for sparse matrices.
 #     Availed for comparison purpose only. Not needed in the main algorithm.
@@ -51,14 +59,44 @@ from jax.numpy import abs as npabs
 #     return v.dot( np.dot( np.diag( np.sqrt( e ) ), v.inv()) )
 
 
-def ns_sqrts(a, max_it = 6, k_pow = 1/4):
-    "Newton-Schulz matrix root expansion."
-    A     = a.trace()**k_pow * eye(a.shape[0])   # Initial guess
+def ns_sqrts(a, max_it = 6, k_pow = 1/4, drop = None, X0 = None):
+    ''' Newton-Schulz matrix root expansion.
+    drop <callable>: if given, applied to the inverse and to each iterate to limit fill-in (see sbd_eigenvalues).
+    X0 <sparse array>: initial guess, e.g. the root of a nearby matrix. Default: trace(a)**k_pow * I.
+    '''
+    A     = a.trace()**k_pow * eye(a.shape[0]) if X0 is None else X0   # Initial guess
     for i in range(max_it):
-        A = 0.5*(A + a @ inv(A) )
+        if drop is None:
+            A = 0.5*(A + a @ inv(A) )
+        else:
+            A = drop( 0.5*(A + a @ drop( inv(A) ) ) )
     return A
 
 
+def sparsify(a, drop_tol=0, relative=True, budget=None):
+    ''' Drops the small entries of sparse matrix a.
+    PARAMETERS
+        drop_tol <float>: entries with |x| <= drop_tol are dropped (drop_tol*max|x| if relative).
+        relative <bool> : drop_tol relative to the largest entry of a.
+        budget <float>  : if given, at most this Frobenius norm is dropped, smallest entries first.
+    OUTPUT
+        a <csc_array>, dropped <float> (Frobenius norm of the dropped entries)
+    '''
+    if drop_tol == 0 or not issparse(a) or a.nnz == 0:
+        return a, 0.
+    a     = csc_array(a, copy=True)
+    size  = nabs(a.data)
+    small = size <= ( drop_tol*size.max() if relative else drop_tol )
+    if budget is not None and small.any():
+        idx   = flatnonzero(small)
+        idx   = idx[ argsort(size[idx]) ]
+        small[ idx[ nsqrt( cumsum(size[idx]**2) ) > budget ] ] = False   # Keep what exceeds the budget
+    dropped = float( norm(size[small]) )
+    a.data[small] = 0
+    a.eliminate_zeros()
+    return a, dropped
+
+
 # Slice blocks of matrix =====================
 def blocks(a, nrow=2):
     ''' Splits matrix M into nrow*nrow blocks. Blocks have equal size if len(M)/nrow is integer.
@@ -82,31 +120,69 @@ def blocks(a, nrow=2):
 
 #==============================================
 
-def sbd_eigenvalues(a, sqrt= ns_sqrts):
+def sbd_eigenvalues(a, sqrt= ns_sqrts, drop_tol=0, relative=True, budget=None, info=None):
     ''' Matrix-polynomial root via Sridhara-based Block Diagonalization method.
     PARAMETERS
-        a            : matrix to take block-Bhaskara of. Accepts np.array or scipy sparse array.
+        a            : matrix to take block-Bhaskara of. Accepts np.array, scipy sparse array or LinearOperator.
         srt <np.array>: function to compute matrix square root
+        drop_tol <float>: if non-zero, small entries are dropped after the inverse, after each product and in
+                          each iteration of ns_sqrts, so that fill-in stays bounded (see sparsify).
+        relative <bool> : drop_tol relative to the largest entry of each product, otherwise absolute.
+        budget <float>  : maximum of 'dropped' in this level. Once it is spent, nothing more is dropped.
+        info <dict>     : if given, receives 'dropped', the Frobenius norm dropped in this level summed over
+                          products, each relative to the norm of its product if relative.
     OUTPUT
-        <np.array>
+        <np.array>, or <LinearOperator> if a is a LinearOperator (see partialg.sparse.operators).
     '''
-    blk       = blocks(a, nrow=2)
-    A, C      = blk[0][0], blk[0][1]
-    D, B      = blk[1][0], blk[1][1]
+    a = resolve(a)
+    k         = a.shape[0]//2
+    dropped   = [0.]
+    #
+    def drop(x):
+        if drop_tol == 0 or not issparse(x) or x.nnz == 0:
+            return x
+        scale = norm(x.data) if relative else 1.
+        x, e  = sparsify(x, drop_tol, relative, None if budget is None else max(budget - dropped[0], 0.)*scale)
+        dropped[0] += e/scale
+        return x
+    #
+    operator  = isinstance(a, LinearOperator)
+    if operator and sqrt is ns_sqrts:
+        sqrt  = sqrt_operator
+    with stage('block', n=k) as s:
+        blk       = operator_blocks(a, nrow=2) if operator else blocks(a, nrow=2)
+        A, C      = blk[0][0], blk[0][1]
+        D, B      = blk[1][0], blk[1][1]
+        if not operator:
+            s.update(nnz=A.nnz + B.nnz + C.nnz + D.nnz)
     #
     t = A + B        # Block-trace    
     #
     try:             # Block-determinant with inverse of A
-        A_ = inv(A)
-        d  = A.dot(B) - A.dot(D.dot( A_.dot(C) ))
-    except:          # Without inverse of A
+        with stage('inverse', n=k) as s:
+            A_ = inverse_operator(A) if operator else drop( inv(A) )
+            s.update(nnz=getattr(A_, 'nnz', None))
+        with stage('determinant', n=k) as s:
+            d  = drop( drop( A.dot(B) ) - drop( A.dot( drop( D.dot( drop( A_.dot(C) ) ) ) ) ) )
+            s.update(nnz=getattr(d, 'nnz', None))
+    except Exception as e:          # Without inverse of A
         print('Exception')
-        d  = A.dot(B) - D.dot(C)
+        emit('fallback', stage='inverse', method='singular', reason=repr(e))
+        with stage('determinant', n=k) as s:
+            d  = drop( drop( A.dot(B) ) - drop( D.dot(C) ) )
+            s.update(nnz=getattr(d, 'nnz', None))
     #
-    term = sqrt( t.dot(t) - 4*d )
+    with stage('sqrt', n=k) as s:
+        if drop_tol != 0 and sqrt is ns_sqrts:
+            term = sqrt( drop( t.dot(t) - 4*d ), drop=drop )
+        else:
+            term = sqrt( drop( t.dot(t) - 4*d ) )
+        s.update(nnz=getattr(term, 'nnz', None))
     L0   = 0.5*(t - term)
     L1   = 0.5*(t + term)
     #
+    if info is not None:
+        info['dropped'] = dropped[0]
     return (L0, L1)
 
 
@@ -136,7 +212,8 @@ def sbd_vectors(v, normalize=False):
     M   = v.dot(v.T.conjugate())
     L1  = sbd_eigenvalues(M)[1]      
     #
-    e, v = eigs( L1, k=1, sigma=1 )
+    with stage('eigensolve', n=L1.shape[0]):
+        e, v = eigs( L1, k=1, sigma=1 )
     #
     if normalize == True:
         v = v/npabs( sqrt( v.T.conjugate().dot( v ) ) )
@@ -172,74 +249,287 @@ def sbd_vectorsbranch(v, block_index='0', only_even=False, normalize=False ):
 
 
 
-def sbd_eigenbranchs(M, block_index='0', only_even=False ):
+def sbd_eigenbranchs(M, block_index='0', only_even=False, drop_tol=0, relative=True, budget=None ):
     ''' sbd_eigenbranchs finds eigenleaf of block-eigenvalue tree.
     block_index <int>: index of block-diagonal matrix (its length is the number of compressions).
     only_even <bool>: True ensures output only has elements with 2*n compressions, where n is the list index, as required by some VQE algorithms. 
                       False ensures output is full branch of compressed matrices.
+    drop_tol, relative, budget: sparsification of each level, see sbd_eigenvalues. The report then has
+                      'nnz' and 'dropped' (Frobenius norm dropped) per level.
     '''
+    M = resolve(M)
     #
     t0 = perf_counter()
     
     if 2**(len( block_index )-1) < M.shape[0]:
         L = [M, ]
         t = [0, ]
+        nnz, dropped = [getattr(M, 'nnz', None), ], [0., ]
         for i in range( len(block_index) ):
-            L.append( sbd_eigenvalues(L[-1])[ int(block_index[i]) ] )    # Block-eigensolving
+            info = {}
+            L.append( sbd_eigenvalues(L[-1], drop_tol=drop_tol, relative=relative, budget=budget, info=info)[ int(block_index[i]) ] )    # Block-eigensolving
             t.append( (perf_counter()-t0)/60. )
+            nnz.append( getattr(L[-1], 'nnz', None) )
+            dropped.append( info['dropped'] )
+            emit('level', level=i, index=block_index[i], n=L[-2].shape[0], nnz=nnz[-1], duration=(t[-1]-t[-2])*60.)
         #
         if only_even == True:
             L = [L[i] for i in range(0,len(L),2)]
             t = [t[i] for i in range(0, len(t), 2)]
+            nnz, dropped = nnz[::2], dropped[::2]
     else:
-        print(f'ABORTED: block_index is {int( len( block_index ) - log2(len(M)) )  } indices too large.')
+        print(f'ABORTED: block_index is {int( len( block_index ) - log2(M.shape[0]) )  } indices too large.')
         L = None
         #
     report = {'time':t}    # Time is in minutes
+    if drop_tol != 0 and L is not None:
+        report['nnz'], report['dropped'] = nnz, dropped
     return L, report
 
 
 
-def sbd_eigenleafs(M, block_index='0'):
+def sbd_eigenleafs(M, block_index='0', drop_tol=0, relative=True, budget=None, record=False, memory_budget=None):
     ''' sbd_eigenbranchs finds eigenleaf of block-eigenvalue tree.
     Memory-economic SBD_eigenbranch, returning only the last block.
+    drop_tol, relative, budget: sparsification of each level, see sbd_eigenbranchs.
+    record <bool>: if True, the report gets 'levels', the input matrix of every level (M first, not copied),
+                   so that leaf eigenvectors can be lifted with sbd_lifts.
+    memory_budget: bytes, or a string such as '16G'. If given, each level estimates its peak memory first and
+                   stays sparse while that fits, otherwise continues densely with in-place updates and solves, or
+                   out of core (see partialg.budget). The report then has 'memory', with the strategy, estimate
+                   and measured peak of each level. The leaf is a csc_array unless left memory-mapped.
     '''
+    M = resolve(M)
     #
     t0 = perf_counter()
     #
+    if memory_budget is not None:
+        if drop_tol != 0 or record == True:
+            raise Warning('ABORTED. memory_budget supports neither drop_tol nor record.')
+        from ..budget import sbd_eigenleaf_budget
+        leaf, report = sbd_eigenleaf_budget(M, block_index, memory_budget)
+        if leaf is not None and 'workdir' not in report and not issparse(leaf):
+            leaf = csc_array(leaf)
+        return leaf, report
+    #
     if 2**(len( block_index )-1) < M.shape[0]:
         L = [M, ]
         t = [0, ]
+        nnz, dropped = [getattr(M, 'nnz', None), ], [0., ]
+        levels = []
         for i in range( len(block_index) ):
-            L.append( sbd_eigenvalues(L[-1])[ int(block_index[i]) ] )    # Block-eigensolving
+            info = {}
+            L.append( sbd_eigenvalues(L[-1], drop_tol=drop_tol, relative=relative, budget=budget, info=info)[ int(block_index[i]) ] )    # Block-eigensolving
             t.append( (perf_counter()-t0)/60. )
+            nnz.append( getattr(L[-1], 'nnz', None) )
+            dropped.append( info['dropped'] )
+            emit('level', level=i, index=block_index[i], n=L[0].shape[0], nnz=nnz[-1], duration=(t[-1]-t[-2])*60.)
+            if record == True:
+                levels.append( L[0] )
             del L[0]
         #
     else:
-        print(f'ABORTED: block_index is {int( len( block_index ) - log2(len(M)) )  } indices too large.')
+        print(f'ABORTED: block_index is {int( len( block_index ) - log2(M.shape[0]) )  } indices too large.')
         L = None
         #
     report = {'time':t}    # Time is in minutes
+    if drop_tol != 0 and L is not None:
+        report['nnz'], report['dropped'] = nnz, dropped
+    if record == True:
+        report['levels'] = levels
     return L[0], report
+
+
+def _lift_levels(P, v, lam, refine):
+    ''' One level of sbd_lifts, as dense.compression._lift_level with sparse LU solves.
+    With P = [[A, C], [D, B]] (see blocks), [x, v] is lifted by (A - lam) x = -C v and [v, y] by (B - lam) y = -D v.
+    '''
+    P = csc_array(P)
+    P = P.astype( result_type(P.dtype, asarray(v).dtype, type(lam)) )
+    k = P.shape[0]//2
+    best = None
+    for rows, cols, top in ((slice(0, k), slice(k, None), False), (slice(k, None), slice(0, k), True)):
+        try:
+            x = splu( csc_array(P[rows, rows] - lam*eye(k)) ).solve( -(P[rows, cols] @ v) )
+        except RuntimeError:                # lam is an eigenvalue of the block: try the other form
+            continue
+        u  = concatenate([v, x]) if top else concatenate([x, v])
+        u  = u/norm(u)
+        mu = vdot(u, P @ u)
+        r  = float( norm(P @ u - mu*u) )
+        if isfinite(r) and (best is None or r < best[2]):
+            best = (u, mu, r)
+    if best is None:
+        raise Warning(f'ABORTED. Eigenvalue {lam} of both diagonal blocks: cannot lift at size {2*k}.')
+    u, mu, r = best
+    for it in range(refine):                # Rayleigh quotient iteration with P
+        try:
+            w = splu( csc_array(P - mu*eye(2*k)) ).solve(u)
+        except RuntimeError:                # mu is exact
+            break
+        w = w/norm(w)
+        if not isfinite(w).all():
+            break
+        u, mu = w, vdot(w, P @ w)
+        r     = float( norm(P @ u - mu*u) )
+    return u, mu, r
+
+
+def sbd_lifts(levels, v, eigenvalue, refine=1):
+    ''' Lifts an eigenvector of an SBD leaf to an (approximate) eigenvector of M, see dense.compression.sbd_lift.
+    Each level costs one sparse LU factorization of each diagonal block plus one of the level per refinement,
+    and only one level is factorized at a time. Only the eigenpair of M nearest the lifted vector is guaranteed;
+    'drifted' flags a Rayleigh quotient that moved by more than the gap of the last level (see sbd_lift).
+    PARAMETERS
+        levels        : input matrices of the levels, M first: report['levels'] of sbd_eigenleafs(record=True),
+                        branch[:-1] of sbd_eigenbranchs (only_even=False) or a state of sparse.incremental.sbd_state.
+        v <array>     : eigenvector of the leaf.
+        eigenvalue    : its eigenvalue.
+        refine <int>  : Rayleigh quotient iterations per level.
+    OUTPUT
+        u <np.array>, report <dict> with 'time' (minutes), 'eigenvalue', 'shift', 'gap', 'drifted', 'error_bound'
+        (see sbd_lift) and per level 'eigenvalues' and 'residual'.
+    '''
+    t0 = perf_counter()
+    if isinstance(levels, dict):            # sbd_state
+        levels = [ level['M'] for level in levels['levels'] ]
+    u  = asarray(v).reshape(-1)
+    u  = u/norm(u)
+    mu = eigenvalue
+    if levels[-1].shape[0] != 2*u.shape[0]:
+        raise Warning(f'ABORTED. A leaf vector of size {u.shape[0]} does not match the last level, of size {levels[-1].shape[0]}.')
+    e   = eigvals( levels[-1].toarray() if issparse(levels[-1]) else asarray(levels[-1]) )    # Leaf and sibling
+    gap = float( npsort( nabs(e - eigenvalue) )[1] )
+    mus, res = [], []
+    for P in levels[::-1]:
+        with stage('lift', n=P.shape[0], nnz=getattr(P, 'nnz', None)):
+            u, mu, r = _lift_levels(P, u, mu, refine)
+        mus.append(mu)
+        res.append(r)
+    #
+    shift = float( nabs(mu - eigenvalue) )
+    if shift > gap:
+        print(f'NOTE: the Rayleigh quotient moved by {shift:.3g}, more than the level gap {gap:.3g}: u may belong to another eigenvalue.')
+    report = {'time': (perf_counter()-t0)/60., 'eigenvalue': mu, 'shift': shift, 'gap': gap, 'drifted': shift > gap,
+              'error_bound': res[-1], 'eigenvalues': mus, 'residual': res}    # Time is in minutes
+    return u, report
 #
 
-def transformed_eigs(M, T_factor=0, N_factor=1, make_Hermitian=True):
+def transformed_eigs(M, T_factor=0, N_factor=1, make_Hermitian=True, implicit=None):
     ''' Finds ground state after multiplication of M by T_factor and sum by T_factor*eye(M.shape[0])
+    implicit <bool>: if True, the Gram matrix and the shift stay operators (see partialg.sparse.operators) and the
+                     ground state is the lowest eigenvalue found by Lanczos (smallest real part with eigs for
+                     make_Hermitian=False), instead of the minimum of the 6 eigenvalues nearest 0 of a
+                     shift-invert solve. Default: True for LinearOperator inputs, False otherwise.
     '''
+    M = resolve(M)
     #
     t0 = perf_counter()
     #
-    if make_Hermitian == True:
+    if implicit is None:
+        implicit = isinstance(M, LinearOperator)
+    if implicit == True:
+        M2 = gram_operator(M) if make_Hermitian == True else M
+        M2 = shifted_operator(M2, T_factor, N_factor)
+        with stage('eigensolve', n=M2.shape[0]):
+            if make_Hermitian == True:
+                gs = sqrt( npabs((lowest_eigenvalue(M2) -T_factor )/N_factor)  )
+            else:
+                gs = (eigs( M2, k=1, which='SR', return_eigenvectors=False )[0] -T_factor )/N_factor
+    elif make_Hermitian == True:
         M2 = M @ M.T.conjugate()
         M2 = M2*N_factor + T_factor*eye(M2.shape[0])
-        gs = sqrt( npabs((min( eigs( M2, sigma=0 )[0] ) -T_factor )/N_factor)  )
+        with stage('eigensolve', n=M2.shape[0], nnz=M2.nnz):
+            gs = sqrt( npabs((min( eigs( M2, sigma=0 )[0] ) -T_factor )/N_factor)  )
     else:
         M2 = M
         M2 = M2*N_factor + T_factor*eye(M2.shape[0])
-        gs = (min( eigs( M2, sigma=0 )[0] ) -T_factor )/N_factor
+        with stage('eigensolve', n=M2.shape[0]):
+            gs = (min( eigs( M2, sigma=0 )[0] ) -T_factor )/N_factor
     #    
     dt = perf_counter() - t0
     report = {'time':dt}    # Time is in minutes
     return gs, report
 
+
+def _window(M, center, k, hermitian, dense_below):
+    ''' k eigenvalues of M nearest center, from one LU factorization of M - center*I.
+    Yields the eigenvalues for k, 2k, 4k, ... so that a caller can widen the window without refactorizing.
+    Falls back to the full spectrum once k reaches the size of M, or at once for matrices smaller than dense_below.
+    '''
+    n = M.shape[0]
+    if n < dense_below:
+        a = M.toarray()
+        yield center, (eigvalsh(a) if hermitian else eigvals(a)), True
+        return
+    try:
+        lu = splu( csc_array(M - center*eye(n)) )
+    except RuntimeError:            # center is an eigenvalue: shift it slightly
+        center = center + 1e-8*max(1., abs(center))
+        lu     = splu( csc_array(M - center*eye(n)) )
+    dtype = 'complex128' if iscomplexobj(M.data) else 'float64'
+    op    = LinearOperator( M.shape, matvec=lu.solve, dtype=dtype )
+    while True:
+        if k >= n - 2:
+            a = M.toarray()
+            yield center, (eigvalsh(a) if hermitian else eigvals(a)), True
+            return
+        if hermitian:
+            w = eigsh( M, k=k, sigma=center, OPinv=op, which='LM', return_eigenvectors=False )
+        else:
+            w = eigs( M, k=k, sigma=center, OPinv=op, which='LM', return_eigenvectors=False )
+        yield center, w, False
+        k = 2*k
+
+
+def transformed_eigs_sweep(M, T_factors, N_factors, make_Hermitian=True, k=6, dense_below=4096):
+    ''' transformed_eigs over the grid T_factors x N_factors, from a single factorization.
+    N*M2 + T*I has the eigenvalues N*x + T of M2, and the k of them nearest 0 correspond to the k eigenvalues
+    x of M2 nearest -T/N. The Gram matrix M2 = M @ M.T.conjugate() is built once, and one shift-invert
+    factorization at the middle of the shifts -T/N gives a window of eigenvalues around it. The window
+    is widened (same factorization) until it contains the k nearest eigenvalues of every shift.
+    PARAMETERS
+        M <sparse array>      : matrix, as in transformed_eigs.
+        T_factors <array>     : translation factors.
+        N_factors <array>     : multiplication factors (non-zero).
+        make_Hermitian <bool> : as in transformed_eigs.
+        k <int>               : number of eigenvalues nearest 0 considered, as eigs(sigma=0) in transformed_eigs.
+        dense_below <int>     : below this size the full spectrum of M2 is computed densely instead, which is
+                                usually cheaper than the sparse factorization of the Gram matrix.
+    OUTPUT
+        gs <array>     : gs[i, j] is transformed_eigs(M, T_factors[i], N_factors[j], make_Hermitian)[0], up to
+                         which member of a complex conjugate pair eigs happens to return.
+        report <dict>  : 'time' (minutes), 'center' of the window, 'window' (number of eigenvalues computed).
+    '''
+    M = resolve(M)
+    t0 = perf_counter()
+    T_factors = atleast_1d( asarray(T_factors, dtype=float) )
+    N_factors = atleast_1d( asarray(N_factors, dtype=float) )
+    if (N_factors == 0).any():
+        raise Warning('ABORTED. N_factors must be non-zero.')
+    #
+    M2     = csc_array( M @ M.T.conjugate() ) if make_Hermitian == True else csc_array(M)
+    shifts = -T_factors[:, None]/N_factors[None, :]
+    center = 0.5*( shifts.min() + shifts.max() )
+    #
+    with stage('eigensolve', n=M2.shape[0], nnz=M2.nnz) as s:
+        for center, w, complete in _window(M2, center, max(2*k, 16), make_Hermitian, dense_below):
+            radius = nabs(w - center).max()
+            near   = npsort( nabs(w[None, :] - shifts.reshape(-1, 1)), axis=1 )[:, k-1]
+            if complete or ( nabs(shifts.reshape(-1) - center) + near <= radius ).all():
+                break
+        s.update(window=len(w))
+    #
+    w  = npsort(w)      # Conjugate pairs tied at the k-th position: the one with negative imaginary part is kept
+    gs = empty(shifts.shape, dtype=float if make_Hermitian == True else complex)
+    for i, T in enumerate(T_factors):
+        for j, N in enumerate(N_factors):
+            x  = w[ argsort( nabs(w - shifts[i, j]), kind='stable' )[:k] ]     # Eigenvalues of M2 that eigs(sigma=0) returns
+            mu = npsort( N*x + T )[0]                            # min() of the transformed eigenvalues
+            gs[i, j] = nsqrt( nabs((mu - T)/N) ) if make_Hermitian == True else (mu - T)/N
+    #
+    dt = (perf_counter() - t0)/60.
+    report = {'time':dt, 'center':center, 'window':len(w)}    # Time is in minutes
+    return gs, report
+
 #
@@ -0,0 +1,251 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Incremental sparse SBD for Hamiltonians that change by a sparse or low-rank delta between iterations.
+
+sbd_state runs sbd_eigenleafs and keeps, for every level, its input matrix, the inverse of its first block
+and its square root. sbd_update then moves that state to M + delta:
+    - the inverse of the first block is corrected with the Sherman-Morrison-Woodbury formula when the change
+      of that block has few non-zero rows or columns and when that pays (see woodbury_pays), instead of being recomputed;
+    - the square root is corrected from the previous root X by Newton's method in Sylvester form,
+      X E + E X = s - X X, X <- X + E, which (unlike the simplified iteration of ns_sqrts, whose iterates
+      must commute with s) is stable from any nearby start. The Sylvester equations are solved with the Schur
+      form of the previous root, kept in the state (chord steps), so each correction costs a few dense
+      products. The iteration stops, after at least refine_it steps, once the residual ||X X - s|| / ||s||
+      reaches tol (or the residual of the previous root, if larger). If max_it steps do not get there, the
+      level falls back to a cold start (instrumentation event 'fallback', stage 'sqrt').
+The change of a level's output is in general full-rank, so deeper levels use Woodbury only when their delta
+happens to be sparse and otherwise recompute the inverse; their square roots are still warm-started.
+benchmarks/incremental.py compares sbd_update with a fresh sbd_eigenleafs.
+'''
+
+from time import perf_counter
+
+import numpy as np
+from numpy.linalg import norm, inv as dinv
+from scipy.linalg import schur, get_lapack_funcs
+from scipy.sparse import csc_array, csr_array, issparse
+from scipy.sparse.linalg import inv
+
+from .compression import blocks, ns_sqrts
+from ..instrument import stage, emit
+
+
+def _residual(S, s):
+    "||S @ S - s|| / ||s|| (Frobenius)."
+    R = S @ S - s
+    return float( norm(R.data if issparse(R) else R) / max( norm(s.data if issparse(s) else s), 1e-300 ) )
+
+
+def woodbury_inverse(A_, delta, max_rank):
+    ''' Inverse of A + delta from A_ = inv(A) with the Sherman-Morrison-Woodbury formula.
+    delta is factorized as U @ Vh through its non-zero rows (U selects them) or columns (Vh selects them),
+    whichever are fewer.
+    OUTPUT
+        inverse <csc_array>, or None if the rank of that factorization exceeds max_rank.
+    '''
+    delta = csc_array(delta)
+    delta.eliminate_zeros()
+    rows  = np.flatnonzero( np.diff( csr_array(delta).indptr ) )
+    cols  = np.flatnonzero( np.diff( delta.indptr ) )
+    r     = min(len(rows), len(cols))
+    if r == 0:
+        return A_
+    if r > max_rank:
+        return None
+    #
+    if len(rows) <= len(cols):      # delta = E_rows @ Vh
+        Vh = csr_array(delta)[rows, :]
+        AU = csc_array( A_[:, rows] )
+        VA = csc_array( Vh @ A_ )
+        K  = np.eye(r) + (Vh @ AU).toarray()
+    else:                           # delta = U @ E_cols.T
+        U  = delta[:, cols]
+        AU = csc_array( A_ @ U )
+        VA = csc_array( csr_array(A_)[cols, :] )
+        K  = np.eye(r) + (VA @ U).toarray()
+    return csc_array( A_ - AU @ csc_array( dinv(K) ) @ VA )
+
+
+def woodbury_pays(A_, delta, max_rank):
+    ''' True if woodbury_inverse is expected to beat recomputing the inverse: the rank r of delta is at most
+    max_rank and A_ already has r*k non-zeros, the most its rank-r correction can add per row of A_.
+    Otherwise (e.g. a nearly diagonal inverse) the correction only adds fill.
+    '''
+    delta = csc_array(delta)
+    delta.eliminate_zeros()
+    r = min( len(np.flatnonzero( np.diff( csr_array(delta).indptr ) )), len(np.flatnonzero( np.diff( delta.indptr ) )) )
+    return r <= max_rank and A_.nnz >= r*A_.shape[0]
+
+
+def root_schur(S):
+    "Schur form (T, U) of the root S, S = U T U^H, real if S is real."
+    S = S.toarray() if issparse(S) else np.asarray(S)
+    return schur(S, output='complex' if np.iscomplexobj(S) else 'real')
+
+
+def sylvester_sqrt(s, X, TU, refine_it=1, max_it=6, tol=1e-8):
+    ''' Square root of s corrected from the nearby root X by Newton's method in Sylvester form,
+    X E + E X = s - X X, with the Schur form TU = (T, U) of an earlier root for every step (chord steps).
+    OUTPUT
+        X <np.array>, residual ||X X - s|| / ||s||, converged <bool>, steps <int>
+    '''
+    s     = s.toarray() if issparse(s) else np.asarray(s)
+    X     = X.toarray() if issparse(X) else np.array(X)
+    T, U  = TU
+    dtype = np.result_type(s, X, T)
+    X     = X.astype(dtype, copy=False)
+    trsyl = get_lapack_funcs('trsyl', (T.astype(dtype), ))
+    ns    = max( norm(s), 1e-300 )
+    R     = s - X @ X
+    rs    = norm(R)/ns
+    for it in range(max_it):
+        if it >= refine_it and rs <= tol:
+            return X, float(rs), True, it
+        C = U.conj().T @ R @ U
+        Y, scale, info = trsyl(T.astype(dtype), T.astype(dtype), C)        # T Y + Y T = scale C
+        if info < 0 or not np.isfinite(Y).all():
+            break
+        X  = X + U @ (Y/scale) @ U.conj().T
+        R  = s - X @ X
+        rs = norm(R)/ns
+    return X, float(rs), bool(rs <= tol), max_it
+
+
+def _level(M, A_=None, S0=None, schur0=None, refine_it=1, max_it=6, residual=None, tol=1e-8):
+    ''' One SBD level of sbd_eigenvalues, with an optional precomputed inverse and warm start of the root
+    (S0, with the Schur form schur0 of a previous root, see sylvester_sqrt).
+    OUTPUT
+        dict with 'M', 'A_' (None if A was singular), 'S', 'schur', 'residual', 'L' (L0, L1), 'warm' <bool>.
+    '''
+    k = M.shape[0]//2
+    with stage('block', n=k):
+        blk  = blocks(M, nrow=2)
+        A, C = blk[0][0], blk[0][1]
+        D, B = blk[1][0], blk[1][1]
+    t = A + B        # Block-trace
+    #
+    try:
+        if A_ is None:
+            with stage('inverse', n=k) as s:
+                A_ = inv(A)
+                s.update(nnz=A_.nnz)
+        with stage('determinant', n=k) as s:
+            d  = A.dot(B) - A.dot(D.dot( A_.dot(C) ))
+            s.update(nnz=d.nnz)
+    except Exception as e:          # Without inverse of A
+        emit('fallback', stage='inverse', method='singular', reason=repr(e))
+        A_ = None
+        d  = A.dot(B) - D.dot(C)
+    #
+    s     = csc_array( t.dot(t) - 4*d )
+    warm  = False
+    TU    = schur0
+    with stage('sqrt', n=k) as st:
+        if S0 is not None and schur0 is not None:
+            target = max(tol, residual)
+            X, rs, warm, steps = sylvester_sqrt(s, S0, schur0, refine_it=refine_it, max_it=max_it, tol=target)
+            if warm:
+                S = csc_array(X)
+                if steps > 2:           # The root drifted from the Schur form: refresh it for the next update
+                    TU = root_schur(X)
+            else:
+                emit('fallback', stage='sqrt', method='cold', reason=f'warm residual {rs:.2e} > {target:.2e}')
+        if not warm:
+            S  = ns_sqrts(s, max_it=max_it)
+            rs = _residual(S, s)
+            TU = root_schur(S)
+        st.update(nnz=getattr(S, 'nnz', None))
+    #
+    return {'M': M, 'A_': A_, 'S': S, 'schur': TU, 'residual': rs,
+            'L': (csc_array(0.5*(t - S)), csc_array(0.5*(t + S))), 'warm': warm}
+
+
+def sbd_state(M, block_index='0', max_it=6):
+    ''' sbd_eigenleafs that also returns the state used by sbd_update.
+    The state holds, per level, the input matrix, the inverse of its first block, its square root and the
+    Schur form of the root, i.e. several matrices of the size of each level.
+    OUTPUT
+        leaf <csc_array>, state <dict>
+    '''
+    t0 = perf_counter()
+    if 2**(len( block_index )-1) >= M.shape[0]:
+        raise Warning(f'ABORTED. block_index is too long for a matrix of size {M.shape[0]}.')
+    #
+    L, levels = csc_array(M), []
+    for i in range( len(block_index) ):
+        level = _level(L, max_it=max_it)
+        L     = level.pop('L')[ int(block_index[i]) ]
+        levels.append(level)
+    #
+    state = {'block_index': block_index, 'max_it': max_it, 'levels': levels, 'leaf': L,
+             'time': (perf_counter()-t0)/60.}    # Time is in minutes
+    return L, state
+
+
+def sbd_update(state, delta, refine_it=1, tol=1e-8, max_rank=None):
+    ''' Compression of M + delta from the state of M (see sbd_state).
+    PARAMETERS
+        state <dict>         : output of sbd_state or of a previous sbd_update.
+        delta <sparse array> : change of the Hamiltonian, same shape as M.
+        refine_it <int>      : minimum number of Newton (Sylvester) steps from the previous square root.
+        tol <float>          : residual at which the warm-started Newton iteration stops.
+        max_rank <int>       : largest Woodbury rank used for a block inverse. Default: a quarter of the block.
+    OUTPUT
+        leaf <csc_array>, state <dict>: new state, with 'report': per level 'woodbury' <bool> and 'warm' <bool>.
+    '''
+    t0 = perf_counter()
+    M  = csc_array( state['levels'][0]['M'] + delta )
+    levels, woodbury, warm = [], [], []
+    for i, old in enumerate(state['levels']):
+        k      = M.shape[0]//2
+        change = (M - old['M'])[:k, :k]
+        A_     = None
+        rank   = k//4 if max_rank is None else max_rank
+        if old['A_'] is not None and woodbury_pays(old['A_'], change, rank):
+            with stage('inverse', n=k, method='woodbury') as s:
+                A_ = woodbury_inverse(old['A_'], change, rank)
+                s.update(nnz=getattr(A_, 'nnz', None))
+        woodbury.append( A_ is not None )
+        level = _level(M, A_=A_, S0=old['S'], schur0=old.get('schur'), refine_it=refine_it, max_it=state['max_it'],
+                       residual=old['residual'], tol=tol)
+        M     = csc_array( level.pop('L')[ int(state['block_index'][i]) ] )
+        warm.append( level['warm'] )
+        levels.append(level)
+    #
+    new = {'block_index': state['block_index'], 'max_it': state['max_it'], 'levels': levels, 'leaf': M,
+           'time': (perf_counter()-t0)/60., 'report': {'woodbury': woodbury, 'warm': warm}}    # Time is in minutes
+    return M, new
@@ -0,0 +1,152 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Matrix-free building blocks of the sparse SBD for scipy.sparse.linalg.LinearOperator inputs.
+
+Blocks, inverses, Gram matrices and square roots are returned as LinearOperators whose matvec composes
+matvecs of the input; nothing of size n*n is stored. The price is paid at every application: a level
+applies its input several times per matvec (blocks, GMRES iterations of the inverse, Arnoldi steps of the
+square root), so the cost of one matvec of a leaf grows geometrically with the depth of the block_index.
+Matrix-free compression is meant for operators too large to store and few levels; materialize the leaf
+(e.g. leaf @ identity) once it is small enough.
+'''
+
+import numpy as np
+from scipy.linalg import sqrtm
+from scipy.sparse import eye
+from scipy.sparse.linalg import LinearOperator, aslinearoperator, gmres
+
+
+RTOL   = 1e-10      # Relative tolerance of GMRES solves and of the Krylov square root
+KRYLOV = 40         # Maximum dimension of the Krylov space of the square root
+
+
+def _vector(x):
+    return np.asarray(x).reshape(-1)
+
+
+def operator_blocks(a, nrow=2):
+    ''' Splits operator a into nrow*nrow block operators, as blocks does for arrays.
+    Block (i, j) applies a to x embedded at the j-th block of rows and restricts the result to the i-th.
+    OUTPUT <tuple(LinearOperator)>
+    '''
+    a = aslinearoperator(a)
+    k = a.shape[0]//nrow
+    #
+    def block(i, j):
+        def matvec(x):
+            y = np.zeros(a.shape[1], dtype=np.result_type(a.dtype, x.dtype))
+            y[j*k:(j+1)*k] = _vector(x)
+            return a.matvec(y)[i*k:(i+1)*k]
+        #
+        def rmatvec(x):
+            y = np.zeros(a.shape[0], dtype=np.result_type(a.dtype, x.dtype))
+            y[i*k:(i+1)*k] = _vector(x)
+            return a.rmatvec(y)[j*k:(j+1)*k]
+        #
+        return LinearOperator((k, k), matvec=matvec, rmatvec=rmatvec, dtype=a.dtype)
+    #
+    return tuple( tuple( block(i, j) for j in range(nrow) ) for i in range(nrow) )
+
+
+def inverse_operator(a, rtol=RTOL):
+    ''' Action of the inverse of a through GMRES solves.
+    A probe solve is made first: raises Warning if GMRES does not converge, so that callers can fall back
+    as they do when scipy.sparse.linalg.inv fails. Every later solve is checked too and raises the same
+    Warning, rather than returning an unconverged vector.
+    '''
+    a     = aslinearoperator(a)
+    probe = np.random.default_rng(0).standard_normal(a.shape[0])
+    _, info = gmres(a, probe, rtol=rtol, atol=0.)
+    if info != 0:
+        raise Warning(f'ABORTED. GMRES did not converge for the inverse (info={info}).')
+    #
+    def matvec(x):
+        y, info = gmres(a, _vector(x), rtol=rtol, atol=0.)
+        if info != 0:
+            raise Warning(f'ABORTED. GMRES did not converge for a matvec of the inverse (info={info}).')
+        return y
+    #
+    return LinearOperator(a.shape, matvec=matvec, dtype=a.dtype)
+
+
+def sqrt_action(a, v, m=KRYLOV, rtol=RTOL):
+    ''' Principal square root of a applied to v, sqrt(a) v ~ ||v|| V_m sqrtm(H_m) e_1 from m Arnoldi steps.
+    Stops early when two successive approximations agree to rtol.
+    '''
+    v    = _vector(v)
+    n    = v.shape[0]
+    m    = min(m, n)
+    beta = np.linalg.norm(v)
+    if beta == 0:
+        return np.zeros_like(v)
+    #
+    dtype = np.result_type(a.dtype, v.dtype, float)
+    V     = np.zeros((n, m+1), dtype=dtype)
+    H     = np.zeros((m+1, m), dtype=dtype)
+    V[:, 0] = v/beta
+    y     = None
+    for j in range(m):
+        w = a.matvec(V[:, j])
+        for i in range(j+1):                            # Modified Gram-Schmidt
+            H[i, j] = np.vdot(V[:, i], w)
+            w       = w - H[i, j]*V[:, i]
+        H[j+1, j] = np.linalg.norm(w)
+        #
+        y, y_old = beta * V[:, :j+1] @ sqrtm(H[:j+1, :j+1])[:, 0], y
+        if H[j+1, j] <= rtol*beta or ( y_old is not None and np.linalg.norm(y - y_old) <= rtol*np.linalg.norm(y) ):
+            break
+        V[:, j+1] = w/H[j+1, j]
+    #
+    return y if np.iscomplexobj(V) else y.real      # Real input: as ns_sqrts, keep the real part
+
+
+def sqrt_operator(a, m=KRYLOV, rtol=RTOL):
+    "Square root of operator a, applied with sqrt_action. Matrix-free counterpart of ns_sqrts."
+    a = aslinearoperator(a)
+    return LinearOperator(a.shape, matvec=lambda x: sqrt_action(a, x, m=m, rtol=rtol), dtype=a.dtype)
+
+
+def gram_operator(M):
+    "M @ M.T.conjugate() as a product of operators, without forming it."
+    M = aslinearoperator(M)
+    return M @ M.H
+
+
+def shifted_operator(M, T_factor=0, N_factor=1):
+    "N_factor*M + T_factor*I as an operator."
+    M = aslinearoperator(M)
+    return N_factor*M + T_factor*aslinearoperator( eye(M.shape[0], dtype=M.dtype) )
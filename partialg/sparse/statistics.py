@@ -36,32 +36,53 @@ import numpy as np
 from matplotlib import pyplot as plt
 import scipy as sp
 
-def sbd_errors(matrix_size, sample_size, block_eigensolver, T=0, N=1 ):
+from ..spectrum import extremal_eigenvalues, lowest_eigenvalue
+from ..shared import resolve
+
+def random_hermitians(matrix_size, rng):
+    "Random sparse Hermitian matrix M @ M.T.conjugate() with M uniform in [0, 1) of shape matrix_size."
+    M = sp.sparse.csc_array( rng.random(matrix_size) )
+    return M @ M.T.conjugate()
+
+
+def sbd_errors_trial(M, block_eigensolver, T=0, N=1):
+    ''' Reference and SBD ground states of one sparse Hermitian matrix M, as sampled by sbd_errors.
+    OUTPUT
+        (reference, tested)
+    '''
+    M = resolve(M)
+    # Fitting spectrum of M to domain (0, 1)
+    (summand, highest), _ = extremal_eigenvalues(M)
+    norm    = (highest - summand)
+    M       = (M - summand*sp.sparse.eye(M.shape[0]) ) /norm   # Set from0 to 1
+    M       = M*N + T*sp.sparse.eye(M.shape[0])                # Rescale by N and translate by T
+    #
+    ref     = (T/N -T)*norm + summand     # Lowest eigenvalue T of the rescaled M, mapped back as tested is
+    #
+    M2 = block_eigensolver(M)[0]
+    M2 = M2 @ M2.T.conjugate()   # Forcing Hermiticity
+    #
+    tested  = (np.sqrt( lowest_eigenvalue(M2) )/N -T )*norm + summand
+    return ref, tested
+
+
+def sbd_errors(matrix_size, sample_size, block_eigensolver, T=0, N=1, seed=None ):
     ''' 
     Compute error of random Hermitian matrices of size matrix_size up to sample_size.
     T : Translation factor
     N : Multiplier of spectrum
+    seed : seed of the random matrices (numpy.random.default_rng).
+    For large sample sizes, see partialg.montecarlo.sbd_error_mc.
     '''
     tested_evs  = []
     ref_evs     = []
+    rng         = np.random.default_rng(seed)
     #
     for i in range(sample_size):
-        M   = sp.sparse.csc_array(np.random.rand(*matrix_size))
-        M   = M @ M.T.conjugate()         # Building Hermitian matrix
-        #
-        # Fitting spectrum of M to domain (0, 1)
-        np_evs  = np.sort( sp.sparse.linalg.eigs(M, sigma=0)[0] )
-        summand = np_evs[0]
-        norm    = (np_evs[-1] - summand)
-        M       = (M - summand*np.eye(M.shape[0]) ) /norm   # Set from0 to 1
-        M       = M*N + T*sp.sparse.eye(M.shape[0])                # Rescale by N and translate by T
-        #
-        ref_evs.append( (np.min( sp.sparse.linalg.eigs(M, sigma=0)[0] )/N -T )*norm + summand )
-        #
-        M2 = block_eigensolver(M)[0]
-        M2 = M2 @ M2.T.conjugate()   # Forcing Hermiticity
-        #
-        tested_evs.append( (np.sqrt( np.min( sp.sparse.linalg.eigs( M2, sigma=0 )[0] ) )/N -T )*norm + summand )
+        M       = random_hermitians(matrix_size, rng)         # Building Hermitian matrix
+        r, s    = sbd_errors_trial(M, block_eigensolver, T=T, N=N)
+        ref_evs.append( r )
+        tested_evs.append( s )
     #
     ref_evs    = np.array(ref_evs)
     tested_evs = np.array(tested_evs)
@@ -0,0 +1,126 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium 
+# or format. The licensor cannot revoke these freedoms as long as you follow the 
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the 
+# license, and indicate if changes were made. You may do so in any reasonable 
+# manner, but not in any way that suggests the licensor endorses you or your 
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you 
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological 
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the 
+# public domain or where your use is permitted by an applicable exception or 
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions 
+# necessary for your intended use. For example, other rights such as publicity, 
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+
+''' Extremal eigenvalues of Hermitian matrices.
+
+Lowest and highest eigenvalues from a few matrix-vector products (Lanczos, or LOBPCG) instead of a full
+spectrum or a shift-invert factorization. Small dense matrices are solved directly.
+'''
+
+import numpy as np
+from scipy.linalg import eigh
+from scipy.sparse import issparse
+from scipy.sparse.linalg import eigsh, lobpcg, LinearOperator, aslinearoperator, ArpackNoConvergence
+
+
+def _dense(M):
+    return np.asarray( M.toarray() if issparse(M) else M )
+
+
+def _start(v0, n, dtype):
+    "Warm start vector, or None to let the solver pick one."
+    if v0 is None:
+        return None
+    v0 = np.asarray(v0).reshape(-1)
+    return v0.astype(np.result_type(dtype, v0.dtype)) if v0.shape[0] == n else None
+
+
+def extremal_eigenvalues(M, which='both', tol=1e-10, v0=None, method='lanczos', maxiter=None, dense_below=128):
+    ''' Lowest and/or highest eigenvalue of the Hermitian matrix M.
+    PARAMETERS
+        M <array, sparse or LinearOperator>: Hermitian matrix.
+        which <str>     : 'lowest', 'highest' or 'both'.
+        tol <float>     : relative tolerance of the iterative solver.
+        v0 <array>      : warm start, e.g. the vector returned for a nearby matrix (ignored if the size differs).
+        method <str>    : 'lanczos' (scipy eigsh, one run for both ends of real matrices) or 'lobpcg'.
+        maxiter <int>   : iteration limit of the iterative solver.
+        dense_below<int>: matrices smaller than this are solved with dense eigh restricted to the extremes.
+    OUTPUT
+        eigenvalues <tuple(float)> ((lowest, highest) for which='both'), v <array> warm start for the next call.
+    '''
+    n = M.shape[0]
+    if which not in ('lowest', 'highest', 'both'):
+        raise Warning("ABORTED. which must be 'lowest', 'highest' or 'both'.")
+    #
+    if n < max(dense_below, 3) and not isinstance(M, LinearOperator):
+        a      = _dense(M)
+        ends   = {'lowest': [0], 'highest': [n-1], 'both': [0, n-1]}[which]
+        values, start = [], 0
+        for i in ends:
+            w, V = eigh(a, subset_by_index=[i, i])
+            values.append( w[0] )
+            start = start + V[:, 0]
+        return tuple(values), start
+    #
+    if method == 'lanczos':
+        if which == 'both' and np.issubdtype(M.dtype, np.complexfloating):     # ARPACK has no 'BE' for complex
+            (low, ), v = extremal_eigenvalues(M, 'lowest', tol, v0, method, maxiter, dense_below)
+            (high, ), u = extremal_eigenvalues(M, 'highest', tol, v0, method, maxiter, dense_below)
+            return (low, high), v + u
+        k, key = (2, 'BE') if which == 'both' else (1, {'lowest': 'SA', 'highest': 'LA'}[which])
+        try:
+            w, V = eigsh(M, k=k, which=key, tol=tol, v0=_start(v0, n, M.dtype), maxiter=maxiter)
+        except ArpackNoConvergence as e:
+            if len(e.eigenvalues) < k:
+                raise
+            w, V = e.eigenvalues, e.eigenvectors
+        order = np.argsort(w)
+        w, V  = w[order], V[:, order]
+        return tuple(w), V.sum(axis=1)
+    elif method == 'lobpcg':
+        A = aslinearoperator(M)
+        X = _start(v0, n, M.dtype)
+        if X is None:
+            X = np.random.default_rng(0).standard_normal(n)
+        if not np.issubdtype(M.dtype, np.complexfloating):
+            X = X.real
+        values, start = [], 0
+        for largest in {'lowest': [False], 'highest': [True], 'both': [False, True]}[which]:
+            w, V = lobpcg(A, X.reshape(n, 1), largest=largest, tol=tol, maxiter=maxiter or 200)
+            values.append( w[0] )
+            start = start + V[:, 0]
+        return tuple(values), start
+    raise Warning("ABORTED. method must be 'lanczos' or 'lobpcg'.")
+
+
+def lowest_eigenvalue(M, **kwargs):
+    "Lowest eigenvalue of the Hermitian matrix M (see extremal_eigenvalues for kwargs)."
+    return extremal_eigenvalues(M, which='lowest', **kwargs)[0][0]
+
+
+def highest_eigenvalue(M, **kwargs):
+    "Highest eigenvalue of the Hermitian matrix M (see extremal_eigenvalues for kwargs)."
+    return extremal_eigenvalues(M, which='highest', **kwargs)[0][0]
@@ -41,6 +41,8 @@ from sympy import sqrt, det, simplify, expand
 from sympy import symbols
 from numpy import log2
 
+from ..instrument import stage, emit
+
 
 K = symbols('K') # Coefficient used in the NS_sqrt function.
 
@@ -48,7 +50,7 @@ def ns_sqrty(a, max_it = 6, k_pow = 1/4, do_simplify=False):
     "Newton-Schulz matrix root expansion."
     A     = K * eye(a.shape[0])   # Initial guess
     for i in range(max_it):
-        A = 0.5*(A + a * inv(A, do_simplify=do_simplify) )
+        A = 0.5*(A + a * invy(A, do_simplify=do_simplify) )
     return A, K
 
 
@@ -94,20 +96,27 @@ def sbd_eigenvaluey(a, sqrt= ns_sqrty, do_simplify=False, allsymbols={K}):
     OUTPUT
         <np.array>
     '''
-    blk       = blocky(a, nrow=2)
-    A, C      = blk[0][0], blk[0][1]
-    D, B      = blk[1][0], blk[1][1]
+    k         = a.shape[0]//2
+    with stage('block', n=k):
+        blk       = blocky(a, nrow=2)
+        A, C      = blk[0][0], blk[0][1]
+        D, B      = blk[1][0], blk[1][1]
     #
     t = A + B        # Block-trace
     #
     try:             # Block-determinant with inverse of A
-        A_ = inv(A)
-        d  = A * B - A * D * A_ * C
-    except:          # Without inverse of A
+        with stage('inverse', n=k):
+            A_ = invy(A)
+        with stage('determinant', n=k):
+            d  = A * B - A * D * A_ * C
+    except Exception as e:          # Without inverse of A
         print('Exception')
-        d  = A * B - D * C
+        emit('fallback', stage='inverse', method='singular', reason=repr(e))
+        with stage('determinant', n=k):
+            d  = A * B - D * C
     #
-    term, K = sqrt( t * t - 4*d )
+    with stage('sqrt', n=k):
+        term, K = sqrt( t * t - 4*d )
     L0   = 0.5*(t - term)
     L1   = 0.5*(t + term)
     #
@@ -133,6 +142,7 @@ def sbd_eigenbranchy(M, block_index='0', only_even=False, do_simplify=False, all
             L0L1, allsymbols = sbd_eigenvaluey(L[-1], do_simplify=do_simplify, allsymbols=allsymbols)
             L.append( L0L1[ int(block_index[i]) ] )    # Block-eigensolving
             t.append( (perf_counter()-t0)/60. )
+            emit('level', level=i, index=block_index[i], n=L[-2].shape[0], duration=(t[-1]-t[-2])*60.)
         #
         if only_even == True:
             L = [L[i] for i in range(0,len(L),2)]
@@ -159,6 +169,7 @@ def sbd_eigenleafy(M, block_index='0', do_simplify=False, allsymbols={K}):
             L0L1, allsymbols = sbd_eigenvaluey(L[-1], do_simplify=do_simplify, allsymbols=allsymbols)
             L.append( L0L1[ int(block_index[i]) ] )    # Block-eigensolving
             t.append( (perf_counter()-t0)/60. )
+            emit('level', level=i, index=block_index[i], n=L[0].shape[0], duration=(t[-1]-t[-2])*60.)
             del L[0]
         #
     else:
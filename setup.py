@@ -19,6 +19,9 @@ setup(
         "sympy>=1.13.3",
         "tqdm>=4.67.1"
     ],
+    entry_points={
+        "console_scripts": ["partialg-run=partialg.runner:main"],
+    },
     python_requires=">=3.9",
     classifiers=[                     # Metadata for PyPI
         "Programming Language :: Python :: 3",
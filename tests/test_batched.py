@@ -0,0 +1,70 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Batched dense SBD against sbd_eigenleaf / sbd_eigenbranch on each matrix of the stack. '''
+
+import numpy as np
+import pytest
+
+pytest.importorskip('jax')
+
+from partialg.dense.compression import sbd_eigenleaf, sbd_eigenbranch
+from partialg.dense.batched import sbd_eigenleaf_batched, sbd_eigenbranch_batched
+
+INDICES = ['01', '10', '00', '11']
+
+
+def stack(batch=4, n=32):
+    rng = np.random.default_rng(1)
+    X   = rng.normal(size=(batch, n, n))
+    return X @ X.transpose(0, 2, 1)/n + 2*np.eye(n)
+
+
+@pytest.mark.parametrize('jit', [False, True])
+def test_leaves_match_per_matrix(x64, jit):
+    M = stack()
+    leaves, report = sbd_eigenleaf_batched(M, INDICES, jit=jit)
+    assert leaves.shape == (4, 8, 8)
+    for m, index, leaf in zip(M, INDICES, leaves):
+        assert np.abs( leaf - np.asarray( sbd_eigenleaf(m, index, jit=jit)[0] ) ).max() < 1e-10
+
+
+@pytest.mark.parametrize('jit', [False, True])
+def test_branches_match_per_matrix(x64, jit):
+    M = stack()
+    branch, report = sbd_eigenbranch_batched(M, '01', jit=jit)
+    for i, m in enumerate(M):
+        for level, L in zip(branch, sbd_eigenbranch(m, '01', jit=jit)[0]):
+            assert np.abs( level[i] - np.asarray(L) ).max() < 1e-10
@@ -0,0 +1,79 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Prefix hits of the SBD result cache against fresh computations. '''
+
+import numpy as np
+import scipy as sp
+import pytest
+
+from partialg.cache import ResultCache, cached_eigenleaf, cached_eigenbranch
+from partialg.sparse.compression import sbd_eigenleafs, sbd_eigenbranchs
+
+
+def matrix(n=32):
+    H = sp.sparse.random_array((n, n), density=0.2, rng=0)
+    return sp.sparse.csc_array( H + H.T + 4*sp.sparse.eye_array(n) )
+
+
+def test_prefix_hit_matches_fresh_leaf(tmp_path):
+    cache = ResultCache(root=str(tmp_path))
+    M     = matrix()
+    cached_eigenleaf(M, '01', mode='sparse', cache=cache)
+    leaf, report = cached_eigenleaf(M, '010', mode='sparse', cache=cache)
+    assert report['cache'] == {'loaded': 2, 'computed': 1}
+    fresh = sbd_eigenleafs(M, '010')[0]
+    assert np.abs( (leaf - fresh).toarray() ).max() < 1e-12
+
+
+def test_prefix_hit_matches_fresh_branch(tmp_path):
+    cache = ResultCache(root=str(tmp_path))
+    M     = matrix()
+    cached_eigenbranch(M, '1', mode='sparse', cache=cache)
+    branch, report = cached_eigenbranch(M, '10', mode='sparse', cache=cache)
+    assert report['cache'] == {'loaded': 1, 'computed': 1}
+    for L, fresh in zip(branch[1:], sbd_eigenbranchs(M, '10')[0][1:]):
+        assert np.abs( (L - fresh).toarray() ).max() < 1e-12
+
+
+def test_changed_matrix_misses(tmp_path):
+    cache = ResultCache(root=str(tmp_path))
+    M     = matrix()
+    cached_eigenleaf(M, '01', mode='sparse', cache=cache)
+    N       = M.copy()
+    N[0, 0] += 1e-9
+    leaf, report = cached_eigenleaf(N, '01', mode='sparse', cache=cache)
+    assert report['cache'] == {'loaded': 0, 'computed': 2}
+    assert np.abs( (leaf - sbd_eigenleafs(N, '01')[0]).toarray() ).max() < 1e-12
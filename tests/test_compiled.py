@@ -0,0 +1,70 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' The persistent compilation cache of the jitted SBD levels. '''
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('jax')
+
+SCRIPT = '''
+import numpy as np
+import jax.numpy as jnp
+from partialg.dense.compression import sbd_eigenleaf
+jnp.ones((4, 4)) @ jnp.ones((4, 4))          # An earlier compilation must not disable the cache
+M = np.random.default_rng(0).normal(size=(16, 16)) + 16*np.eye(16)
+sbd_eigenleaf(M, '00', jit=True)
+'''
+
+
+def run(tmp_path, **env):
+    env = {**os.environ, 'PARTIALG_CACHE_DIR': str(tmp_path), 'PARTIALG_JAX_CACHE': '1', **env}
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                         env.get('PYTHONPATH', '')])
+    subprocess.run([sys.executable, '-c', SCRIPT], env=env, check=True, capture_output=True)
+    path = tmp_path/'jax'
+    return os.listdir(path) if path.exists() else []
+
+
+def test_first_jitted_call_enables_cache(tmp_path):
+    assert any( 'sbd_eigenvalue_jit' in f for f in run(tmp_path) )
+
+
+def test_cache_can_be_switched_off(tmp_path):
+    assert run(tmp_path, PARTIALG_JAX_CACHE='0') == []
@@ -0,0 +1,65 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+''' Round trip of the native Hamiltonian store. '''
+
+import numpy as np
+import scipy as sp
+import pytest
+
+from partialg.database import save_hamiltonian, load_hamiltonian
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+@pytest.mark.parametrize('H', [sp.sparse.csr_array((4, 4)), sp.sparse.random_array((6, 6), density=0.3, rng=0)],
+                         ids=['empty', 'random'])
+def test_round_trip(tmp_path, H, mmap):
+    save_hamiltonian(H, 'h', root=str(tmp_path), n_qubits=2)
+    G, metadata = load_hamiltonian('h', root=str(tmp_path), mmap=mmap)
+    assert G.shape == H.shape and G.nnz == H.nnz
+    assert np.array_equal( G.toarray(), H.toarray() )
+    assert metadata['n_qubits'] == 2
+
+
+def test_bundled_entry_matches_pickle(tmp_path):
+    from partialg.database import DATABASE, convert_pickle, list_hamiltonians
+    assert 'a1_66' in list_hamiltonians(n_qubits=12)
+    H, metadata = load_hamiltonian('a1_66')
+    name = convert_pickle(f'{DATABASE}/a1_66.pkl', root=str(tmp_path))
+    G, _ = load_hamiltonian(name, root=str(tmp_path))
+    assert abs(G - H).max() == 0
+    assert abs(H - H.T).max() < 1e-6                                        # Real symmetric up to convert_tol
+    hf = int( ''.join( map(str, metadata['hf_state']) ), 2 )                # First wire = most significant bit
+    ground = sp.sparse.linalg.eigsh(H, k=1, which='SA')[0][0]
+    assert ground <= H[[hf], [hf]][0] < ground + 0.01                        # Hartree-Fock energy near the ground state
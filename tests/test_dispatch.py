@@ -0,0 +1,82 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+''' Engines chosen by partialg.dispatch for representative inputs, with the shipped cost model. '''
+
+import numpy as np
+import scipy as sp
+import pytest
+
+from partialg import dispatch
+from partialg.core import sbd
+from partialg.dispatch import DEFAULT_MODEL, choose_sbd, choose_pinv, run_sbd
+
+
+def sparse_hermitian(n, density, seed=0):
+    R = sp.sparse.random_array((n, n), density=density, format='csc', rng=seed)
+    return sp.sparse.csc_array( R + R.T + sp.sparse.diags_array(np.arange(1., n + 1)) )
+
+
+def test_dense_matrix_stays_on_the_dense_engine():
+    M = np.random.default_rng(0).random((256, 256))
+    choice = choose_sbd(M + M.T, model=DEFAULT_MODEL)
+    assert choice['engine'] == 'dense'
+    assert 'batched' not in choice['estimates']
+
+
+def test_stack_goes_to_the_batched_engine():
+    assert choose_sbd(np.random.default_rng(0).random((3, 64, 64)), model=DEFAULT_MODEL)['engine'] == 'batched'
+
+
+def test_coupled_sparse_matrix_is_densified_when_it_fits():
+    choice = choose_sbd(sparse_hermitian(4096, 1.2e-3), model=DEFAULT_MODEL)
+    assert choice['engine'] == 'dense'
+    assert choice['estimates']['sparse'] > 10*choice['estimates']['dense']
+
+
+def test_sparse_matrix_stays_sparse_when_dense_does_not_fit(monkeypatch):
+    monkeypatch.setattr(dispatch, '_physical_memory', lambda: 2**20)
+    assert choose_sbd(sparse_hermitian(1024, 1e-3), model=DEFAULT_MODEL)['engine'] == 'sparse'
+    with pytest.raises(Warning):
+        choose_pinv(sparse_hermitian(1024, 1e-3))
+
+
+def test_sparse_input_gets_sparse_leaves():
+    M = sparse_hermitian(64, 0.05)
+    for L in run_sbd(M, 'dense'):
+        assert sp.sparse.issparse(L) and L.shape == (32, 32)
+    info = {}
+    L0, L1 = sbd(M, mode='auto', info=info)
+    assert info['engine'] == 'dense' and sp.sparse.issparse(L0)
+    assert np.allclose( L0.toarray(), sbd(M)[0].toarray(), atol=1e-3 )
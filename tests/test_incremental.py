@@ -0,0 +1,75 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Incremental SBD updates against a full recompute. '''
+
+import numpy as np
+import scipy as sp
+import pytest
+
+from partialg.sparse.incremental import sbd_state, sbd_update
+from partialg.sparse.compression import sbd_eigenleafs
+
+
+def matrix(n=128):
+    H = sp.sparse.random_array((n, n), density=0.03, rng=0)
+    return sp.sparse.csc_array( H + H.T + 8*sp.sparse.eye_array(n) )
+
+
+def low_rank(n=128):
+    u = np.zeros(n)
+    u[[3, 10]] = [1., 0.5]                  # Rows of the first block only: Woodbury applies at level 0
+    return sp.sparse.csc_array( 0.3*np.outer(u, u) )
+
+
+def relative(L, reference):
+    return abs(L - reference).max()/abs(reference).max()
+
+
+def test_update_matches_recompute():
+    M, delta   = matrix(), low_rank()
+    leaf, state = sbd_state(M, '010')
+    new, state  = sbd_update(state, delta, tol=1e-10)
+    assert state['report'] == {'woodbury': [True, False, False], 'warm': [True, True, True]}
+    assert relative(new, sbd_eigenleafs(M + delta, '010')[0]) < 1e-8
+
+
+def test_update_back_restores_leaf():
+    M, delta    = matrix(), low_rank()
+    leaf, state = sbd_state(M, '010')
+    new, state  = sbd_update(state, delta)
+    back, state = sbd_update(state, -delta)
+    assert relative(back, leaf) < 1e-7
+    assert relative(new, sbd_eigenleafs(M + delta, '010')[0]) < 1e-7
@@ -0,0 +1,88 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Kronecker-structured partial inversion against dense.inversion.pinv on the full product. '''
+
+import numpy as np
+import pytest
+
+pytest.importorskip('jax')
+
+from partialg.dense.inversion import pinv
+from partialg.dense.kronecker import pinvk, pinv_factor
+
+DIMS = (2, 3, 2)
+
+
+def factors():
+    rng = np.random.default_rng(0)
+    return [ rng.normal(size=(d, d)) + 2*np.eye(d) for d in DIMS ]
+
+
+def full(F):
+    out = np.ones((1, 1))
+    for A in F:
+        out = np.kron(out, A)
+    return out
+
+
+def flat(idx):
+    return int( np.ravel_multi_index(idx, DIMS) )
+
+
+@pytest.mark.parametrize('pivots', [ [(0, 0)], [((0, 1, 0), (0, 1, 1)), (5, 7)], [(3, 3), (8, 2), (11, 0)] ])
+def test_pinvk_matches_dense(x64, pivots):
+    F = factors()
+    Z = pinvk(F, *pivots)
+    flat_pivots = [ tuple( flat(i) if isinstance(i, tuple) else i for i in p ) for p in pivots ]
+    reference   = np.asarray( pinv(full(F), *flat_pivots) )
+    assert np.abs( Z.toarray() - reference ).max() < 1e-13*np.abs(reference).max()
+    X = np.random.default_rng(1).normal(size=(12, 3))
+    assert np.abs( Z @ X - reference @ X ).max() < 1e-12*np.abs(reference @ X).max()
+
+
+@pytest.mark.parametrize('factor, pivot', [(0, (1, 0)), (1, (0, 2)), (2, (1, 1))])
+def test_pinv_factor_matches_dense(x64, factor, pivot):
+    F = factors()
+    pivots = []                 # Every pivot of the block: same indices on the other factors
+    for other in np.ndindex( *[d for j, d in enumerate(DIMS) if j != factor] ):
+        row, col = list(other), list(other)
+        row.insert(factor, pivot[0])
+        col.insert(factor, pivot[1])
+        pivots.append( (flat(tuple(row)), flat(tuple(col))) )
+    reference = np.asarray( pinv(full(F), *pivots) )
+    Z = pinv_factor(F, factor, pivot)
+    assert len(Z.terms) == 3
+    assert np.abs( Z.toarray() - reference ).max() < 1e-13*np.abs(reference).max()
@@ -0,0 +1,86 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+''' Lifting leaf eigenvectors of a transverse-field Ising chain back to the full space. '''
+
+import numpy as np
+import scipy as sp
+import pytest
+
+from partialg.dense.compression import sbd_eigenleaf, sbd_lift
+from partialg.sparse.compression import sbd_eigenleafs, sbd_lifts
+
+
+def ising(n, h, coupling=1.):
+    "Periodic chain -coupling sum Z_i Z_i+1 - h sum X_i (dense)."
+    X, Z = np.array([[0., 1.], [1., 0.]]), np.diag([1., -1.])
+    def term(ops):
+        out = np.ones((1, 1))
+        for i in range(n):
+            out = np.kron(out, ops.get(i, np.eye(2)))
+        return out
+    H = -coupling*sum( term({i: Z, (i+1) % n: Z}) for i in range(n) )
+    return H - h*sum( term({i: X}) for i in range(n) )
+
+
+def lift_ground_state(H, sparse):
+    leafer, lifter = (sbd_eigenleafs, sbd_lifts) if sparse else (sbd_eigenleaf, sbd_lift)
+    leaf, report   = leafer(sp.sparse.csc_array(H) if sparse else H, '000', record=True)
+    leaf = np.asarray(leaf.toarray() if sparse else leaf, dtype=complex)
+    e, w = np.linalg.eig(leaf)
+    i    = np.argmin(e.real)
+    u, lift = lifter(report['levels'], w[:, i], e[i], refine=2)
+    return abs( np.vdot(np.linalg.eigh(H)[1][:, 0], u) ), lift
+
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_ground_state_is_recovered(sparse):
+    overlap, lift = lift_ground_state(ising(7, 0.7, coupling=-1.), sparse)
+    assert overlap > 0.999
+    assert not lift['drifted']
+
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_drift_to_another_eigenpair_is_flagged(sparse):
+    overlap, lift = lift_ground_state(ising(7, 0.7), sparse)       # Gap of H below the error of the leaf
+    assert overlap < 0.5
+    assert lift['drifted'] and lift['shift'] > lift['gap']
+
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_error_bound_encloses_an_eigenvalue(sparse):
+    H = ising(7, 0.7, coupling=-1.)
+    overlap, lift = lift_ground_state(H, sparse)
+    e = np.linalg.eigvalsh(H)
+    assert np.abs(e - lift['eigenvalue'].real).min() <= lift['error_bound'] + 1e-12
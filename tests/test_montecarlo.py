@@ -0,0 +1,116 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Streaming statistics and seeding of the Monte Carlo engine. '''
+
+import json
+from functools import partial
+
+import numpy as np
+import pytest
+
+from partialg.montecarlo import Welford, run_chunk, summarize, sbd_error_mc
+from partialg.sparse.compression import sbd_eigenleafs
+from partialg.sparse.statistics import sbd_errors
+
+SOLVER = partial(sbd_eigenleafs, block_index='0')
+
+
+def test_welford_matches_numpy():
+    x = np.random.default_rng(0).lognormal(size=1000)
+    w = Welford()
+    for v in x:
+        w.update(v)
+    assert w.count == 1000
+    assert np.isclose(w.mean, np.mean(x), rtol=1e-13)
+    assert np.isclose(w.M2/w.count, np.var(x), rtol=1e-12)
+    assert np.isclose(w.std(), np.std(x), rtol=1e-12)
+
+
+def test_welford_merge_matches_numpy():
+    x     = np.random.default_rng(1).normal(loc=1e3, size=1000)
+    parts = [ Welford() for _ in range(4) ]
+    for part, chunk in zip(parts, np.array_split(x, [10, 400, 401])):       # Unequal chunks, one of a single sample
+        for v in chunk:
+            part.update(v)
+    merged = Welford()
+    for part in parts[::-1]:
+        merged.merge(part)
+    merged.merge( Welford() )                                               # Empty chunk
+    assert merged.count == 1000
+    assert np.isclose(merged.mean, np.mean(x), rtol=1e-13)
+    assert np.isclose(merged.std(), np.std(x), rtol=1e-10)
+
+
+def test_chunk_matches_sbd_errors_on_the_same_samples():
+    seed   = np.random.SeedSequence(7)
+    chunk  = run_chunk((8, 8), 20, seed, SOLVER, mode='sparse')
+    stats  = summarize({0: chunk})
+    direct = sbd_errors((8, 8), 20, SOLVER, seed=seed)                     # Same generator, same draws
+    assert stats['samples'] == 20 and stats['failed'] == 0
+    assert np.isclose(stats['mean_error'], direct['mean_error'], rtol=1e-10)
+    assert np.isclose(stats['error_std'], direct['error_std'], rtol=1e-8)
+    assert np.isclose(stats['mean_ratio'], direct['mean_ratio'], rtol=1e-10)
+    assert np.isclose(stats['ratio_std'], direct['ratio_std'], rtol=1e-8)
+
+
+def results(run):
+    return {k: v for k, v in run.items() if k != 'time'}
+
+
+def test_seeded_run_is_reproducible():
+    first  = sbd_error_mc((8, 8), 30, SOLVER, mode='sparse', seed=3, chunk_size=7)
+    second = sbd_error_mc((8, 8), 30, SOLVER, mode='sparse', seed=3, chunk_size=7)
+    assert results(first) == results(second)
+    other  = sbd_error_mc((8, 8), 30, SOLVER, mode='sparse', seed=4, chunk_size=7)
+    assert other['mean_error'] != first['mean_error']
+
+
+def test_interrupted_run_resumes_to_the_same_result(tmp_path):
+    path = str(tmp_path/'mc.json')
+    full = sbd_error_mc((8, 8), 30, SOLVER, mode='sparse', seed=3, chunk_size=7, checkpoint=path)
+    with open(path) as f:
+        saved = json.load(f)
+    saved['chunks'] = {j: c for j, c in saved['chunks'].items() if int(j) < 2}     # Interrupted after two chunks
+    with open(path, 'w') as f:
+        json.dump(saved, f)
+    resumed = sbd_error_mc((8, 8), 30, SOLVER, mode='sparse', seed=3, chunk_size=7, checkpoint=path)
+    assert results(resumed) == results(full)
+
+
+def test_workers_do_not_change_the_result():
+    serial   = sbd_error_mc((8, 8), 12, SOLVER, mode='sparse', seed=5, chunk_size=4)
+    parallel = sbd_error_mc((8, 8), 12, SOLVER, mode='sparse', seed=5, chunk_size=4, workers=2)
+    assert results(parallel) == results(serial)
@@ -0,0 +1,94 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Matrix-free (LinearOperator) and swept ground states against the explicit sparse path. '''
+
+import numpy as np
+import scipy as sp
+import pytest
+from scipy.sparse.linalg import LinearOperator, aslinearoperator
+
+pytest.importorskip('jax')
+
+from partialg.sparse.compression import transformed_eigs, transformed_eigs_sweep
+from partialg.sparse.operators import inverse_operator
+
+FACTORS = [(0, 1), (0.5, 2), (1., 0.5)]
+
+
+def matrix(n=256):
+    H = sp.sparse.random_array((n, n), density=0.03, rng=0)
+    return sp.sparse.csc_array( H + sp.sparse.eye_array(n) )
+
+
+@pytest.mark.parametrize('T, N', FACTORS)
+def test_implicit_matches_explicit(x64, T, N):
+    H        = matrix()
+    explicit = transformed_eigs(H, T, N, implicit=False)[0]
+    assert np.isclose( transformed_eigs(H, T, N, implicit=True)[0], explicit, rtol=1e-8 )
+    assert np.isclose( transformed_eigs(aslinearoperator(H), T, N)[0], explicit, rtol=1e-8 )    # Default for operators
+
+
+def test_implicit_matches_explicit_non_hermitian(x64):
+    H = matrix()
+    H = sp.sparse.csc_array( H @ H.T )                                        # Real positive spectrum
+    explicit = transformed_eigs(H, 0.5, 2, make_Hermitian=False, implicit=False)[0]
+    implicit = transformed_eigs(H, 0.5, 2, make_Hermitian=False, implicit=True)[0]
+    assert np.isclose(implicit, explicit, rtol=1e-8)
+
+
+@pytest.mark.parametrize('dense_below', [0, 4096])
+def test_sweep_matches_explicit(x64, dense_below):
+    H  = matrix()
+    Ts = [0, 0.5, 1.]
+    Ns = [0.5, 1, 2]
+    gs, report = transformed_eigs_sweep(H, Ts, Ns, dense_below=dense_below)
+    assert gs.shape == (3, 3)
+    for i, T in enumerate(Ts):
+        for j, N in enumerate(Ns):
+            assert np.isclose( gs[i, j], transformed_eigs(H, T, N, implicit=False)[0], rtol=1e-8 )
+
+
+def test_gmres_failure_raises():
+    n = 64
+    with pytest.raises(Warning, match='did not converge for the inverse'):
+        inverse_operator( LinearOperator((n, n), matvec=lambda x: 0*np.ravel(x), dtype=float) )
+    #
+    scale = np.ones(n)
+    inv   = inverse_operator( LinearOperator((n, n), matvec=lambda x: scale*np.ravel(x), dtype=float) )
+    assert np.allclose( inv.matvec(np.ones(n)), 1. )
+    scale[:n//2] = 0                                                    # Singular after the probe solve
+    with pytest.raises(Warning, match='did not converge for a matvec'):
+        inv.matvec( np.ones(n) )
@@ -0,0 +1,71 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Out-of-core and memory-budget leaves against the in-memory sbd_eigenleaf. '''
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('jax')
+
+from partialg.dense.compression import sbd_eigenleaf
+from partialg.dense.outofcore import sbd_eigenleaf_ooc
+
+
+def matrix(n=64):
+    X = np.random.default_rng(0).normal(size=(n, n))
+    return X @ X.T/n + 2*np.eye(n)
+
+
+def test_budget_leaf_matches_in_memory(x64, tmp_path, monkeypatch):
+    monkeypatch.setenv('PARTIALG_CACHE_DIR', str(tmp_path))        # Parent of the workspace
+    M = matrix()
+    reference = np.asarray( sbd_eigenleaf(M, '01')[0] )
+    leaf, report = sbd_eigenleaf(M, '01', memory_budget=8000)
+    assert report['memory']['strategy'][0] == 'ooc'
+    assert 'workdir' not in report
+    assert np.abs(leaf - reference).max() < 1e-10
+    assert os.listdir(tmp_path) == []                                # Workspace removed
+
+
+def test_ooc_leaf_matches_in_memory(x64, tmp_path):
+    M = matrix()
+    reference = np.asarray( sbd_eigenleaf(M, '01')[0] )
+    leaf, report = sbd_eigenleaf_ooc(M, '01', memory=8000, workdir=str(tmp_path), in_core=False)
+    assert report['out_of_core'] == 2
+    assert np.abs(np.asarray(leaf) - reference).max() < 1e-10
+    assert os.listdir(report['workdir']) == [os.path.basename(leaf.filename)]     # Only the leaf is left
@@ -0,0 +1,78 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+''' Input forms accepted by partialg.pauli.pauli_sum. '''
+
+import numpy as np
+import pytest
+
+from partialg.pauli import PauliSum, pauli_sum, pauli_decompose, ns_sqrtp, sbd_eigenleafp
+
+
+def dense(P):
+    return pauli_sum(P).to_sparse().toarray()
+
+
+@pytest.mark.parametrize('terms', [
+    [('XZ', 1.0)],
+    [('XZ', 1.0), ('ZZ', 0.5)],                 # Two pairs, as long as a (strings, coeffs) pair
+    [('XZ', 1.0), ('ZZ', 0.5), ('IY', -2.0)],
+])
+def test_pairs_and_strings_coeffs_agree(terms):
+    strings, coeffs = [s for s, _ in terms], [c for _, c in terms]
+    expected = PauliSum.from_strings(strings, coeffs).to_sparse().toarray()
+    assert np.allclose( dense(terms), expected )
+    assert np.allclose( dense((strings, coeffs)), expected )
+    assert np.allclose( dense((strings, np.array(coeffs))), expected )
+
+
+def test_empty_sum_materializes_as_zero_matrix():
+    for P in (pauli_decompose(np.zeros((4, 4))), PauliSum(3, [], [], [])):
+        M = P.to_sparse()
+        assert M.shape == (2**P.n, 2**P.n) and M.nnz == 0
+        assert not P.toarray().any()
+
+
+def test_square_root_converges_or_raises():
+    a = PauliSum.from_strings(['II', 'ZI', 'XX'], [2., 0.5, 0.3])
+    S = ns_sqrtp(a)
+    assert np.allclose( (S @ S).toarray(), a.toarray() )
+    with pytest.raises(Warning):
+        ns_sqrtp( PauliSum.from_strings(['II', 'ZI'], [-1., 0.5]) )        # Negative spectrum
+
+
+def test_vanishing_level_materializes():
+    H = PauliSum.from_strings(['ZZI', 'IXX'], [0., 0.])
+    L, _ = sbd_eigenleafp(H, '00', materialize=True)
+    assert L.shape == (2, 2) and L.nnz == 0
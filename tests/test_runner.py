@@ -0,0 +1,100 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Resuming an interrupted batch run. '''
+
+import os
+import sys
+import json
+import signal
+import subprocess
+from time import monotonic, sleep
+
+import numpy as np
+import scipy as sp
+import pytest
+
+from partialg.runner import run_manifest
+from partialg.sparse.compression import sbd_eigenbranchs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def manifest(tmp_path, jobs=3):
+    rng = np.random.default_rng(0)
+    for i in range(jobs):
+        H = sp.sparse.random_array((64, 64), density=0.05, rng=rng)
+        sp.sparse.save_npz(tmp_path/f'H{i}.npz', sp.sparse.csc_array( H + H.T + 8*sp.sparse.eye_array(64) ))
+    path = tmp_path/'manifest.json'
+    with open(path, 'w') as f:
+        json.dump({'defaults': {'function': 'branch', 'block_index': '01'},
+                   'jobs': [ {'input': f'H{i}.npz', 'name': f'H{i}'} for i in range(jobs) ]}, f)
+    return str(path)
+
+
+def status(path):
+    try:
+        with open(path) as f:
+            return {job['name']: job for job in json.load(f)['jobs']}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def test_interrupted_run_resumes(tmp_path):
+    path = manifest(tmp_path)
+    env  = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.environ.get('PYTHONPATH', '')]))
+    run  = subprocess.Popen([sys.executable, '-m', 'partialg.runner', path, '--workers', '1'], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    start = monotonic()
+    while not any( job.get('status') == 'done' for job in status(path).values() ):       # First branch finished
+        assert run.poll() is None and monotonic() - start < 120
+        sleep(0.05)
+    os.killpg(run.pid, signal.SIGKILL)                                                     # Runner and its worker
+    run.wait()
+    #
+    before = {name: job for name, job in status(path).items() if job.get('status') == 'done'}
+    assert 0 < len(before) < 3
+    stamps = {name: [os.stat(f).st_mtime_ns for f in job['result']] for name, job in before.items()}
+    summary = run_manifest(path, workers=1, verbose=False)
+    assert summary['done'] == 3
+    #
+    after = status(path)
+    for name, job in before.items():                                                       # Not recomputed
+        assert after[name]['attempts'] == 1 and after[name]['finished'] == job['finished']
+        assert [os.stat(f).st_mtime_ns for f in after[name]['result']] == stamps[name]
+    for i in range(3):                                                                     # Results unchanged
+        branch = sbd_eigenbranchs(sp.sparse.load_npz(tmp_path/f'H{i}.npz'), '01')[0]
+        for f, L in zip(after[f'H{i}']['result'], branch):
+            assert abs( sp.sparse.load_npz(f) - L ).max() < 1e-12
@@ -0,0 +1,82 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' SharedMatrix handles in a spawn pool, and removal of their segments. '''
+
+import os
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy as sp
+import pytest
+
+import partialg.shared
+from partialg.shared import SharedMatrix
+from partialg.sparse.compression import sbd_eigenleafs
+
+INDICES = ['00', '01', '10', '11']
+
+
+def matrix(n=64):
+    H = sp.sparse.random_array((n, n), density=0.05, rng=0)
+    return sp.sparse.csc_array( H + H.T + 8*sp.sparse.eye_array(n) )
+
+
+def segments(h):
+    "Files behind the handle: /dev/shm entries (backend 'shm', Linux) or the directory of backend 'file'."
+    if h.spec['backend'] == 'file':
+        return [ h.spec['path'] ]
+    return [ os.path.join('/dev/shm', name.lstrip('/')) for name, _, _ in h.spec['parts'].values() ]
+
+
+@pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='needs /dev/shm to see the segments')
+@pytest.mark.parametrize('private', [True, False])
+@pytest.mark.parametrize('backend', ['shm', 'file'])
+def test_spawn_pool_and_cleanup(tmp_path, monkeypatch, backend, private):
+    monkeypatch.setattr(partialg.shared, '_PRIVATE_MMAP', private and partialg.shared._PRIVATE_MMAP)    # This process
+    M = matrix()
+    h = SharedMatrix(M, backend=backend, root=str(tmp_path))
+    files = segments(h)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context('spawn')) as pool:
+        leaves = list( pool.map(partial(sbd_eigenleafs, h), INDICES) )
+    for index, (leaf, report) in zip(INDICES, leaves):
+        assert abs( leaf - sbd_eigenleafs(M, index)[0] ).max() < 1e-12
+    assert all( os.path.exists(f) for f in files )         # Exited workers did not remove the segments
+    view = h.get()
+    h.close()
+    assert not any( os.path.exists(f) for f in files )
+    assert abs( view - M ).max() == 0                      # Arrays of get() outlive the handle
@@ -0,0 +1,113 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' State-vector simulation against explicit 2**n x 2**n operators. '''
+
+import numpy as np
+import pytest
+
+pytest.importorskip('jax')
+
+from partialg.dense.inversion import pinv
+from partialg.dense.simulator import Circuit, zpu_gate, exchange
+
+N = 4
+
+
+def operator(G, qubits, n=N):
+    "Explicit matrix of gate G on qubits (qubit 0 = most significant bit)."
+    k   = len(qubits)
+    out = np.zeros((2**n, 2**n), dtype=complex)
+    for col in range(2**n):
+        bits = [ (col >> (n-1-q)) & 1 for q in range(n) ]
+        sub  = int( ''.join( str(bits[q]) for q in qubits ), 2 )
+        for new in range(2**k):
+            row = list(bits)
+            for j, q in enumerate(qubits):
+                row[q] = (new >> (k-1-j)) & 1
+            out[int(''.join(map(str, row)), 2), col] += G[new, sub]
+    return out
+
+
+def circuit(kha=0.3, unitarize=True):
+    rng  = np.random.default_rng(0)
+    CNOT = np.eye(4)[[0, 1, 3, 2]]
+    U    = np.linalg.qr( rng.normal(size=(4, 4)) + 1j*rng.normal(size=(4, 4)) )[0]
+    c    = Circuit(N)
+    c.zpu('h', 0).zpu('x', 0, kha=kha).zpu('z', 2, kha=kha, unitarize=unitarize)
+    c.add(CNOT, (0, 3)).zpu('o', 3, kha=kha).zpu('y', 1, kha=kha)
+    c.add(U, (2, 1)).zpu('i', 1, kha=kha, unitarize=unitarize).zpu('h', 2)
+    return c
+
+
+def explicit(c, kha=None):
+    M = np.eye(2**N, dtype=complex)
+    for G, qubits in c.ops:
+        M = operator(G if G.ndim == 2 else G[kha], qubits) @ M
+    return M
+
+
+@pytest.mark.parametrize('fuse', [True, False])
+def test_run_matches_explicit_operators(fuse):
+    c   = circuit()
+    psi = np.random.default_rng(1).normal(size=2**N) + 0j
+    M   = explicit(c)
+    assert np.abs( c.run(psi, fuse=fuse) - M @ psi ).max() < 1e-15*np.abs(M).max()*np.abs(psi).sum()
+    assert np.abs( c.run(fuse=fuse) - M[:, 0] ).max() < 1e-15*np.abs(M).max()*N
+
+
+def test_fused_matches_unfused():
+    c = circuit()
+    fused, report = c.run(fuse=True, report=True)
+    assert report['gates'] < len(c.ops)
+    assert np.abs( fused - c.run(fuse=False) ).max() < 1e-13
+
+
+def test_batched_kha_matches_each_value():
+    khas    = np.array([0.1, 0.3, 2.])
+    batched = circuit(kha=khas).run()
+    assert batched.shape == (3, 2**N)
+    for b, kha in enumerate(khas):
+        assert np.abs( batched[b] - circuit(kha=kha).run() ).max() < 1e-13
+
+
+def test_exchange_matches_pinv(x64):
+    for name in ('h', 'x', 'y', 'z', 'i', 'o'):
+        G = zpu_gate(name, kha=0.3)
+        for pivots in ( ((0, 0), ), ((0, 1), ), ((1, 1), (0, 0)) ):
+            reference = np.asarray( pinv(G, *pivots) )
+            if not np.isfinite(reference).all():       # Zero pivot (e.g. the singular x gate)
+                continue
+            assert np.abs( exchange(G, *pivots) - reference ).max() < 1e-13
@@ -0,0 +1,71 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+
+''' Extremal eigenvalues against the full spectrum. '''
+
+import numpy as np
+import scipy as sp
+import pytest
+
+from partialg.spectrum import extremal_eigenvalues, lowest_eigenvalue, highest_eigenvalue
+
+
+def hermitian(n, complex_=False):
+    rng = np.random.default_rng(0)
+    H   = sp.sparse.random_array((n, n), density=0.05, rng=rng)
+    if complex_:
+        H = H + 1j*sp.sparse.random_array((n, n), density=0.05, rng=rng)
+    return sp.sparse.csr_array( H + H.T.conjugate() )
+
+
+@pytest.mark.parametrize('complex_', [False, True])
+@pytest.mark.parametrize('n, method', [(40, 'lanczos'), (300, 'lanczos'), (300, 'lobpcg')])
+def test_extremes_match_full_spectrum(n, method, complex_):
+    H = hermitian(n, complex_)
+    e = np.linalg.eigvalsh(H.toarray())
+    (low, high), v = extremal_eigenvalues(H, method=method, tol=1e-12)
+    assert abs(low - e[0]) < 1e-8 and abs(high - e[-1]) < 1e-8
+    assert abs( lowest_eigenvalue(H, method=method, tol=1e-12) - e[0] ) < 1e-8
+    assert abs( highest_eigenvalue(H, method=method, tol=1e-12) - e[-1] ) < 1e-8
+
+
+def test_linear_operator_and_warm_start():
+    H = hermitian(300)
+    e = np.linalg.eigvalsh(H.toarray())
+    _, v = extremal_eigenvalues(H)
+    (low, high), _ = extremal_eigenvalues(sp.sparse.linalg.aslinearoperator(H), v0=v, tol=1e-12)
+    assert abs(low - e[0]) < 1e-8 and abs(high - e[-1]) < 1e-8
+    (low, high), _ = extremal_eigenvalues(H, v0=np.ones(7))                 # Wrong size: ignored
+    assert abs(low - e[0]) < 1e-8
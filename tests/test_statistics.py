@@ -0,0 +1,55 @@
+# START OF LICENSE DECLARATION.
+#
+# CC BY-NC-ND 4.0 License
+#
+# (Attribution-NonCommercial-NoDerivatives 4.0 International)
+#
+# Copyright (c) 2025 Dennis Lima
+#
+# YOU ARE FREE TO share — copy and redistribute the material in any medium
+# or format. The licensor cannot revoke these freedoms as long as you follow the
+# license terms.
+#
+# UNDER THE FOLLOWING TERMS:
+#     (i) Attribution — You must give appropriate credit, provide a link to the
+# license, and indicate if changes were made. You may do so in any reasonable
+# manner, but not in any way that suggests the licensor endorses you or your
+# use.
+#     (ii) NonCommercial — You may not use the material for commercial purposes .
+#     (iii) NoDerivatives — If you remix, transform, or build upon the material, you
+# may not distribute the modified material.
+#     (iv) No additional restrictions — You may not apply legal terms or technological
+# measures that legally restrict others from doing anything the license permits.
+#
+# Notices:
+#     (i) You do not have to comply with the license for elements of the material in the
+# public domain or where your use is permitted by an applicable exception or
+# limitation.
+#     (ii) No warranties are given. The license may not give you all of the permissions
+# necessary for your intended use. For example, other rights such as publicity,
+# privacy, or moral rights may limit how you use the material.
+#     (iii) View this license online at https://creativecommons.org/licenses/by-nc-nd/4.0/deed.en.
+#
+# END OF LICENSE DECLARATION.
+
+''' Reference and tested ground states of the statistics trials under translation and rescaling. '''
+
+import numpy as np
+import pytest
+
+from partialg.dense.statistics import random_hermitian, sbd_error_trial
+from partialg.sparse.statistics import random_hermitians, sbd_errors_trial
+
+
+@pytest.mark.parametrize('T, N', [(1, 1), (1.5, 2), (0.5, 0.25)])
+def test_dense_trial_is_exact_for_an_exact_solver(T, N):
+    M = random_hermitian((8, 8), np.random.default_rng(0))
+    ref, tested = sbd_error_trial(M, lambda X: [X], T=T, N=N)       # The "leaf" is the whole matrix
+    assert abs(float(ref) - float(tested)) <= 1e-3*abs(float(ref))
+
+
+@pytest.mark.parametrize('T, N', [(1, 1), (1.5, 2), (0.5, 0.25)])
+def test_sparse_trial_is_exact_for_an_exact_solver(T, N):
+    M = random_hermitians((8, 8), np.random.default_rng(0))
+    ref, tested = sbd_errors_trial(M, lambda X: [X], T=T, N=N)
+    assert abs(ref - tested) <= 1e-8*abs(ref)